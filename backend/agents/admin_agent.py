@@ -12,7 +12,7 @@ class AdminAgent:
     def load_config(self):
         """加载配置文件"""
         try:
-            with open(self.config_file, "r") as f:
+            with open(self.config_file, "r", encoding="utf-8") as f:
                 config = json.load(f)
                 self.available_topics = config.get("available_topics", [])
                 self.topic_config = config.get("topic_config", {})
@@ -23,14 +23,17 @@ class AdminAgent:
             print(f"加载配置文件时出错: {e}")
             
     def save_config(self):
-        """保存配置文件"""
+        """保存配置文件（只更新主题相关的部分，routing 等其他配置原样保留）"""
         try:
-            config = {
-                "available_topics": self.available_topics,
-                "topic_config": self.topic_config
-            }
-            with open(self.config_file, "w") as f:
-                json.dump(config, f, indent=4)
+            try:
+                with open(self.config_file, "r", encoding="utf-8") as f:
+                    config = json.load(f)
+            except FileNotFoundError:
+                config = {}
+            config["available_topics"] = self.available_topics
+            config["topic_config"] = self.topic_config
+            with open(self.config_file, "w", encoding="utf-8") as f:
+                json.dump(config, f, indent=4, ensure_ascii=False)
         except Exception as e:
             print(f"保存配置文件时出错: {e}")
         
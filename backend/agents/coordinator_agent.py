@@ -1,6 +1,7 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Set
 from datetime import datetime
 import asyncio
+import json
 import logging
 import sys
 import os
@@ -8,8 +9,13 @@ import os
 # 添加父目录到 Python 路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.agent import Agent, AgentState
+from core.agent import Agent, AgentOverloadedError, AgentState
 from core.blackboard import Blackboard
+from core.registry import CapabilityRegistry, DispatchStrategy
+from core.router import KeywordRouter
+from core.semantic_router import SemanticRouter
+from core.task_tracker import TaskTracker
+from core.task_queue import TaskPriority
 
 logger = logging.getLogger(__name__)
 
@@ -21,48 +27,82 @@ class CoordinatorAgent(Agent):
         super().__init__(agent_id, blackboard)
         self.agents: Dict[str, Agent] = {}
         self.tasks: List[Dict[str, Any]] = []
-        self._stop_event = asyncio.Event()
+        # 健康检查与任务分发分开：分发由任务事件驱动，健康检查低频运行
+        self.monitor_interval = 5.0
+        self._monitor_task: Optional[asyncio.Task] = None
+        self._routing: Set[asyncio.Task] = set()
+        # 上一次写入黑板的 (state, error)，只在有变化时重新发布 agent_status
+        self._published_status: Optional[Dict[str, Any]] = None
+        # 任务结果只需保留一段时间，避免黑板无限增长
+        self.task_result_ttl = 3600
+        self.blackboard.set_ttl("task_result_", self.task_result_ttl)
+        # 通过 new_task 提交的任务：task_id -> future，结果写入 task_result_{task_id}
+        self.task_tracker = TaskTracker(blackboard, agent_id=agent_id)
+        # agent_id -> 注册时声明的能力
+        self.capabilities: Dict[str, List[str]] = {}
+        # 路由规则来自 config.json 的 routing 部分；关键词没有命中时再尝试语义路由（需要 NumPy）
+        routing_config = self._load_routing_config()
+        self.router = KeywordRouter.from_config(routing_config)
+        self.semantic_router = SemanticRouter.from_config(routing_config)
+        # 路由目标可以是 agent_id 或能力名；同一能力的多个副本按实时负载分派
+        strategy = (routing_config.get("routing") or {}).get("dispatch_strategy", DispatchStrategy.LEAST_OUTSTANDING)
+        self.registry = CapabilityRegistry(strategy)
+
+    async def start(self) -> None:
+        """启动任务分发循环和健康监控."""
+        await super().start()
+        if self._monitor_task is None or self._monitor_task.done():
+            self._monitor_task = asyncio.create_task(self._health_loop())
 
     async def run(self) -> None:
-        """主执行循环."""
+        """任务分发循环：空闲时阻塞等待，任务一发布就立即路由."""
         while not self._stop_event.is_set():
             try:
-                # 检查黑板上是否有新任务
-                task = await self.blackboard.get_task()
+                task = await self.wait_for_task()
                 if task:
-                    await self.route_task(task)
-                
-                # 检查各个 Agent 的状态
-                await self.check_agents()
-                
-                # 监控所有 Agent 的状态
-                await self.monitor_agents()
-                
-                # 等待一段时间再继续下一次循环
-                await asyncio.sleep(1)
-                
+                    # 每个任务单独路由，慢 Agent 不会挡住后面的任务
+                    routing = asyncio.create_task(self.route_task(task))
+                    self._routing.add(routing)
+                    routing.add_done_callback(self._routing.discard)
             except Exception as e:
                 logger.error(f"Error in coordinator run loop: {str(e)}")
                 self.state = AgentState.ERROR
                 await asyncio.sleep(5)  # 出错后等待一段时间再继续
 
+    async def _health_loop(self) -> None:
+        """低频健康监控：重启出错的 Agent，并在状态变化时发布 agent_status."""
+        while not self._stop_event.is_set():
+            try:
+                await self.check_agents()
+                await self.monitor_agents()
+            except Exception as e:
+                logger.error(f"Error in coordinator health monitor: {str(e)}")
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=self.monitor_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _load_routing_config(self) -> Dict[str, Any]:
+        """读取 config.json；文件不可用时使用默认路由规则."""
+        try:
+            with open("config.json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load routing config: {str(e)}")
+            return {}
+
     async def analyze_task(self, task: Dict[str, Any]) -> str:
         """分析任务，决定使用哪个 Agent."""
         logger.info(f"Analyzing task: {task}")
         
-        # 获取任务内容
-        content = task.get("question", "").lower()
-        topic = task.get("topic", "").lower()
-        
-        # 根据内容和主题选择合适的 Agent
-        if "faq" in content or "常见问题" in content or topic == "system_faq":
-            return "faq_generator"  # FAQ 生成器
-        elif "搜索" in content or "查找" in content or topic == "search":
-            return "knowledge_crawler"  # 知识爬虫
-        elif "测试" in content or "quiz" in content or "考试" in content or topic == "quiz":
-            return "quiz_generator"  # 测试生成器
-        else:
-            return "teacher_agent"  # 教师 Agent
+        # 根据内容和主题选择合适的 Agent（关键词规则一次扫描完成匹配）
+        question = task.get("question") or ""
+        agent_id = self.router.match(question, task.get("topic") or "")
+        if agent_id is None and self.semantic_router is not None:
+            # 关键词没有命中的改写问题按与各 Agent 示例问题的相似度路由
+            agent_id, score = await self.semantic_router.classify(question)
+            logger.info(f"Semantic route: {agent_id} ({score:.2f})")
+        return agent_id or self.router.default_agent
 
     async def route_task(self, task: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """根据任务类型路由到相应的 Agent."""
@@ -74,8 +114,8 @@ class CoordinatorAgent(Agent):
             logger.info(f"Task content: {task.get('content')}")
             logger.info(f"Task type: {task.get('type')}")
             
-            agent = self.agents.get(agent_id)
-            if not agent:
+            candidates = self.registry.candidates(agent_id)
+            if not candidates:
                 logger.warning(f"Agent {agent_id} not found")
                 return {
                     "type": "error",
@@ -83,17 +123,25 @@ class CoordinatorAgent(Agent):
                     "agent_id": self.agent_id
                 }
             
-            # 处理任务
-            response = await agent.process_message(task)
-            logger.info(f"Agent {agent_id} response: {response}")
+            # 处理任务（遵守目标 Agent 的并发上限）；选中的副本收件箱已满时换下一个负载最低的副本
+            for agent in candidates:
+                try:
+                    response = await agent.submit(task)
+                    break
+                except AgentOverloadedError as e:
+                    overloaded = e
+            else:
+                raise overloaded
+            logger.info(f"Agent {agent.agent_id} response: {response}")
             
-            if response:
+            # 有 task_id 的任务由 task_tracker 发布到 task_result_{task_id}
+            if response and not task.get("task_id"):
                 # 记录任务处理结果
                 await self.blackboard.write(
                     key=f"task_result_{task.get('student_id')}_{datetime.now().isoformat()}",
                     value=response,
                     agent_id=self.agent_id,
-                    metadata={"task_type": task.get("type"), "agent_id": agent_id}
+                    metadata={"task_type": task.get("type"), "agent_id": agent.agent_id}
                 )
             
             return response
@@ -106,8 +154,8 @@ class CoordinatorAgent(Agent):
                 "agent_id": self.agent_id
             }
 
-    async def monitor_agents(self) -> None:
-        """监控所有 Agent 的状态."""
+    async def monitor_agents(self, force: bool = False) -> None:
+        """监控所有 Agent 的状态；只有状态或错误变化（或 force）时才写入黑板."""
         try:
             status = {}
             for agent_id, agent in self.agents.items():
@@ -117,6 +165,12 @@ class CoordinatorAgent(Agent):
                     "error": agent.last_error if hasattr(agent, 'last_error') else None
                 }
             
+            # last_active 每次动作都会变，不算作状态变化
+            fingerprint = {agent_id: (s["state"], s["error"]) for agent_id, s in status.items()}
+            if not force and fingerprint == self._published_status:
+                return
+            self._published_status = fingerprint
+
             # 将状态信息写入黑板
             await self.blackboard.write(
                 key="agent_status",
@@ -135,8 +189,25 @@ class CoordinatorAgent(Agent):
             if message_type == "task":
                 return await self.route_task(message)
             elif message_type == "status":
-                await self.monitor_agents()
+                await self.monitor_agents(force=True)
                 return {"type": "status", "content": "Status updated"}
+            elif message_type == "new_task":
+                try:
+                    tracked = self.submit_task(message)
+                except ValueError as e:
+                    return {"type": "error", "content": str(e), "task_id": message.get("task_id")}
+                return {"type": "task_accepted", "task_id": tracked.task_id}
+            elif message_type == "cancel_task":
+                cancelled = self.task_tracker.cancel(message.get("task_id", ""))
+                return {"type": "task_cancelled", "task_id": message.get("task_id"), "cancelled": cancelled}
+            elif message_type == "register_agent":
+                # 只有 Agent 实例才能被分派任务；只带 agent_id 的注册会让它永远收不到任务
+                agent = message.get("agent")
+                if agent is None:
+                    return {"type": "error", "content": "register_agent requires an agent instance",
+                            "agent_id": message.get("agent_id")}
+                await self.register_agent(agent, list(message.get("capabilities", [])))
+                return {"type": "agent_registered", "agent_id": agent.agent_id}
             else:
                 logger.warning(f"Unknown message type: {message_type}")
                 return None
@@ -144,6 +215,34 @@ class CoordinatorAgent(Agent):
             logger.error(f"Error processing message: {str(e)}")
             return None
 
+    def submit_task(self, message: Dict[str, Any]):
+        """把 new_task 消息转换为路由任务并交给 task_tracker 跟踪，立即返回.
+
+        task_id 已在跟踪中时抛出 ValueError（在创建协程之前检查）。
+        """
+        data = message.get("data", {})
+        task_id = message.get("task_id") or self.task_tracker.new_task_id()
+        if self.task_tracker.get(task_id) is not None:
+            raise ValueError(f"Task {task_id} already exists")
+        task = {
+            "type": message.get("task_type", "task"),
+            "task_id": task_id,
+            "question": data.get("content", ""),
+            "content": data.get("content", ""),
+            "topic": data.get("topic") or "",
+            "student_id": data.get("sender_id"),
+            "priority": message.get("priority", TaskPriority.MEDIUM),
+            "timestamp": data.get("timestamp", datetime.now().isoformat())
+        }
+
+        async def run() -> Optional[Dict[str, Any]]:
+            response = await self.route_task(task)
+            if response and response.get("type") == "error":
+                raise RuntimeError(response.get("content"))
+            return response
+
+        return self.task_tracker.submit(run(), task_id=task_id, timeout=message.get("timeout"))
+
     async def handle_question(self, task: Dict[str, Any]) -> None:
         """处理问题任务."""
         question = task.get("content")
@@ -214,10 +313,12 @@ class CoordinatorAgent(Agent):
         except Exception as e:
             logger.error(f"Error restarting agent {agent_id}: {str(e)}")
 
-    async def register_agent(self, agent: Agent) -> None:
-        """注册一个 Agent."""
+    async def register_agent(self, agent: Agent, capabilities: Optional[List[str]] = None) -> None:
+        """注册一个 Agent；声明了相同能力的 Agent 组成副本池."""
         try:
             self.agents[agent.agent_id] = agent
+            self.capabilities[agent.agent_id] = list(capabilities or [])
+            self.registry.register(agent, self.capabilities[agent.agent_id])
             logger.info(f"Agent {agent.agent_id} registered with coordinator")
             logger.info(f"Current agents: {list(self.agents.keys())}")
         except Exception as e:
@@ -228,6 +329,8 @@ class CoordinatorAgent(Agent):
         """注销一个 Agent."""
         if agent_id in self.agents:
             del self.agents[agent_id]
+            self.capabilities.pop(agent_id, None)
+            self.registry.unregister(agent_id)
             logger.info(f"Agent {agent_id} unregistered")
 
     async def broadcast_message(self, message: Dict[str, Any]) -> None:
@@ -251,7 +354,15 @@ class CoordinatorAgent(Agent):
 
     async def stop(self) -> None:
         """停止协调者 Agent."""
-        self._stop_event.set()
+        # 先停分发循环（基类负责设置停止事件并把状态改回 IDLE），健康监控随停止事件退出
+        await super().stop()
+        if self._monitor_task and not self._monitor_task.done():
+            await self._monitor_task
+        routing = list(self._routing)
+        for task in routing:
+            task.cancel()
+        await asyncio.gather(*routing, return_exceptions=True)
+        await self.task_tracker.close()
         # 停止所有 Agent
         for agent in self.agents.values():
             await agent.stop()
@@ -1,9 +1,17 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import json
+import os
 import aiohttp
 
+from tools.topic_crawler import CrawlMetrics, KnowledgeStore, TopicCrawler
+
 class CrawlerAgent:
-    def __init__(self):
+    def __init__(self, store: Optional[KnowledgeStore] = None, config_path: str = "config.json"):
         self.session = None
+        self.store = store or KnowledgeStore(os.environ.get("KNOWLEDGE_STORE_PATH", "data/knowledge.jsonl"))
+        self.crawler = TopicCrawler(self.store)
+        self.config_path = config_path
+        self.last_metrics: Optional[CrawlMetrics] = None
         
     async def initialize(self):
         """Initialize aiohttp session"""
@@ -17,8 +25,11 @@ class CrawlerAgent:
             
     async def search_educational_resources(self, topic: str) -> List[Dict[str, Any]]:
         """Search and collect educational resources from trusted sources"""
-        # Implementation will search educational websites and databases
-        pass
+        with open(self.config_path, "r", encoding="utf-8") as f:
+            topic_config = json.load(f).get("topic_config", {}).get(topic, {})
+        keywords = topic_config.get("keywords", [])
+        self.last_metrics = await self.crawler.crawl(topic, topic_config.get("target_websites", []), keywords)
+        return await self.store.search(" ".join(keywords) or topic, topic=topic, limit=20)
         
     async def validate_content(self, content: Dict[str, Any]) -> bool:
         """Validate educational content for accuracy and appropriateness"""
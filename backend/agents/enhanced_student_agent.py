@@ -39,9 +39,8 @@ class EnhancedStudentAgent(Agent):
         self.current_topic: Optional[str] = None
         self.student_state = StudentState.LISTENING
         self.last_interaction_time = datetime.now()
-        
-        # Initialize student model
-        self._initialize_student_model()
+        # The student model is loaded from the blackboard on first use (it needs the event loop)
+        self._model_initialized = False
 
     async def _initialize_student_model(self):
         """Initialize or load student model from blackboard"""
@@ -66,32 +65,58 @@ class EnhancedStudentAgent(Agent):
             logger.error(f"Error initializing student model: {str(e)}")
             raise
 
+    async def _ensure_student_model(self):
+        if not self._model_initialized:
+            await self._initialize_student_model()
+            self._model_initialized = True
+
     async def run(self) -> None:
         """Main execution loop"""
         try:
+            await self._ensure_student_model()
+
             # Check for teacher responses
             teacher_response = await self.read_from_blackboard(f"teacher_response_{self.agent_id}")
             if teacher_response:
                 await self._process_teacher_response(teacher_response)
 
-            # Update student state based on context
-            await self._update_student_state()
-            
-            # Execute state-specific actions
-            await self._execute_student_actions()
-            
-            # Update last interaction time
-            self.last_interaction_time = datetime.now()
+            await self._advance_learning()
             
         except Exception as e:
             logger.error(f"Error in student agent run loop: {str(e)}")
             self.state = AgentState.ERROR
 
+    async def _advance_learning(self):
+        """Update the student state from context and run its actions (ask, practice, reflect)"""
+        await self._update_student_state()
+        await self._execute_student_actions()
+        self.last_interaction_time = datetime.now()
+
+    async def on_scheduled(self) -> None:
+        """Wake up on teacher responses and interaction history changes instead of polling.
+
+        Scheduled agents never call run(), so both wake-ups also advance the student state.
+        """
+        await self._ensure_student_model()
+        await self.wake_on(
+            f"teacher_response_{self.agent_id}",
+            lambda entry: {**entry.value, "role": "teacher"}
+        )
+        await self.wake_on(
+            f"interaction_history_{self.agent_id}",
+            lambda entry: {"type": "interaction_update"}
+        )
+
     async def process_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Process incoming message"""
         try:
             if message.get("role") == "teacher":
-                return await self._process_teacher_response(message)
+                result = await self._process_teacher_response(message)
+                await self._advance_learning()
+                return result
+            elif message.get("type") == "interaction_update":
+                await self._advance_learning()
+                return None
             else:
                 logger.warning(f"Received message from unknown role: {message.get('role')}")
                 return None
@@ -163,11 +188,16 @@ class EnhancedStudentAgent(Agent):
             # Extract knowledge points from teacher's response
             knowledge_points = self._extract_knowledge_points(teacher_response)
             
-            # Update knowledge in student model
-            current_model = await self.read_from_blackboard(f"student_model_{self.agent_id}")
-            if current_model:
-                current_model["knowledge_points"] = current_model.get("knowledge_points", []) + knowledge_points
-                await self.write_to_blackboard(f"student_model_{self.agent_id}", current_model)
+            # Update knowledge in student model without losing concurrent updates
+            def add_points(current_model):
+                if not current_model:
+                    return None
+                return {
+                    **current_model,
+                    "knowledge_points": current_model.get("knowledge_points", []) + knowledge_points
+                }
+
+            await self.update_on_blackboard(f"student_model_{self.agent_id}", add_points)
                 
         except Exception as e:
             logger.error(f"Error updating knowledge: {str(e)}")
@@ -236,10 +266,11 @@ class EnhancedStudentAgent(Agent):
     async def _update_student_model(self, updates: Dict[str, Any]):
         """Update student model on blackboard"""
         try:
-            current_model = await self.read_from_blackboard(f"student_model_{self.agent_id}")
-            if current_model:
-                current_model.update(updates)
-                current_model["last_updated"] = datetime.now().isoformat()
-                await self.write_to_blackboard(f"student_model_{self.agent_id}", current_model)
+            def apply_updates(current_model):
+                if not current_model:
+                    return None
+                return {**current_model, **updates, "last_updated": datetime.now().isoformat()}
+
+            await self.update_on_blackboard(f"student_model_{self.agent_id}", apply_updates)
         except Exception as e:
             logger.error(f"Error updating student model: {str(e)}")
@@ -23,9 +23,16 @@ class TeacherAgentState(Enum):
     COLLABORATING = "collaborating"
 
 class EnhancedTeacherAgent(Agent):
-    def __init__(self, agent_id: str, blackboard: Blackboard):
+    # Per-message state lives in locals, so one teacher can serve many students at once
+    max_concurrency = 64
+
+    def __init__(self, agent_id: str, blackboard: Blackboard, poll_blackboard: bool = True):
         super().__init__(agent_id, blackboard)
         
+        # Only one replica should poll student_messages and run the teaching-state actions;
+        # the others are dispatch-only and serve what the coordinator submits to them
+        self.poll_blackboard = poll_blackboard
+        
         # Initialize ModelScope integration
         self.modelscope_api_key = os.environ.get("MODELSCOPE_API_KEY")
         self.model_config = QwenConfig(
@@ -36,9 +43,8 @@ class EnhancedTeacherAgent(Agent):
         # Initialize models
         self._initialize_models()
         
-        # Initialize teaching state
-        self.current_topic = None
-        self.current_student_id = None
+        # Initialize teaching state (written only by the serial run loop, never by process_message)
+        self._last_student_id = None
         self.teaching_state = TeacherAgentState.PLANNING
         
         # Load configuration
@@ -97,21 +103,30 @@ class EnhancedTeacherAgent(Agent):
 
     async def run(self) -> None:
         """Main execution loop"""
+        if not self.poll_blackboard:
+            # Dispatch-only replica: messages arrive through submit(), nothing to poll
+            await self._stop_event.wait()
+            return
         try:
             # Check for new messages on the blackboard
             messages = await self.read_from_blackboard("student_messages")
             if messages:
-                for message in messages:
-                    response = await self.process_message(message)
-                    if response:
-                        await self.write_to_blackboard(
-                            f"teacher_response_{message['student_id']}",
-                            response,
-                            metadata={"topic": self.current_topic}
-                        )
-
-            # Update teaching state based on current context
-            await self._update_teaching_state()
+                # Handle the batch in parallel, up to max_concurrency at a time
+                results = await asyncio.gather(*(self.submit(message) for message in messages),
+                                               return_exceptions=True)
+                # Group responses by their own message's topic so each keeps the right metadata
+                responses_by_topic: Dict[Optional[str], Dict[str, Any]] = {}
+                for message, response in zip(messages, results):
+                    if response and not isinstance(response, BaseException):
+                        responses_by_topic.setdefault(message.get("topic"), {})[
+                            f"teacher_response_{message['student_id']}"] = response
+                # Publish each topic's responses in one batch and one subscriber dispatch pass
+                for topic, responses in responses_by_topic.items():
+                    await self.write_many_to_blackboard(responses, metadata={"topic": topic})
+                self._last_student_id = messages[-1].get("student_id")
+
+            # Update teaching state based on the last student served
+            await self._update_teaching_state(self._last_student_id)
             
             # Perform state-specific actions
             await self._execute_teaching_actions()
@@ -123,25 +138,25 @@ class EnhancedTeacherAgent(Agent):
     async def process_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Process incoming student message"""
         try:
-            self.current_student_id = message.get("student_id")
-            self.current_topic = message.get("topic")
+            # Concurrent messages must not share instance fields; keep the request context local
+            student_id = message.get("student_id")
             
             # Update student model
-            await self._update_student_model(message)
+            student_model = await self._update_student_model(message, student_id)
             
             # Generate response based on teaching state
-            response = await self._generate_response(message)
+            response = await self._generate_response(message, student_model)
             
             return response
         except Exception as e:
             logger.error(f"Error processing message: {str(e)}")
             return {"error": str(e)}
 
-    async def _update_teaching_state(self):
-        """Update teaching state based on context"""
+    async def _update_teaching_state(self, student_id: Optional[str]):
+        """Update teaching state based on the given student's progress"""
         try:
             # Read student progress from blackboard
-            progress = await self.read_from_blackboard(f"student_progress_{self.current_student_id}")
+            progress = await self.read_from_blackboard(f"student_progress_{student_id}")
             
             if not progress:
                 self.teaching_state = TeacherAgentState.PLANNING
@@ -170,7 +185,7 @@ class EnhancedTeacherAgent(Agent):
         except Exception as e:
             logger.error(f"Error executing teaching actions: {str(e)}")
 
-    async def _update_student_model(self, message: Dict[str, Any]):
+    async def _update_student_model(self, message: Dict[str, Any], student_id: Optional[str] = None):
         """Update the student model based on interaction"""
         try:
             # Assess learning style
@@ -179,17 +194,22 @@ class EnhancedTeacherAgent(Agent):
             # Assess knowledge level
             knowledge_level = await self._assess_knowledge_level(message)
             
-            # Update student model on blackboard
-            await self.write_to_blackboard(
-                f"student_model_{self.current_student_id}",
-                {
-                    "learning_style": learning_style,
-                    "knowledge_level": knowledge_level,
-                    "last_update": datetime.now().isoformat()
-                }
+            # Merge into the model the student agent maintains (knowledge_points, created_at, ...)
+            # with compare-and-set, so concurrent updates from either side are not lost
+            updates = {
+                "learning_style": learning_style,
+                "knowledge_level": knowledge_level,
+                "last_update": datetime.now().isoformat()
+            }
+            if student_id is None:
+                student_id = message.get("student_id")
+            return await self.update_on_blackboard(
+                f"student_model_{student_id}",
+                lambda current: {**(current or {}), **updates}
             )
         except Exception as e:
             logger.error(f"Error updating student model: {str(e)}")
+            return None
 
     async def _assess_learning_style(self, message: Dict[str, Any]) -> str:
         """Assess student's learning style"""
@@ -201,17 +221,20 @@ class EnhancedTeacherAgent(Agent):
         # Implementation using self.knowledge_assessment_model
         return "intermediate"  # Placeholder
 
-    async def _generate_response(self, message: Dict[str, Any]) -> Dict[str, Any]:
+    async def _generate_response(self, message: Dict[str, Any],
+                                 student_model: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Generate response based on teaching state and student model"""
         try:
-            student_model = await self.read_from_blackboard(f"student_model_{self.current_student_id}")
+            # The model was just written by _update_student_model; only re-read it if missing
+            if student_model is None:
+                student_model = await self.read_from_blackboard(f"student_model_{message.get('student_id')}")
             
             # Prepare context for response generation
             context = {
                 "message": message,
                 "student_model": student_model,
                 "teaching_state": self.teaching_state,
-                "topic": self.current_topic
+                "topic": message.get("topic")
             }
             
             # Generate response using main model
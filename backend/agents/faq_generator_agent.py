@@ -3,38 +3,26 @@ from datetime import datetime
 import logging
 import sys
 import os
-import asyncio
 
 # 添加父目录到 Python 路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.agent import Agent, AgentState
+from core.agent import InboxAgent
 from core.blackboard import Blackboard
 
 logger = logging.getLogger(__name__)
 
-class FAQGeneratorAgent(Agent):
+class FAQGeneratorAgent(InboxAgent):
     """FAQ 生成器 Agent，负责生成常见问题解答."""
 
+    # faqs 的检查和追加之间没有 await，并行处理不会丢失条目
+    max_concurrency = 64
+
     def __init__(self, agent_id: str = "faq_generator_1", blackboard: Optional[Blackboard] = None):
         """初始化 FAQ 生成器 Agent."""
         super().__init__(agent_id, blackboard or Blackboard())
         self.faqs: Dict[str, List[Dict[str, Any]]] = {}
 
-    async def run(self) -> None:
-        """主执行循环."""
-        while not self._stop_event.is_set():
-            try:
-                # 检查黑板上是否有新任务
-                task = await self.blackboard.get_task()
-                if task:
-                    await self.process_message(task)
-                await asyncio.sleep(1)
-            except Exception as e:
-                logger.error(f"Error in FAQ generator run loop: {str(e)}")
-                self.state = AgentState.ERROR
-                await asyncio.sleep(5)
-
     async def process_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """处理消息."""
         try:
@@ -2,45 +2,65 @@
 
 from typing import Dict, Any, Optional, List
 from datetime import datetime
+import json
 import logging
 import sys
 import os
-import asyncio
 
 # 添加父目录到 Python 路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.agent import Agent, AgentState
+from core.agent import InboxAgent
 from core.blackboard import Blackboard
+from tools.topic_crawler import KnowledgeStore, TopicCrawler
 
 logger = logging.getLogger(__name__)
 
-class KnowledgeCrawlerAgent(Agent):
+class KnowledgeCrawlerAgent(InboxAgent):
     """知识爬虫 Agent."""
 
+    # 一次爬取可能持续数秒，不能让它挡住其他提问；对话历史只追加
+    max_concurrency = 64
+
     def __init__(self, blackboard: Blackboard, agent_id: str = "crawler_1"):
         """初始化知识爬虫 Agent."""
         super().__init__(agent_id, blackboard)
         self.conversation_history = []
+        self.topic_config = self._load_topic_config()
+        self.knowledge_store = KnowledgeStore(os.environ.get("KNOWLEDGE_STORE_PATH", "data/knowledge.jsonl"))
+        self.crawler = TopicCrawler(self.knowledge_store)
 
-    async def run(self) -> None:
-        """Agent 的主循环."""
-        self.state = AgentState.RUNNING
+    def _load_topic_config(self) -> Dict[str, Any]:
+        """读取 config.json 中每个主题的 keywords 和 target_websites."""
         try:
-            while self.state == AgentState.RUNNING:
-                # 从黑板获取任务
-                task = await self.blackboard.get_task()
-                if task:
-                    await self.process_message(task)
-                await asyncio.sleep(1)
-        except Exception as e:
-            logger.error(f"Error in run loop: {str(e)}")
-            self.state = AgentState.ERROR
-            await asyncio.sleep(5)
+            with open("config.json", "r", encoding="utf-8") as f:
+                return json.load(f).get("topic_config", {})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load topic config: {str(e)}")
+            return {}
+
+    async def crawl_topic(self, topic: str) -> Dict[str, Any]:
+        """爬取一个主题的目标网站并写入知识库，返回吞吐量统计."""
+        config = self.topic_config.get(topic)
+        if not config:
+            raise ValueError(f"Unknown topic: {topic}")
+        metrics = await self.crawler.crawl(topic, config.get("target_websites", []),
+                                           config.get("keywords", []))
+        result = metrics.to_dict()
+        await self.write_to_blackboard(f"crawl_metrics_{topic}", result)
+        return result
 
     async def process_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """处理一条消息并返回回复."""
         try:
+            if message.get("type") == "crawl":
+                metrics = await self.crawl_topic(message.get("topic", ""))
+                return {
+                    "type": "crawl_result",
+                    "content": metrics,
+                    "agent_id": self.agent_id
+                }
+
             # 从消息中获取内容
             content = message.get("content", "")
             
@@ -51,8 +71,12 @@ class KnowledgeCrawlerAgent(Agent):
                 "timestamp": datetime.now()
             })
             
-            # 生成回复
-            response = self.generate_response(content)
+            # 先在本地知识库中查找，找不到时再用默认回复
+            chunks = await self.knowledge_store.search(content, topic=message.get("topic"))
+            if chunks:
+                response = "\n\n".join(f"{chunk['text']}\n（来源：{chunk['url']}）" for chunk in chunks)
+            else:
+                response = self.generate_response(content)
             
             # 记录回复
             self.conversation_history.append({
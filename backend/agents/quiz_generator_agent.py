@@ -5,39 +5,26 @@ from datetime import datetime
 import logging
 import sys
 import os
-import asyncio
 
 # 添加父目录到 Python 路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.agent import Agent, AgentState
+from core.agent import InboxAgent
 from core.blackboard import Blackboard
 
 logger = logging.getLogger(__name__)
 
-class QuizGeneratorAgent(Agent):
+class QuizGeneratorAgent(InboxAgent):
     """测验生成器 Agent."""
 
+    # 生成回复不依赖实例状态（对话历史只追加），并发请求互不影响
+    max_concurrency = 64
+
     def __init__(self, blackboard: Blackboard, agent_id: str = "quiz_1"):
         """初始化测验生成器 Agent."""
         super().__init__(agent_id, blackboard)
         self.conversation_history = []
 
-    async def run(self) -> None:
-        """Agent 的主循环."""
-        self.state = AgentState.RUNNING
-        try:
-            while self.state == AgentState.RUNNING:
-                # 从黑板获取任务
-                task = await self.blackboard.get_task()
-                if task:
-                    await self.process_message(task)
-                await asyncio.sleep(1)
-        except Exception as e:
-            logger.error(f"Error in run loop: {str(e)}")
-            self.state = AgentState.ERROR
-            await asyncio.sleep(5)
-
     async def process_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """处理一条消息并返回回复."""
         try:
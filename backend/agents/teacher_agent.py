@@ -3,38 +3,26 @@ from datetime import datetime
 import logging
 import sys
 import os
-import asyncio
 
 # 添加父目录到 Python 路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.agent import Agent, AgentState
+from core.agent import InboxAgent
 from core.blackboard import Blackboard
 
 logger = logging.getLogger(__name__)
 
-class TeacherAgent(Agent):
+class TeacherAgent(InboxAgent):
     """教师 Agent."""
 
+    # 对话历史只追加，其余状态都在局部变量中，可以同时回答多个学生
+    max_concurrency = 64
+
     def __init__(self, agent_id: str = "teacher_1", blackboard: Optional[Blackboard] = None):
         """初始化教师 Agent."""
         super().__init__(agent_id, blackboard or Blackboard())
         self.conversation_history = []
 
-    async def run(self) -> None:
-        """主执行循环."""
-        while not self._stop_event.is_set():
-            try:
-                # 检查黑板上是否有新消息
-                message = await self.blackboard.get_task()
-                if message:
-                    await self.process_message(message)
-                await asyncio.sleep(1)
-            except Exception as e:
-                logger.error(f"Error in teacher run loop: {str(e)}")
-                self.state = AgentState.ERROR
-                await asyncio.sleep(5)
-
     async def process_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """处理一条消息并返回回复."""
         try:
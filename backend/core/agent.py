@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
-from .blackboard import Blackboard
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from collections import deque
+from .blackboard import Blackboard, BlackboardEntry
+from .subscription import OverflowPolicy, Subscription
 import asyncio
 import logging
 from datetime import datetime
@@ -16,7 +18,20 @@ class AgentState:
     WRITING = "writing"
     READING = "reading"
 
+class AgentOverloadedError(RuntimeError):
+    """Raised by Agent.submit() when the agent's inbox is full"""
+
+
 class Agent(ABC):
+    # Messages processed in parallel; agents that keep per-message state on
+    # the instance must leave this at 1
+    max_concurrency: int = 1
+    # Messages waiting for a free slot before submit() fails; 0 means unbounded
+    max_inbox: int = 1000
+    # Pause between run() calls for single-step polling agents; a run() that waited for
+    # input through wait_for_task() is restarted immediately
+    poll_interval: float = 0.1
+
     def __init__(self, agent_id: str, blackboard: Blackboard):
         self.agent_id = agent_id
         self.blackboard = blackboard
@@ -25,6 +40,16 @@ class Agent(ABC):
         self._stop_event = asyncio.Event()
         self.knowledge_base: Dict[str, Any] = {}
         self.last_action_time = datetime.now()
+        self.last_error: Optional[str] = None
+        # Inbox of (message, result future); drained by an AgentScheduler when the
+        # agent is scheduled, otherwise by tasks started from _dispatch()
+        self._scheduler: Optional["AgentScheduler"] = None
+        self._inbox: Deque[Tuple[Dict[str, Any], Optional[asyncio.Future]]] = deque()
+        self._scheduled = False
+        self._active = 0
+        self._wake_subscriptions: List[Subscription] = []
+        # Incremented by wait_for_task(); tells _run_loop whether run() blocked for input
+        self._task_waits = 0
 
     @abstractmethod
     async def run(self) -> None:
@@ -46,6 +71,8 @@ class Agent(ABC):
 
     async def stop(self) -> None:
         """Stop the agent"""
+        if self._scheduler is not None:
+            await self._scheduler.remove(self)
         if self._task and not self._task.done():
             self._stop_event.set()
             await self._task
@@ -62,42 +89,175 @@ class Agent(ABC):
         if self.state == AgentState.PAUSED:
             self.state = AgentState.RUNNING
             logger.info(f"Agent {self.agent_id} resumed")
+            if self._scheduler is not None:
+                if self._inbox:
+                    self._scheduler.notify(self)
+            else:
+                self._dispatch()
 
     async def _run_loop(self) -> None:
         """Internal run loop"""
         try:
             while not self._stop_event.is_set():
                 if self.state == AgentState.RUNNING:
+                    waits = self._task_waits
                     await self.run()
                     self.last_action_time = datetime.now()
-                elif self.state == AgentState.PAUSED:
-                    await asyncio.sleep(1)
-                await asyncio.sleep(0.1)  # Prevent CPU overload
+                    # Back off only if run() polled instead of waiting for work
+                    if self._task_waits == waits:
+                        await self._wait_stopped(self.poll_interval)
+                else:
+                    # Paused or errored: wait to be resumed / restarted, but stop promptly
+                    await self._wait_stopped(1)
         except Exception as e:
             self.state = AgentState.ERROR
             logger.error(f"Error in agent {self.agent_id}: {str(e)}")
             raise
 
-    async def read_from_blackboard(self, key: str) -> Any:
-        """Read data from the blackboard"""
-        self.state = AgentState.READING
+    async def _wait_stopped(self, timeout: float) -> None:
+        """Sleep for up to `timeout` seconds, returning early when stop() is called"""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def deliver(self, message: Dict[str, Any]) -> None:
+        """Queue a message without waiting for its result"""
+        self._enqueue(message, None)
+
+    async def submit(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Queue a message and wait for process_message's result.
+
+        Up to max_concurrency messages run in parallel; raises AgentOverloadedError
+        when max_inbox messages are already waiting.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(message, future)
+        return await future
+
+    def _enqueue(self, message: Dict[str, Any], future: Optional[asyncio.Future]) -> None:
+        if self.max_inbox and len(self._inbox) >= self.max_inbox:
+            raise AgentOverloadedError(f"Agent {self.agent_id} has {len(self._inbox)} pending messages")
+        self._inbox.append((message, future))
+        if self._scheduler is not None:
+            self._scheduler.notify(self)
+        else:
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._inbox and self._active < self.max_concurrency and self.state != AgentState.PAUSED:
+            message, future = self._inbox.popleft()
+            self._active += 1
+            asyncio.create_task(self._handle(message, future)).add_done_callback(self._on_handled)
+
+    def _on_handled(self, _task: asyncio.Task) -> None:
+        self._active -= 1
+        if self._scheduler is None:
+            self._dispatch()
+
+    async def _handle(self, message: Dict[str, Any], future: Optional[asyncio.Future]) -> None:
+        """Run process_message for one inbox item and resolve its future"""
+        if future is not None and future.cancelled():
+            # The submitter gave up (timeout or cancellation) before a slot freed up
+            return
+        try:
+            result = await self.process_message(message)
+            self.last_action_time = datetime.now()
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Error processing message in agent {self.agent_id}: {str(e)}")
+            if future is not None and not future.done():
+                future.set_exception(e)
+            return
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    async def wake_on(self, key: str, to_message: Optional[Callable[[BlackboardEntry], Dict[str, Any]]] = None) -> None:
+        """Deliver a message to this agent whenever `key` is written on the blackboard"""
+        def default_message(entry: BlackboardEntry) -> Dict[str, Any]:
+            return {"type": "blackboard_update", "key": entry.key, "value": entry.value,
+                    "agent_id": entry.agent_id}
+
+        convert = to_message or default_message
+
+        async def on_update(entry: BlackboardEntry) -> None:
+            if self._scheduler is not None:
+                self.deliver(convert(entry))
+
+        subscription = await self.blackboard.subscribe(key, on_update, overflow=OverflowPolicy.COALESCE_LATEST)
+        self._wake_subscriptions.append(subscription)
+
+    async def on_scheduled(self) -> None:
+        """Hook called when an AgentScheduler takes over the agent (e.g. to call wake_on)"""
+        pass
+
+    def pending_messages(self) -> int:
+        """Number of messages waiting in the agent's inbox"""
+        return len(self._inbox)
+
+    def load(self) -> int:
+        """Outstanding requests (in flight plus queued); used for load-aware dispatch"""
+        return self._active + len(self._inbox)
+
+    async def wait_for_task(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Block until a task is posted to the blackboard or the agent is stopped.
+
+        Returns None on timeout or when stop() was requested.
+        """
+        if self._stop_event.is_set():
+            return None
+        self._task_waits += 1
+        get_task = asyncio.ensure_future(self.blackboard.wait_for_task())
+        stopped = asyncio.ensure_future(self._stop_event.wait())
         try:
-            entry = await self.blackboard.read(key)
-            return entry.value if entry else None
+            await asyncio.wait({get_task, stopped}, timeout=timeout,
+                               return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            # Cancelled (e.g. by a restart) right after a task was dequeued: hand it back
+            if get_task.done() and not get_task.cancelled() and get_task.exception() is None \
+                    and get_task.result() is not None:
+                self.blackboard.requeue_task(get_task.result())
+            raise
         finally:
-            self.state = AgentState.RUNNING
+            stopped.cancel()
+            if not get_task.done():
+                get_task.cancel()
+        if get_task.done() and not get_task.cancelled():
+            return get_task.result()
+        return None
+
+    # These helpers run inside concurrently processed messages, so they must not touch the
+    # shared self.state (restoring RUNNING afterwards would un-pause a paused agent)
+    async def read_from_blackboard(self, key: str) -> Any:
+        """Read data from the blackboard"""
+        entry = await self.blackboard.read(key)
+        return entry.value if entry else None
 
     async def write_to_blackboard(self, key: str, value: Any, metadata: Dict = None) -> None:
         """Write data to the blackboard"""
-        self.state = AgentState.WRITING
-        try:
-            await self.blackboard.write(key, value, self.agent_id, metadata)
-        finally:
-            self.state = AgentState.RUNNING
+        await self.blackboard.write(key, value, self.agent_id, metadata)
+
+    async def read_many_from_blackboard(self, keys: List[str]) -> Dict[str, Any]:
+        """Read several blackboard values in one call"""
+        entries = await self.blackboard.read_many(keys)
+        return {key: entry.value if entry else None for key, entry in entries.items()}
+
+    async def write_many_to_blackboard(self, items: Dict[str, Any], metadata: Dict = None) -> None:
+        """Write several blackboard values in one batch"""
+        await self.blackboard.write_many(items, self.agent_id, metadata)
 
-    async def subscribe_to_key(self, key: str, callback: callable) -> None:
+    async def update_on_blackboard(self, key: str, fn: Callable[[Any], Any], default: Any = None,
+                                   metadata: Dict = None) -> Any:
+        """Atomically read-modify-write a blackboard value (see Blackboard.update)"""
+        return await self.blackboard.update(key, fn, self.agent_id, default, metadata)
+
+    async def subscribe_to_key(self, key: str, callback: callable, **options) -> Subscription:
         """Subscribe to changes on a specific key in the blackboard"""
-        await self.blackboard.subscribe(key, callback)
+        return await self.blackboard.subscribe(key, callback, **options)
+
+    async def subscribe_to_pattern(self, pattern: str, callback: callable, **options) -> Subscription:
+        """Subscribe to every blackboard key matching a prefix or glob pattern"""
+        return await self.blackboard.subscribe_pattern(pattern, callback, **options)
 
     def get_state(self) -> str:
         """Get the current state of the agent"""
@@ -109,7 +269,9 @@ class Agent(ABC):
             "agent_id": self.agent_id,
             "state": self.state,
             "last_action_time": self.last_action_time.isoformat(),
-            "knowledge_base_size": len(self.knowledge_base)
+            "knowledge_base_size": len(self.knowledge_base),
+            "in_flight": self._active,
+            "pending_messages": len(self._inbox)
         }
 
     async def update_knowledge_base(self, key: str, value: Any) -> None:
@@ -123,3 +285,106 @@ class Agent(ABC):
     async def clear_knowledge_base(self) -> None:
         """Clear the agent's knowledge base"""
         self.knowledge_base.clear()
+
+
+class InboxAgent(Agent):
+    """An agent that only does work when messages arrive in its inbox.
+
+    Tasks reach it through submit() / deliver() (the coordinator routes them
+    there), so its run loop just idles until stop() instead of competing with
+    the coordinator for the shared blackboard task queue.
+    """
+
+    async def run(self) -> None:
+        await self._stop_event.wait()
+
+
+class AgentScheduler:
+    """Multiplex many logical agents over a fixed pool of worker tasks.
+
+    Scheduled agents have no run loop of their own: messages are queued with
+    Agent.deliver() (or arrive through Agent.wake_on() subscriptions) and a
+    worker calls process_message only when an agent has pending input, so an
+    idle agent costs nothing but its memory.
+    """
+
+    def __init__(self, workers: int = 8):
+        self.workers = workers
+        self._ready: Deque[Agent] = deque()
+        self._ready_event = asyncio.Event()
+        self._agents: Dict[str, Agent] = {}
+        self._worker_tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Start the worker pool"""
+        if not self._worker_tasks:
+            self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+            logger.info(f"Agent scheduler started with {self.workers} workers")
+
+    async def stop(self) -> None:
+        """Stop the worker pool and detach all agents"""
+        for agent in list(self._agents.values()):
+            await self.remove(agent)
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    async def add(self, agent: Agent) -> None:
+        """Attach an agent; it is woken only when it has messages"""
+        agent._scheduler = self
+        agent.state = AgentState.RUNNING
+        self._agents[agent.agent_id] = agent
+        await agent.on_scheduled()
+        if agent._inbox:
+            self.notify(agent)
+
+    async def remove(self, agent: Agent) -> None:
+        """Detach an agent and drop its subscriptions and pending messages"""
+        if self._agents.get(agent.agent_id) is agent:
+            del self._agents[agent.agent_id]
+        for subscription in agent._wake_subscriptions:
+            await agent.blackboard.unsubscribe(subscription.key, subscription)
+        agent._wake_subscriptions.clear()
+        for _, future in agent._inbox:
+            if future is not None:
+                future.cancel()
+        agent._inbox.clear()
+        agent._scheduler = None
+        agent.state = AgentState.IDLE
+
+    def notify(self, agent: Agent) -> None:
+        """Mark an agent as ready to run (at most once in the ready queue)"""
+        # Agents at their concurrency limit are requeued when a message finishes
+        if (agent._scheduled or agent._active >= agent.max_concurrency
+                or agent.state == AgentState.PAUSED):
+            return
+        agent._scheduled = True
+        self._ready.append(agent)
+        self._ready_event.set()
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    async def _worker(self) -> None:
+        while True:
+            if not self._ready:
+                self._ready_event.clear()
+                await self._ready_event.wait()
+                continue
+            agent = self._ready.popleft()
+            agent._scheduled = False
+            if agent._scheduler is not self or not agent._inbox:
+                continue
+            message, future = agent._inbox.popleft()
+            agent._active += 1
+            # Let another worker take the next message if the agent has free slots
+            if agent._inbox:
+                self.notify(agent)
+            try:
+                await agent._handle(message, future)
+            finally:
+                agent._active -= 1
+            # Requeue behind other ready agents so one busy agent can't hog a worker
+            if agent._inbox and agent._scheduler is self:
+                self.notify(agent)
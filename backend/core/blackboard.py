@@ -1,100 +1,702 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Mapping, Optional, Tuple
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
 from datetime import datetime
+from itertools import islice
+from operator import itemgetter
+from types import MappingProxyType
 import asyncio
-from pydantic import BaseModel
+import heapq
+import inspect
+import logging
+import random
+import time
 import json
+import uuid
 
-class BlackboardEntry(BaseModel):
+from .persistence import BlackboardLog, dumps as persistence_dumps
+from .subscription import OverflowPolicy, PatternIndex, Subscription
+from .task_queue import TaskPriority, TaskQueue
+
+logger = logging.getLogger(__name__)
+
+# 所有未带元数据的条目共享的只读空字典，避免每次写入都分配一个新 dict
+_EMPTY_METADATA: Mapping[str, Any] = MappingProxyType({})
+
+@dataclass(slots=True)
+class BlackboardEntry:
+    """黑板内部使用的轻量条目；写入热路径上不做校验."""
     key: str
     value: Any
     timestamp: datetime
     agent_id: str
-    metadata: Dict = {}
+    metadata: Mapping[str, Any] = field(default_factory=lambda: _EMPTY_METADATA)
+    version: int = 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON 友好的字典形式；WAL、变更流、黑板服务和 HTTP 接口都用这一种格式."""
+        return {
+            "key": self.key,
+            "value": self.value,
+            "timestamp": self.timestamp.isoformat(),
+            "agent_id": self.agent_id,
+            "metadata": dict(self.metadata),
+            "version": self.version
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "BlackboardEntry":
+        return cls(data["key"], data["value"], datetime.fromisoformat(data["timestamp"]),
+                   data["agent_id"], data.get("metadata") or _EMPTY_METADATA, data.get("version", 1))
+
+class BlackboardConflictError(RuntimeError):
+    """乐观更新在重试上限内仍然与并发写入冲突."""
+
+class ChangeFeedGapError(LookupError):
+    """请求的序号不在变更日志保留的范围内（太旧，或者来自另一个纪元），调用方需要先全量同步."""
 
 class Blackboard:
-    def __init__(self):
+    def __init__(self, max_pending_tasks: int = 0, starvation_limit: int = 8,
+                 max_entries: int = 0, default_ttl: Optional[float] = None,
+                 sweep_interval: float = 1.0, sweep_batch: int = 256,
+                 persistence: Optional[BlackboardLog] = None, change_log_size: int = 10000):
+        """max_pending_tasks 为任务队列容量，0 表示不限制.
+
+        max_entries > 0 时超出容量按 LRU 淘汰；default_ttl 为条目默认存活秒数，
+        过期条目由后台清理任务每 sweep_interval 秒分批（每批 sweep_batch 个）删除.
+        persistence 为可选的持久化日志，使用前需要先 await restore().
+        change_log_size 为变更日志保留的最近变更条数，供 changes_since 增量同步.
+        """
+        # 所有修改都在事件循环上同步完成（中间没有 await），本身就是原子的，不需要锁
         self._data: Dict[str, BlackboardEntry] = {}
-        self._subscribers: Dict[str, List[callable]] = {}
-        self._lock = asyncio.Lock()
-        self._task_queue: List[Dict[str, Any]] = []
-        self._message_queue: List[Dict[str, Any]] = []
-
-    async def write(self, key: str, value: Any, agent_id: str, metadata: Dict = None) -> None:
-        """Write data to the blackboard"""
-        async with self._lock:
-            entry = BlackboardEntry(
-                key=key,
-                value=value,
-                timestamp=datetime.now(),
-                agent_id=agent_id,
-                metadata=metadata or {}
-            )
-            self._data[key] = entry
-            
-            # Notify subscribers
-            if key in self._subscribers:
-                for callback in self._subscribers[key]:
-                    await callback(entry)
+        # 被删除（含过期、淘汰、清空）的条目中最大的版本号；新建的键从它之后编号，
+        # 删除后重建的键不会复用旧版本号，持有旧版本的 compare_and_set 必然失败
+        self._removed_version = 0
+        self._subscribers: Dict[str, List[Subscription]] = {}
+        self._pattern_index = PatternIndex()
+        # 队列元素为 (序号, 任务)：序号在入队时分配，WAL 用它配对 task_put / task_get
+        self._task_queue = TaskQueue(maxsize=max_pending_tasks, starvation_limit=starvation_limit,
+                                     task_of=itemgetter(1))
+        self._message_queue: Deque[Dict[str, Any]] = deque()
+
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._ttl_prefixes: Dict[str, float] = {}
+        self._lru: "OrderedDict[str, None]" = OrderedDict()
+        self._deadlines: Dict[str, float] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._sweep_interval = sweep_interval
+        self._sweep_batch = sweep_batch
+        self._sweeper: Optional[asyncio.Task] = None
+        self._stats = {"expired": 0, "evicted": 0}
+
+        self._log: Optional[BlackboardLog] = None
+        self._persistence = persistence
+        self._next_task_id = 0
+
+        # 变更日志：(seq, op, key, entry)，每次写入 / 删除 / 清空序号加一。
+        # 序号只在同一个纪元（黑板实例）内有意义，进程重启或从 WAL 恢复后重新编号
+        self.epoch = uuid.uuid4().hex
+        self._seq = 0
+        self._changes: Deque[Tuple[int, str, Optional[str], Optional[BlackboardEntry]]] = deque(
+            maxlen=max(1, change_log_size))
+        self._change_signal: Optional[asyncio.Future] = None
+
+    def set_ttl(self, prefix: str, ttl: Optional[float]) -> None:
+        """为以 prefix 开头的键设置默认存活秒数，ttl 为 None 时取消."""
+        if ttl is None:
+            self._ttl_prefixes.pop(prefix, None)
+        else:
+            self._ttl_prefixes[prefix] = ttl
+
+    def _ttl_for(self, key: str) -> Optional[float]:
+        best = None
+        for prefix, ttl in self._ttl_prefixes.items():
+            if key.startswith(prefix) and (best is None or len(prefix) > len(best[0])):
+                best = (prefix, ttl)
+        return best[1] if best else self.default_ttl
+
+    async def write(self, key: str, value: Any, agent_id: str, metadata: Dict = None,
+                    ttl: Optional[float] = None) -> None:
+        """Write data to the blackboard (ttl overrides the key's default lifetime)"""
+        entry = BlackboardEntry(key, value, datetime.now(), agent_id, metadata or _EMPTY_METADATA)
+        self._store(entry, ttl)
+        self._notify(entry)
+
+    def _store(self, entry: BlackboardEntry, ttl: Optional[float] = None) -> None:
+        """Store an entry and update expiry / LRU bookkeeping"""
+        key = entry.key
+        previous = self._data.get(key)
+        entry.version = (previous.version if previous is not None else self._removed_version) + 1
+        ttl = ttl if ttl is not None else self._ttl_for(key)
+        # 先写日志：值无法持久化时在修改内存之前就抛出 TypeError
+        if self._log is not None:
+            self._log.append(self._entry_record(entry, ttl))
+
+        self._data[key] = entry
+        if ttl is not None:
+            deadline = time.monotonic() + ttl
+            self._deadlines[key] = deadline
+            heapq.heappush(self._expiry_heap, (deadline, key))
+            self._ensure_sweeper()
+        else:
+            self._deadlines.pop(key, None)
+        self._record_change("set", key, entry)
+
+        if self.max_entries > 0:
+            self._lru[key] = None
+            self._lru.move_to_end(key)
+            while len(self._data) > self.max_entries and self._lru:
+                oldest, _ = self._lru.popitem(last=False)
+                if self._remove(oldest):
+                    self._stats["evicted"] += 1
+
+    async def compare_and_set(self, key: str, value: Any, agent_id: str, expected_version: int,
+                              metadata: Dict = None, ttl: Optional[float] = None) -> bool:
+        """Write only if the key is still at expected_version (0 means "must not exist")
+
+        Versions never repeat for a key, even after it is deleted, expires or is
+        evicted and later recreated. Returns False without writing when another
+        writer got there first.
+        """
+        # 校验和写入之间没有 await，对其他协程而言是原子的
+        current = self._data.get(key)
+        if current is not None and self._is_expired(key):
+            current = None
+        if (current.version if current else 0) != expected_version:
+            return False
+        entry = BlackboardEntry(key, value, datetime.now(), agent_id, metadata or _EMPTY_METADATA)
+        self._store(entry, ttl)
+        self._notify(entry)
+        return True
+
+    async def update(self, key: str, fn: Callable[[Any], Any], agent_id: str, default: Any = None,
+                     metadata: Dict = None, max_retries: int = 16) -> Any:
+        """Optimistically apply fn to the current value and store the result
+
+        fn receives the current value (or default) and returns the new one; it
+        may be a coroutine function and must not mutate its argument in place.
+        If the key changed while fn ran, fn is retried on the fresh value.
+        Returning None leaves the key untouched. Raises BlackboardConflictError
+        after max_retries lost races.
+        """
+        return await optimistic_update(self, key, fn, agent_id, default, metadata, max_retries)
+
+    async def write_many(self, items: Dict[str, Any], agent_id: str, metadata: Dict = None,
+                         ttl: Optional[float] = None) -> None:
+        """Write several keys in one synchronous pass with a single subscriber dispatch pass"""
+        await self.commit(items, agent_id, metadata, ttl)
+
+    async def commit(self, writes: Dict[str, Any], agent_id: str, metadata: Dict = None,
+                     ttl: Optional[float] = None, expected_versions: Optional[Dict[str, int]] = None) -> bool:
+        """Atomically apply writes if every key in expected_versions is still at that version
+
+        Validation and all stores happen without awaiting, so on the event loop
+        other writers see either none or all of the batch, and subscribers are
+        notified in a single pass afterwards. Returns False without writing
+        anything on a version conflict.
+        """
+        if expected_versions:
+            now = time.monotonic()
+            for key, expected_version in expected_versions.items():
+                current = self._data.get(key)
+                if current is not None and self._is_expired(key, now):
+                    current = None
+                if (current.version if current else 0) != expected_version:
+                    return False
+        if self._log is not None:
+            # 批次中任何一个值无法持久化时整批都不写入
+            for value in writes.values():
+                persistence_dumps(value)
+        timestamp = datetime.now()
+        metadata = metadata or _EMPTY_METADATA
+        entries = []
+        for key, value in writes.items():
+            entry = BlackboardEntry(key, value, timestamp, agent_id, metadata)
+            self._store(entry, ttl)
+            entries.append(entry)
+        for entry in entries:
+            self._notify(entry)
+        return True
+
+    def transaction(self, agent_id: str, metadata: Dict = None) -> "Transaction":
+        """Start an optimistic multi-key transaction (see Transaction)"""
+        return Transaction(self, agent_id, metadata)
+
+    def _remove(self, key: str) -> bool:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return False
+        self._removed_version = max(self._removed_version, entry.version)
+        self._deadlines.pop(key, None)
+        self._lru.pop(key, None)
+        if self._log is not None:
+            self._log.append({"op": "del", "key": key})
+        self._record_change("del", key, None)
+        return True
+
+    def _is_expired(self, key: str, now: Optional[float] = None) -> bool:
+        deadline = self._deadlines.get(key)
+        return deadline is not None and deadline <= (now if now is not None else time.monotonic())
+
+    def _ensure_sweeper(self) -> None:
+        if self._sweeper is None or self._sweeper.done():
+            try:
+                self._sweeper = asyncio.get_running_loop().create_task(self._sweep_loop())
+            except RuntimeError:
+                pass  # 没有运行中的事件循环时只依赖读时惰性过期
+
+    async def _sweep_loop(self) -> None:
+        """Incrementally drop expired entries, a bounded batch at a time"""
+        while True:
+            await asyncio.sleep(self._sweep_interval)
+            while self.sweep_expired(self._sweep_batch) == self._sweep_batch:
+                await asyncio.sleep(0)  # 还有积压，先让出事件循环
+            if not self._expiry_heap:
+                self._sweeper = None
+                return
+
+    def sweep_expired(self, limit: int = 256) -> int:
+        """删除最多 limit 个已过期条目，返回删除数量."""
+        now = time.monotonic()
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now and removed < limit:
+            deadline, key = heapq.heappop(heap)
+            # 堆中可能留有被覆盖写入前的旧截止时间
+            if self._deadlines.get(key) == deadline and self._remove(key):
+                self._stats["expired"] += 1
+                removed += 1
+        return removed
+
+    @staticmethod
+    def _entry_record(entry: BlackboardEntry, ttl: Optional[float]) -> Dict[str, Any]:
+        record = entry.to_dict()
+        record["op"] = "set"
+        record["expires_at"] = time.time() + ttl if ttl is not None else None
+        return record
+
+    def _apply_record(self, record: Dict[str, Any], pending_tasks: "OrderedDict[int, Dict[str, Any]]") -> None:
+        op = record.get("op")
+        if op == "set":
+            key = record["key"]
+            ttl = None
+            if record.get("expires_at") is not None:
+                ttl = record["expires_at"] - time.time()
+                if ttl <= 0:
+                    self._remove(key)
+                    self._removed_version = max(self._removed_version, record.get("version", 1))
+                    return
+            entry = BlackboardEntry.from_dict(record)
+            version = entry.version
+            self._store(entry, ttl)
+            # _store 会重新分配版本号，这里恢复日志中记录的版本
+            entry.version = version
+        elif op == "del":
+            self._remove(record["key"])
+        elif op == "clear":
+            self._clear_data()
+        elif op == "task_put":
+            pending_tasks[record["id"]] = record["task"]
+        elif op == "task_get":
+            pending_tasks.pop(record["id"], None)
+
+    def _snapshot_state(self) -> Dict[str, Any]:
+        """当前完整状态，供持久化日志写快照."""
+        now = time.monotonic()
+        entries = []
+        removed_version = self._removed_version
+        for key, entry in self._data.items():
+            deadline = self._deadlines.get(key)
+            if deadline is not None and deadline <= now:
+                removed_version = max(removed_version, entry.version)
+                continue
+            entries.append(self._entry_record(entry, deadline - now if deadline is not None else None))
+        tasks = [{"id": task_id, "task": task} for task_id, task in self._task_queue.snapshot()]
+        return {"entries": entries, "tasks": tasks, "next_task_id": self._next_task_id,
+                "removed_version": removed_version}
+
+    async def restore(self) -> None:
+        """从持久化日志恢复状态（快照 + WAL 重放），之后的写入会记录到日志."""
+        if self._persistence is None or self._log is not None:
+            return
+        snapshot, records = self._persistence.load()
+        pending_tasks: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        if snapshot:
+            for record in snapshot.get("entries", []):
+                self._apply_record(record, pending_tasks)
+            for item in snapshot.get("tasks", []):
+                pending_tasks[item["id"]] = item["task"]
+            self._next_task_id = snapshot.get("next_task_id", 0)
+            self._removed_version = max(self._removed_version, snapshot.get("removed_version", 0))
+        for record in records:
+            self._apply_record(record, pending_tasks)
+            if record.get("op") == "task_put":
+                self._next_task_id = max(self._next_task_id, record["id"])
+        for item in pending_tasks.items():
+            self._task_queue.put_nowait(item)
+        self._log = self._persistence
+        self._log.start(self._snapshot_state)
+        logger.info(f"Blackboard restored {len(self._data)} entries and {len(pending_tasks)} tasks")
+
+    async def delete(self, key: str) -> bool:
+        """Delete a key from the blackboard"""
+        return self._remove(key)
+
+    async def get_stats(self) -> Dict[str, int]:
+        """条目数量以及过期 / LRU 淘汰计数."""
+        return {
+            "entries": len(self._data),
+            "expired": self._stats["expired"],
+            "evicted": self._stats["evicted"],
+            "pending_tasks": self._task_queue.qsize()
+        }
+
+    async def close(self) -> None:
+        """停止后台清理任务，并把尚未落盘的写入刷到持久化日志."""
+        if self._sweeper and not self._sweeper.done():
+            self._sweeper.cancel()
+        self._sweeper = None
+        if self._log is not None:
+            await self._log.close()
+            self._log = None
+
+    def _notify(self, entry: BlackboardEntry) -> None:
+        """Queue the entry for every subscriber; callbacks run in the subscribers' own tasks"""
+        subscriptions = self._subscribers.get(entry.key)
+        if subscriptions:
+            for subscription in subscriptions:
+                subscription.deliver(entry)
+            if any(subscription.closed for subscription in subscriptions):
+                subscriptions[:] = [s for s in subscriptions if not s.closed]
+        if len(self._pattern_index):
+            for subscription in self._pattern_index.match(entry.key):
+                if not subscription.deliver(entry):
+                    self._pattern_index.remove(subscription.key, subscription)
 
     async def read(self, key: str) -> Optional[BlackboardEntry]:
         """Read data from the blackboard"""
-        async with self._lock:
-            return self._data.get(key)
+        return self._read_entry(key)
 
-    async def subscribe(self, key: str, callback: callable) -> None:
-        """Subscribe to changes on a specific key"""
-        if key not in self._subscribers:
-            self._subscribers[key] = []
-        self._subscribers[key].append(callback)
+    def _read_entry(self, key: str) -> Optional[BlackboardEntry]:
+        # Entries are replaced, never mutated, so reads need no lock
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if self._is_expired(key):
+            self._remove(key)
+            self._stats["expired"] += 1
+            return None
+        if self.max_entries > 0:
+            self._lru.move_to_end(key)
+        return entry
+
+    async def read_many(self, keys: List[str]) -> Dict[str, Optional[BlackboardEntry]]:
+        """Read several keys in one call"""
+        return {key: self._read_entry(key) for key in keys}
+
+    async def subscribe(self, key: str, callback: callable, max_pending: int = 100,
+                        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+                        on_disconnect: Optional[callable] = None) -> Subscription:
+        """Subscribe to changes on a specific key
+
+        Notifications are buffered per subscriber (at most max_pending) and
+        overflow decides what happens when a slow subscriber falls behind.
+        """
+        subscription = Subscription(key, callback, max_pending, overflow, on_disconnect)
+        self._subscribers.setdefault(key, []).append(subscription)
+        return subscription
 
     async def unsubscribe(self, key: str, callback: callable) -> None:
-        """Unsubscribe from changes on a specific key"""
-        if key in self._subscribers and callback in self._subscribers[key]:
-            self._subscribers[key].remove(callback)
+        """Unsubscribe from changes on a specific key (callback or the returned Subscription)"""
+        subscriptions = self._subscribers.get(key)
+        if not subscriptions:
+            return
+        for subscription in subscriptions:
+            if subscription.callback == callback or subscription is callback:
+                subscription.close()
+        subscriptions[:] = [s for s in subscriptions if not s.closed]
+        if not subscriptions:
+            del self._subscribers[key]
+
+    async def subscribe_pattern(self, pattern: str, callback: callable, max_pending: int = 100,
+                                overflow: OverflowPolicy = OverflowPolicy.COALESCE_LATEST,
+                                on_disconnect: Optional[callable] = None) -> Subscription:
+        """Subscribe to every key matching a prefix ("student_model_*") or glob pattern
+
+        Matching a write against pattern subscriptions costs O(len(key)),
+        independent of how many patterns are registered.
+        """
+        subscription = Subscription(pattern, callback, max_pending, overflow, on_disconnect)
+        self._pattern_index.add(pattern, subscription)
+        return subscription
+
+    async def unsubscribe_pattern(self, pattern: str, subscription: Subscription) -> None:
+        """Remove a subscription created by subscribe_pattern"""
+        subscription.close()
+        self._pattern_index.remove(pattern, subscription)
 
     async def get_all_entries(self) -> Dict[str, BlackboardEntry]:
         """Get all entries from the blackboard"""
-        async with self._lock:
-            return self._data.copy()
+        # Copying without awaiting is atomic on the event loop, so no locking is needed
+        entries = dict(self._data)
+        if self._deadlines:
+            now = time.monotonic()
+            for key in [key for key in entries if self._is_expired(key, now)]:
+                del entries[key]
+        return entries
+
+    async def get_epoch(self) -> str:
+        """变更序号所属的纪元；客户端续传时纪元不同就必须全量同步."""
+        return self.epoch
+
+    async def get_snapshot(self) -> Tuple[Dict[str, BlackboardEntry], int]:
+        """全部条目以及对应的变更序号，用于增量同步前的全量同步"""
+        return await self.get_all_entries(), self._seq
 
     async def clear(self) -> None:
         """Clear all data from the blackboard"""
-        async with self._lock:
-            self._data.clear()
+        self._clear_data()
+        if self._log is not None:
+            self._log.append({"op": "clear"})
+
+    def _clear_data(self) -> None:
+        if self._data:
+            self._removed_version = max(self._removed_version,
+                                        max(entry.version for entry in self._data.values()))
+        self._data.clear()
+        self._lru.clear()
+        self._deadlines.clear()
+        self._expiry_heap.clear()
+        self._record_change("clear", None, None)
+
+    def _record_change(self, op: str, key: Optional[str], entry: Optional[BlackboardEntry]) -> None:
+        self._seq += 1
+        self._changes.append((self._seq, op, key, entry))
+        if self._change_signal is not None:
+            if not self._change_signal.done():
+                self._change_signal.set_result(None)
+            self._change_signal = None
+
+    @property
+    def current_seq(self) -> int:
+        """最近一次变更的序号."""
+        return self._seq
+
+    def changes_since(self, seq: int) -> Tuple[List[Dict[str, Any]], int]:
+        """返回序号大于 seq 的所有变更以及当前序号.
+
+        seq 已经超出变更日志保留范围、或者大于当前序号（来自重启前的另一个纪元）时
+        抛出 ChangeFeedGapError，调用方应通过 get_snapshot() 全量同步后继续。
+        """
+        if seq > self._seq:
+            raise ChangeFeedGapError(f"Cursor {seq} is ahead of the change log ({self._seq}); "
+                                     f"it belongs to another epoch")
+        if seq == self._seq:
+            return [], self._seq
+        oldest = self._changes[0][0] if self._changes else self._seq + 1
+        if seq < oldest - 1:
+            raise ChangeFeedGapError(f"Changes after {seq} are no longer retained (oldest is {oldest})")
+        # 变更日志按序号连续存放，可以直接定位起点
+        start = len(self._changes) - (self._seq - seq)
+        changes = [self._change_record(*change) for change in islice(self._changes, start, None)]
+        return changes, self._seq
+
+    async def wait_for_changes(self, seq: int, timeout: Optional[float] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """与 changes_since 相同，但在没有新变更时等待（最多 timeout 秒）."""
+        if seq == self._seq:
+            if self._change_signal is None:
+                self._change_signal = asyncio.get_running_loop().create_future()
+            try:
+                await asyncio.wait_for(asyncio.shield(self._change_signal), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.changes_since(seq)
+
+    async def watch_changes(self, seq: int) -> AsyncIterator[Tuple[List[Dict[str, Any]], int]]:
+        """持续产出 (变更批次, 当前序号)，没有变更时挂起等待."""
+        while True:
+            changes, seq = await self.wait_for_changes(seq)
+            if changes:
+                yield changes, seq
+
+    @staticmethod
+    def _change_record(seq: int, op: str, key: Optional[str],
+                       entry: Optional[BlackboardEntry]) -> Dict[str, Any]:
+        record = entry.to_dict() if entry is not None else {"key": key}
+        record["seq"] = seq
+        record["op"] = op
+        return record
 
     def to_json(self) -> str:
         """Convert blackboard data to JSON string"""
+        # 与 read 一致：已过期但还没被清理的条目不输出
+        now = time.monotonic()
         data_dict = {
-            key: {
-                "value": entry.value,
-                "timestamp": entry.timestamp.isoformat(),
-                "agent_id": entry.agent_id,
-                "metadata": entry.metadata
-            }
+            key: entry.to_dict()
             for key, entry in self._data.items()
+            if not self._is_expired(key, now)
         }
         return json.dumps(data_dict)
 
-    async def post_task(self, task: Dict[str, Any]) -> None:
-        """发布一个新任务到任务队列."""
-        async with self._lock:
-            self._task_queue.append(task)
+    async def post_task(self, task: Dict[str, Any], timeout: Optional[float] = None,
+                        priority: Optional[TaskPriority] = None) -> None:
+        """发布一个新任务到任务队列，队列已满时等待空位（背压）.
+
+        priority 未指定时使用 task["priority"]，默认为 TaskPriority.MEDIUM；
+        超过 timeout 秒仍无空位时抛出 asyncio.TimeoutError.
+        """
+        if priority is not None:
+            task = {**task, "priority": int(priority)}
+        item = self._new_task_item(task)
+        try:
+            if timeout is None:
+                await self._task_queue.put(item)
+            else:
+                await asyncio.wait_for(self._task_queue.put(item), timeout)
+        except BaseException:
+            self._log_task_get(item)
+            raise
+
+    def post_task_nowait(self, task: Dict[str, Any], priority: Optional[TaskPriority] = None) -> None:
+        """立即发布任务，队列已满时抛出 asyncio.QueueFull."""
+        if priority is not None:
+            task = {**task, "priority": int(priority)}
+        item = self._new_task_item(task)
+        try:
+            self._task_queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self._log_task_get(item)
+            raise
 
     async def get_task(self) -> Optional[Dict[str, Any]]:
         """获取一个任务，如果有的话."""
-        async with self._lock:
-            if self._task_queue:
-                return self._task_queue.pop(0)
+        try:
+            item = self._task_queue.get_nowait()
+        except asyncio.QueueEmpty:
             return None
+        self._log_task_get(item)
+        return item[1]
+
+    def requeue_task(self, task: Dict[str, Any]) -> None:
+        """把取出后没能交给处理方的任务放回队首（例如等待方在收到任务前被取消）."""
+        self._task_queue.put_front_nowait(self._new_task_item(task))
+
+    async def wait_for_task(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """等待直到有任务可取；超时返回 None."""
+        if timeout is None:
+            item = await self._task_queue.get()
+        else:
+            try:
+                item = await asyncio.wait_for(self._task_queue.get(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        self._log_task_get(item)
+        return item[1]
+
+    def _new_task_item(self, task: Dict[str, Any]) -> Tuple[Optional[int], Dict[str, Any]]:
+        """为一次入队分配序号并记录 task_put；同一个任务对象多次入队也各有各的序号.
+
+        没有持久化日志时不需要配对，序号为 None。
+        """
+        if self._log is None:
+            return None, task
+        self._next_task_id += 1
+        self._log.append({"op": "task_put", "id": self._next_task_id, "task": task})
+        return self._next_task_id, task
+
+    def _log_task_get(self, item: Tuple[Optional[int], Dict[str, Any]]) -> None:
+        if self._log is not None and item[0] is not None:
+            self._log.append({"op": "task_get", "id": item[0]})
+
+    def pending_tasks(self) -> int:
+        """当前排队中的任务数."""
+        return self._task_queue.qsize()
 
     async def post_message(self, message: Dict[str, Any]) -> None:
         """发布一条消息到消息队列."""
-        async with self._lock:
-            self._message_queue.append(message)
+        self._message_queue.append(message)
 
     async def get_messages(self) -> List[Dict[str, Any]]:
         """获取所有消息."""
-        async with self._lock:
-            messages = self._message_queue.copy()
-            self._message_queue.clear()
-            return messages
+        messages = list(self._message_queue)
+        self._message_queue.clear()
+        return messages
+
+async def optimistic_update(blackboard: Any, key: str, fn: Callable[[Any], Any], agent_id: str,
+                            default: Any = None, metadata: Dict = None, max_retries: int = 16,
+                            backoff: float = 0.0) -> Any:
+    """Blackboard.update 的重试循环，只依赖 read / compare_and_set.
+
+    本地黑板和 RemoteBlackboard 共用这一份实现。每次冲突后至少让出一次事件循环；
+    backoff > 0 时再随机等待最多 backoff * 已失败次数 秒，避免往返延迟相同的
+    多个远程客户端每轮都同时读到同一个版本、反复互相冲突。
+    """
+    for attempt in range(1, max_retries + 1):
+        entry = await blackboard.read(key)
+        expected_version = entry.version if entry else 0
+        new_value = fn(entry.value if entry else default)
+        if inspect.isawaitable(new_value):
+            new_value = await new_value
+        if new_value is None:
+            return None
+        if await blackboard.compare_and_set(key, new_value, agent_id, expected_version, metadata):
+            return new_value
+        await asyncio.sleep(random.uniform(0, backoff * attempt) if backoff else 0)
+    raise BlackboardConflictError(f"Too many concurrent updates to {key}")
+
+class Transaction:
+    """乐观的多键事务：读取时记录版本，提交时一次性校验并写入.
+
+    用法::
+
+        async with blackboard.transaction("teacher_1") as txn:
+            model = await txn.read(f"student_model_{sid}")
+            txn.write(f"student_model_{sid}", {**model, "level": "advanced"})
+
+    退出 async with 时自动提交；期间读过的键被其他写入者修改时
+    抛出 BlackboardConflictError，调用方可以整体重试。
+    """
+
+    def __init__(self, blackboard: Any, agent_id: str, metadata: Dict = None):
+        self.blackboard = blackboard
+        self.agent_id = agent_id
+        self.metadata = metadata
+        self._versions: Dict[str, int] = {}
+        self._writes: Dict[str, Any] = {}
+
+    async def read(self, key: str) -> Any:
+        if key in self._writes:
+            return self._writes[key]
+        entry = await self.blackboard.read(key)
+        self._versions.setdefault(key, entry.version if entry else 0)
+        return entry.value if entry else None
+
+    async def read_many(self, keys: List[str]) -> Dict[str, Any]:
+        pending = [key for key in keys if key not in self._writes]
+        entries = await self.blackboard.read_many(pending) if pending else {}
+        values = {}
+        for key in keys:
+            if key in self._writes:
+                values[key] = self._writes[key]
+                continue
+            entry = entries.get(key)
+            self._versions.setdefault(key, entry.version if entry else 0)
+            values[key] = entry.value if entry else None
+        return values
+
+    def write(self, key: str, value: Any) -> None:
+        self._writes[key] = value
+
+    async def commit(self) -> bool:
+        if not self._writes:
+            return True
+        return await self.blackboard.commit(self._writes, self.agent_id, self.metadata,
+                                            expected_versions=self._versions)
+
+    async def __aenter__(self) -> "Transaction":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None and not await self.commit():
+            raise BlackboardConflictError("Transaction conflicted with a concurrent write")
@@ -0,0 +1,598 @@
+"""把一个 Blackboard 作为独立的本地进程提供给多个 uvicorn worker 和 Agent 进程.
+
+启动服务端（在 backend 目录下）::
+
+    python -m core.blackboard_server --socket /tmp/blackboard.sock
+
+客户端用 RemoteBlackboard 替代 Blackboard，接口保持一致
+（read / write / subscribe / post_task / wait_for_task ...）。
+
+协议是 Unix socket 上按行分隔的 JSON：请求带 id，响应按 id 匹配，
+所以一个连接上可以同时有多个未完成请求（流水线）；客户端在同一轮事件循环
+内发出的请求会合并成一次 socket 写入（批量）。订阅更新由服务端主动推送。
+帧的编码与 WAL 相同（core.persistence.dumps / loads）：datetime、set 等已知类型
+原样往返，其他无法表示的值在调用方直接抛出 TypeError。
+
+客户端放弃一个仍在服务端等待的请求（例如 wait_for_task 超时）时会发送
+cancel；已经出队但没有人接收的任务会被放回队首，不会丢失。
+
+RemoteBlackboard 只提供 Blackboard 的异步接口；纯本地的同步查询
+（pending_tasks、changes_since、current_seq、to_json）在客户端不可用，
+分别改用 get_stats() 和 wait_for_changes()。
+"""
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import logging
+import os
+
+from .blackboard import (
+    Blackboard, BlackboardConflictError, BlackboardEntry, ChangeFeedGapError, Transaction,
+    optimistic_update
+)
+from .persistence import BlackboardLog, dumps, loads
+from .subscription import OverflowPolicy, Subscription
+from .task_queue import TaskPriority
+
+logger = logging.getLogger(__name__)
+
+# 单行 JSON 的最大长度
+_FRAME_LIMIT = 64 * 1024 * 1024
+
+# 可能长时间等待的操作（队列满 / 队列空），需要单独的任务执行
+_BLOCKING_OPS = {"post_task", "wait_for_task", "wait_for_changes"}
+# 结果是从队列中取出的任务：结果送不到调用方时必须放回队列
+_TASK_OPS = {"get_task", "wait_for_task"}
+
+
+def _encode_entry(entry: Optional[BlackboardEntry]) -> Optional[Dict[str, Any]]:
+    return entry.to_dict() if entry is not None else None
+
+
+def _decode_entry(data: Optional[Dict[str, Any]]) -> Optional[BlackboardEntry]:
+    return BlackboardEntry.from_dict(data) if data is not None else None
+
+
+def _dumps(frame: Dict[str, Any]) -> bytes:
+    """与 WAL 相同的编码：已知类型带类型标记原样往返，其余类型抛出 TypeError."""
+    return (dumps(frame) + "\n").encode("utf-8")
+
+
+class _Connection:
+    """服务端的一个客户端连接."""
+
+    def __init__(self, server: "BlackboardServer", reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.subscriptions: Dict[int, Tuple[str, Subscription]] = {}
+        # 正在执行的阻塞请求，以及被客户端取消的请求 id
+        self._blocking: Dict[int, asyncio.Task] = {}
+        self._cancelled: set = set()
+
+    def send(self, frame: Dict[str, Any]) -> None:
+        if self.writer.is_closing():
+            return
+        try:
+            data = _dumps(frame)
+        except TypeError as e:
+            if "id" not in frame:
+                logger.error(f"Dropping unencodable {frame.get('event')} event: {str(e)}")
+                return
+            data = _dumps({"id": frame["id"], "error": "TypeError", "message": str(e)})
+        self.writer.write(data)
+
+    async def serve(self) -> None:
+        requests = set()
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                request = loads(line)
+                if request.get("op") == "cancel":
+                    self._cancel(request["args"]["id"])
+                    continue
+                if request.get("op") not in _BLOCKING_OPS:
+                    # 非阻塞请求按到达顺序直接执行，保证同一连接上的写入有序
+                    await self._handle(request)
+                    continue
+                # 可能阻塞的请求独立执行，不会挡住后面的请求
+                task = asyncio.create_task(self._handle(request))
+                requests.add(task)
+                task.add_done_callback(requests.discard)
+                if request.get("id") is not None:
+                    self._blocking[request["id"]] = task
+                    task.add_done_callback(lambda _, request_id=request["id"]: self._blocking.pop(request_id, None))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for task in requests:
+                task.cancel()
+            if requests:
+                await asyncio.gather(*requests, return_exceptions=True)
+            for sub_id in list(self.subscriptions):
+                await self._unsubscribe(sub_id)
+            self.writer.close()
+
+    def _cancel(self, request_id: int) -> None:
+        task = self._blocking.get(request_id)
+        if task is not None and not task.done():
+            self._cancelled.add(request_id)
+            task.cancel()
+
+    async def _handle(self, request: Dict[str, Any]) -> None:
+        request_id = request.get("id")
+        op = request["op"]
+        try:
+            result = await self._dispatch(op, request.get("args") or {})
+            if op in _TASK_OPS and result is not None and self.writer.is_closing():
+                # 客户端已经断开，任务不能随连接一起丢失
+                self.server.blackboard.requeue_task(result)
+            elif request_id is not None:
+                self.send({"id": request_id, "result": result})
+        except asyncio.CancelledError:
+            if request_id in self._cancelled:
+                # 取消前没有出队任何任务（Queue.get 被取消是安全的），告诉客户端可以释放请求 id
+                self._cancelled.discard(request_id)
+                self.send({"id": request_id, "error": "CancelledError", "message": "Cancelled by client"})
+                return
+            raise
+        except Exception as e:
+            if request_id is not None:
+                self.send({"id": request_id, "error": type(e).__name__, "message": str(e)})
+            else:
+                logger.error(f"Error handling {request.get('op')}: {str(e)}")
+        if self.writer.transport.get_write_buffer_size() > 1024 * 1024:
+            await self.writer.drain()
+
+    async def _dispatch(self, op: str, args: Dict[str, Any]) -> Any:
+        bb = self.server.blackboard
+        if op == "read":
+            return _encode_entry(await bb.read(args["key"]))
+        if op == "read_many":
+            return {key: _encode_entry(entry) for key, entry in (await bb.read_many(args["keys"])).items()}
+        if op == "commit":
+            return await bb.commit(args["writes"], args["agent_id"], args.get("metadata"), args.get("ttl"),
+                                   args.get("expected_versions"))
+        if op == "write":
+            await bb.write(args["key"], args["value"], args["agent_id"], args.get("metadata"), args.get("ttl"))
+            return None
+        if op == "compare_and_set":
+            return await bb.compare_and_set(args["key"], args["value"], args["agent_id"],
+                                            args["expected_version"], args.get("metadata"), args.get("ttl"))
+        if op == "delete":
+            return await bb.delete(args["key"])
+        if op == "get_all_entries":
+            return {key: _encode_entry(entry) for key, entry in (await bb.get_all_entries()).items()}
+        if op == "get_snapshot":
+            entries, seq = await bb.get_snapshot()
+            return {"entries": {key: _encode_entry(entry) for key, entry in entries.items()}, "seq": seq}
+        if op == "clear":
+            await bb.clear()
+            return None
+        if op == "get_epoch":
+            return await bb.get_epoch()
+        if op == "wait_for_changes":
+            return await bb.wait_for_changes(args["seq"], args.get("timeout"))
+        if op == "set_ttl":
+            bb.set_ttl(args["prefix"], args.get("ttl"))
+            return None
+        if op == "post_task":
+            await bb.post_task(args["task"], args.get("timeout"), args.get("priority"))
+            return None
+        if op == "get_task":
+            return await bb.get_task()
+        if op == "requeue_task":
+            bb.requeue_task(args["task"])
+            return None
+        if op == "wait_for_task":
+            return await bb.wait_for_task(args.get("timeout"))
+        if op == "post_message":
+            await bb.post_message(args["message"])
+            return None
+        if op == "get_messages":
+            return await bb.get_messages()
+        if op == "get_stats":
+            return await bb.get_stats()
+        if op in ("subscribe", "subscribe_pattern"):
+            return await self._subscribe(op, args)
+        if op == "unsubscribe":
+            await self._unsubscribe(args["sub"])
+            return None
+        raise ValueError(f"Unknown operation: {op}")
+
+    async def _subscribe(self, op: str, args: Dict[str, Any]) -> int:
+        # 订阅 id 由客户端分配：客户端在发出请求前就登记好，不会错过紧随其后的推送
+        sub_id = args["sub"]
+        await self._unsubscribe(sub_id)
+
+        async def push(entry: BlackboardEntry) -> None:
+            self.send({"event": "update", "sub": sub_id, "entry": _encode_entry(entry)})
+
+        bb = self.server.blackboard
+        if op == "subscribe":
+            subscription = await bb.subscribe(args["key"], push, max_pending=args.get("max_pending", 1000))
+        else:
+            subscription = await bb.subscribe_pattern(args["pattern"], push,
+                                                      max_pending=args.get("max_pending", 1000))
+        self.subscriptions[sub_id] = (op, subscription)
+        return sub_id
+
+    async def _unsubscribe(self, sub_id: int) -> None:
+        op, subscription = self.subscriptions.pop(sub_id, (None, None))
+        if subscription is None:
+            return
+        if op == "subscribe_pattern":
+            await self.server.blackboard.unsubscribe_pattern(subscription.key, subscription)
+        else:
+            await self.server.blackboard.unsubscribe(subscription.key, subscription)
+
+
+class BlackboardServer:
+    """在 Unix socket 上对外提供一个 Blackboard."""
+
+    def __init__(self, blackboard: Blackboard, socket_path: str):
+        self.blackboard = blackboard
+        self.socket_path = socket_path
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Dict[_Connection, asyncio.Task] = {}
+
+    async def start(self) -> None:
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        await self.blackboard.restore()
+        self._server = await asyncio.start_unix_server(self._on_connect, path=self.socket_path,
+                                                       limit=_FRAME_LIMIT)
+        logger.info(f"Blackboard server listening on {self.socket_path}")
+
+    async def _on_connect(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        connection = _Connection(self, reader, writer)
+        self._connections[connection] = asyncio.current_task()
+        try:
+            await connection.serve()
+        finally:
+            self._connections.pop(connection, None)
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        # 关闭客户端连接让各连接的 serve() 正常收尾，而不是在事件循环关闭时被取消
+        for connection in list(self._connections):
+            connection.writer.close()
+        if self._connections:
+            await asyncio.gather(*self._connections.values(), return_exceptions=True)
+        await self.blackboard.close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+class RemoteBlackboard:
+    """连接到 BlackboardServer 的客户端，接口与 Blackboard 相同.
+
+    第一次调用时才建立连接，所以可以在模块导入时创建。
+    """
+
+    # update() 冲突后的随机退避上限（秒，按失败次数递增），大约一个本机往返
+    update_backoff: float = 0.001
+
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._next_id = 0
+        # request id -> (future, op)；收到回复时由 _read_loop 移除
+        self._pending: Dict[int, Tuple[asyncio.Future, str]] = {}
+        self._outgoing: List[bytes] = []
+        self._flush_scheduled = False
+        # sub_id -> (subscribe / subscribe_pattern, 订阅)，重连后据此重新订阅
+        self._subscriptions: Dict[int, Tuple[str, Subscription]] = {}
+        self._next_sub_id = 0
+        self._ttls: Dict[str, Optional[float]] = {}
+        # 调用方已经放弃、但服务端还会回复的请求 id -> op
+        self._abandoned: Dict[int, str] = {}
+
+    async def _ensure_connected(self) -> None:
+        if self._writer is not None and not self._writer.is_closing():
+            return
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._writer is not None and not self._writer.is_closing():
+                return
+            reconnect = self._reader_task is not None
+            self._reader, self._writer = await asyncio.open_unix_connection(self.socket_path,
+                                                                            limit=_FRAME_LIMIT)
+            self._reader_task = asyncio.create_task(self._read_loop())
+            if reconnect:
+                # 服务端的订阅和 TTL 设置属于旧连接，需要重新登记
+                for prefix, ttl in self._ttls.items():
+                    self._send("set_ttl", {"prefix": prefix, "ttl": ttl})
+                for sub_id, (op, subscription) in self._subscriptions.items():
+                    self._send(op, self._subscribe_args(op, subscription.key, sub_id))
+                logger.info(f"Reconnected to blackboard server at {self.socket_path}")
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._flush_scheduled or self._writer is None:
+            return
+        self._flush_scheduled = True
+        asyncio.get_running_loop().call_soon(self._flush)
+
+    def _flush(self) -> None:
+        # 同一轮事件循环中排队的所有请求合并成一次写入
+        self._flush_scheduled = False
+        if self._outgoing and self._writer is not None and not self._writer.is_closing():
+            self._writer.write(b"".join(self._outgoing))
+            self._outgoing.clear()
+
+    def _send(self, op: str, args: Dict[str, Any], request_id: Optional[int] = None) -> None:
+        """编码并排队一个请求；参数包含无法编码的值时抛出 TypeError，不发送任何内容."""
+        frame = {"op": op, "args": args}
+        if request_id is not None:
+            frame["id"] = request_id
+        self._outgoing.append(_dumps(frame))
+        self._schedule_flush()
+
+    async def _call(self, op: str, **args) -> Any:
+        await self._ensure_connected()
+        self._next_id += 1
+        request_id = self._next_id
+        self._send(op, args, request_id)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = (future, op)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                if request_id in self._pending:
+                    # 服务端仍会回复：阻塞请求要求它停止等待，迟到的任务结果由 _read_loop 放回队列
+                    self._abandoned[request_id] = op
+                    if op in _BLOCKING_OPS:
+                        self._send("cancel", {"id": request_id})
+            elif op in _TASK_OPS and future.exception() is None and future.result() is not None:
+                # 结果已经到达，但调用方在拿到它之前被取消
+                self.requeue_task(future.result())
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                frame = loads(line)
+                if "event" in frame:
+                    _, subscription = self._subscriptions.get(frame.get("sub"), (None, None))
+                    if subscription is not None:
+                        subscription.deliver(_decode_entry(frame["entry"]))
+                    continue
+                request_id = frame.get("id")
+                pending = self._pending.pop(request_id, None)
+                if pending is None:
+                    op = self._abandoned.pop(request_id, None)
+                    if op is not None:
+                        self._reclaim(op, frame)
+                    continue
+                future, op = pending
+                if future.cancelled():
+                    # 调用方刚被取消，_call 还没来得及登记为 abandoned
+                    self._reclaim(op, frame)
+                    continue
+                if "error" in frame:
+                    future.set_exception(self._error(frame))
+                else:
+                    future.set_result(frame.get("result"))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for future, _ in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Blackboard server connection lost"))
+            # 服务端在连接断开时会自行取消或放回这些请求
+            self._abandoned.clear()
+            if self._writer is not None:
+                self._writer.close()
+
+    def _reclaim(self, op: str, frame: Dict[str, Any]) -> None:
+        """处理没有调用方接收的回复：取出的任务放回服务端队列."""
+        if op in _TASK_OPS and "error" not in frame and frame.get("result") is not None:
+            self.requeue_task(frame["result"])
+
+    @staticmethod
+    def _error(frame: Dict[str, Any]) -> Exception:
+        errors = {
+            "TimeoutError": asyncio.TimeoutError,
+            "KeyError": KeyError,
+            "ValueError": ValueError,
+            "TypeError": TypeError,
+            "BlackboardConflictError": BlackboardConflictError,
+            "ChangeFeedGapError": ChangeFeedGapError
+        }
+        return errors.get(frame["error"], RuntimeError)(frame.get("message", ""))
+
+    async def restore(self) -> None:
+        """建立连接（状态由服务端负责恢复）."""
+        await self._ensure_connected()
+
+    async def close(self) -> None:
+        for _, subscription in self._subscriptions.values():
+            subscription.close()
+        self._subscriptions.clear()
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        self._writer = None
+
+    async def write(self, key: str, value: Any, agent_id: str, metadata: Dict = None,
+                    ttl: Optional[float] = None) -> None:
+        await self._call("write", key=key, value=value, agent_id=agent_id, metadata=metadata, ttl=ttl)
+
+    async def read(self, key: str) -> Optional[BlackboardEntry]:
+        return _decode_entry(await self._call("read", key=key))
+
+    async def read_many(self, keys: List[str]) -> Dict[str, Optional[BlackboardEntry]]:
+        entries = await self._call("read_many", keys=keys)
+        return {key: _decode_entry(data) for key, data in entries.items()}
+
+    async def write_many(self, items: Dict[str, Any], agent_id: str, metadata: Dict = None,
+                         ttl: Optional[float] = None) -> None:
+        await self.commit(items, agent_id, metadata, ttl)
+
+    async def commit(self, writes: Dict[str, Any], agent_id: str, metadata: Dict = None,
+                     ttl: Optional[float] = None, expected_versions: Optional[Dict[str, int]] = None) -> bool:
+        return await self._call("commit", writes=writes, agent_id=agent_id, metadata=metadata, ttl=ttl,
+                                expected_versions=expected_versions)
+
+    def transaction(self, agent_id: str, metadata: Dict = None) -> Transaction:
+        return Transaction(self, agent_id, metadata)
+
+    async def compare_and_set(self, key: str, value: Any, agent_id: str, expected_version: int,
+                              metadata: Dict = None, ttl: Optional[float] = None) -> bool:
+        return await self._call("compare_and_set", key=key, value=value, agent_id=agent_id,
+                                expected_version=expected_version, metadata=metadata, ttl=ttl)
+
+    async def update(self, key: str, fn: Callable[[Any], Any], agent_id: str, default: Any = None,
+                     metadata: Dict = None, max_retries: int = 16) -> Any:
+        return await optimistic_update(self, key, fn, agent_id, default, metadata, max_retries,
+                                       backoff=self.update_backoff)
+
+    async def delete(self, key: str) -> bool:
+        return await self._call("delete", key=key)
+
+    async def get_all_entries(self) -> Dict[str, BlackboardEntry]:
+        entries = await self._call("get_all_entries")
+        return {key: _decode_entry(data) for key, data in entries.items()}
+
+    async def clear(self) -> None:
+        await self._call("clear")
+
+    async def get_snapshot(self) -> Tuple[Dict[str, BlackboardEntry], int]:
+        snapshot = await self._call("get_snapshot")
+        return {key: _decode_entry(data) for key, data in snapshot["entries"].items()}, snapshot["seq"]
+
+    async def get_epoch(self) -> str:
+        return await self._call("get_epoch")
+
+    async def wait_for_changes(self, seq: int, timeout: Optional[float] = None) -> Tuple[List[Dict[str, Any]], int]:
+        changes, seq = await self._call("wait_for_changes", seq=seq, timeout=timeout)
+        return changes, seq
+
+    async def watch_changes(self, seq: int) -> AsyncIterator[Tuple[List[Dict[str, Any]], int]]:
+        while True:
+            changes, seq = await self.wait_for_changes(seq)
+            if changes:
+                yield changes, seq
+
+    def set_ttl(self, prefix: str, ttl: Optional[float]) -> None:
+        # 同步接口：请求先排队，连接建立后发出；重连时重新发送
+        if ttl is None:
+            self._ttls.pop(prefix, None)
+        else:
+            self._ttls[prefix] = ttl
+        self._send("set_ttl", {"prefix": prefix, "ttl": ttl})
+
+    async def get_stats(self) -> Dict[str, int]:
+        return await self._call("get_stats")
+
+    @staticmethod
+    def _subscribe_args(op: str, key: str, sub_id: int) -> Dict[str, Any]:
+        return {"key" if op == "subscribe" else "pattern": key, "sub": sub_id}
+
+    async def _subscribe(self, op: str, subscription: Subscription) -> Subscription:
+        self._next_sub_id += 1
+        sub_id = self._next_sub_id
+        self._subscriptions[sub_id] = (op, subscription)
+        try:
+            await self._call(op, **self._subscribe_args(op, subscription.key, sub_id))
+        except BaseException:
+            self._subscriptions.pop(sub_id, None)
+            raise
+        return subscription
+
+    async def subscribe(self, key: str, callback: callable, max_pending: int = 100,
+                        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+                        on_disconnect: Optional[callable] = None) -> Subscription:
+        return await self._subscribe("subscribe", Subscription(key, callback, max_pending, overflow,
+                                                               on_disconnect))
+
+    async def subscribe_pattern(self, pattern: str, callback: callable, max_pending: int = 100,
+                                overflow: OverflowPolicy = OverflowPolicy.COALESCE_LATEST,
+                                on_disconnect: Optional[callable] = None) -> Subscription:
+        return await self._subscribe("subscribe_pattern", Subscription(pattern, callback, max_pending,
+                                                                       overflow, on_disconnect))
+
+    async def unsubscribe(self, key: str, callback: callable) -> None:
+        for sub_id, (_, subscription) in list(self._subscriptions.items()):
+            if subscription.key == key and (subscription is callback or subscription.callback == callback):
+                subscription.close()
+                del self._subscriptions[sub_id]
+                await self._call("unsubscribe", sub=sub_id)
+
+    async def unsubscribe_pattern(self, pattern: str, subscription: Subscription) -> None:
+        await self.unsubscribe(pattern, subscription)
+
+    async def post_task(self, task: Dict[str, Any], timeout: Optional[float] = None,
+                        priority: Optional[TaskPriority] = None) -> None:
+        await self._call("post_task", task=task, timeout=timeout,
+                         priority=int(priority) if priority is not None else None)
+
+    def post_task_nowait(self, task: Dict[str, Any], priority: Optional[TaskPriority] = None) -> None:
+        # 远程队列无法同步判断是否已满，这里只负责排队发送
+        self._send("post_task", {"task": task, "priority": int(priority) if priority is not None else None})
+
+    async def get_task(self) -> Optional[Dict[str, Any]]:
+        return await self._call("get_task")
+
+    def requeue_task(self, task: Dict[str, Any]) -> None:
+        self._send("requeue_task", {"task": task})
+
+    async def wait_for_task(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        return await self._call("wait_for_task", timeout=timeout)
+
+    async def post_message(self, message: Dict[str, Any]) -> None:
+        await self._call("post_message", message=message)
+
+    async def get_messages(self) -> List[Dict[str, Any]]:
+        return await self._call("get_messages")
+
+
+async def _serve(socket_path: str, data_dir: Optional[str]) -> None:
+    blackboard = Blackboard(persistence=BlackboardLog(data_dir) if data_dir else None)
+    server = BlackboardServer(blackboard, socket_path)
+    await server.start()
+    try:
+        await server.serve_forever()
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a shared blackboard server")
+    parser.add_argument("--socket", default=os.environ.get("BLACKBOARD_SOCKET", "/tmp/blackboard.sock"))
+    parser.add_argument("--data-dir", default=os.environ.get("BLACKBOARD_DATA_DIR"))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    try:
+        asyncio.run(_serve(args.socket, args.data_dir))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import logging
+
+from .blackboard import Blackboard, BlackboardEntry, ChangeFeedGapError
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_message(entries: Dict[str, BlackboardEntry], seq: int, epoch: str) -> Dict[str, Any]:
+    """全量同步消息：客户端用它替换本地副本，然后从 (epoch, seq) 继续接收增量."""
+    return {"type": "snapshot", "epoch": epoch, "seq": seq,
+            "entries": {key: entry.to_dict() for key, entry in entries.items()}}
+
+
+def changes_message(changes: List[Dict[str, Any]], seq: int, epoch: str) -> Dict[str, Any]:
+    return {"type": "changes", "epoch": epoch, "seq": seq, "changes": changes}
+
+
+async def stream_changes(blackboard: Blackboard, send: Callable[[Dict[str, Any]], Awaitable[None]],
+                         since: Optional[int] = None, epoch: Optional[str] = None) -> None:
+    """持续把黑板的变更推送给一个客户端，直到 send 抛出异常（例如连接断开）.
+
+    since / epoch 为客户端上次收到的序号和纪元时先补发之后的增量；没有 since、
+    纪元已经变了（黑板重启过），或者 since 不在变更日志保留的范围内时先发送一次
+    全量快照。推送过程中客户端落后太多（变更日志已被覆盖）时同样重新发送快照，
+    之后继续推送增量。
+    """
+    async def resync() -> Tuple[int, str]:
+        # 远程黑板可能在推送过程中重启，每次全量同步都重新取纪元
+        current_epoch = await blackboard.get_epoch()
+        entries, seq = await blackboard.get_snapshot()
+        await send(snapshot_message(entries, seq, current_epoch))
+        return seq, current_epoch
+
+    current_epoch = await blackboard.get_epoch()
+    seq = since if epoch is None or epoch == current_epoch else None
+    if seq is not None:
+        try:
+            # timeout=0：立即返回已有的增量（RemoteBlackboard 没有同步的 changes_since）
+            changes, seq = await blackboard.wait_for_changes(seq, timeout=0)
+            if changes:
+                await send(changes_message(changes, seq, current_epoch))
+        except ChangeFeedGapError:
+            seq = None
+    if seq is None:
+        seq, current_epoch = await resync()
+
+    while True:
+        try:
+            async for changes, seq in blackboard.watch_changes(seq):
+                await send(changes_message(changes, seq, current_epoch))
+        except ChangeFeedGapError:
+            logger.info(f"Change feed cursor {seq} is no longer valid; resending a snapshot")
+            seq, current_epoch = await resync()
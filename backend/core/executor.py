@@ -0,0 +1,118 @@
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, Tuple, Union
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+import asyncio
+import importlib
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CPUJob:
+    """可序列化的任务描述：函数以 "模块:函数名" 表示，参数须可 pickle.
+
+    只传函数路径而不是函数对象，工作进程按名字导入，调用方不需要把闭包
+    或绑定方法送过进程边界。
+    """
+    func: str
+    args: Tuple[Any, ...] = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def of(cls, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> "CPUJob":
+        """用一个模块级函数构造任务描述."""
+        return cls(f"{fn.__module__}:{fn.__qualname__}", args, kwargs)
+
+
+def _resolve(func: str) -> Callable[..., Any]:
+    module_name, _, name = func.partition(":")
+    target: Any = importlib.import_module(module_name)
+    for part in name.split("."):
+        target = getattr(target, part)
+    return target
+
+
+def _run_job(job: CPUJob) -> Any:
+    # 在工作进程中执行
+    return _resolve(job.func)(*job.args, **job.kwargs)
+
+
+class CPUExecutor:
+    """共享的进程池，用来把 CPU 密集的步骤（HTML 解析、图片解码等）移出事件循环.
+
+    进程池在第一次使用时才创建。max_workers=0 时在调用方线程内直接执行，
+    适合不允许创建子进程的环境或调试。
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self._pool: Optional[Executor] = None
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            logger.info(f"CPU executor started with {self._pool._max_workers} processes")
+        return self._pool
+
+    async def run(self, job: Union[CPUJob, Callable[..., Any]], *args: Any, **kwargs: Any) -> Any:
+        """在进程池中执行一个任务并等待结果.
+
+        job 可以是 CPUJob，也可以是模块级函数（连同 args/kwargs）。
+        """
+        if not isinstance(job, CPUJob):
+            job = CPUJob.of(job, *args, **kwargs)
+        if self.max_workers == 0:
+            return _run_job(job)
+        return await asyncio.get_running_loop().run_in_executor(self._get_pool(), _run_job, job)
+
+    async def run_many(self, jobs: Iterable[CPUJob]) -> AsyncIterator[Tuple[int, Any]]:
+        """并行执行多个任务，按完成顺序逐个产出 (序号, 结果).
+
+        任务抛出的异常作为结果产出，不会中断其余任务。
+        """
+        async def indexed(index: int, job: CPUJob) -> Tuple[int, Any]:
+            try:
+                return index, await self.run(job)
+            except Exception as e:
+                return index, e
+
+        pending = [asyncio.ensure_future(indexed(i, job)) for i, job in enumerate(jobs)]
+        try:
+            for next_done in asyncio.as_completed(pending):
+                yield await next_done
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self) -> None:
+        """关闭进程池；正在执行的任务会先完成."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+_executor: Optional[CPUExecutor] = None
+
+
+def get_executor() -> CPUExecutor:
+    """返回进程内共享的 CPUExecutor（进程数由 CPU_WORKERS 环境变量决定）."""
+    global _executor
+    if _executor is None:
+        workers = os.environ.get("CPU_WORKERS")
+        _executor = CPUExecutor(int(workers) if workers else None)
+    return _executor
+
+
+async def run_cpu(job: Union[CPUJob, Callable[..., Any]], *args: Any, **kwargs: Any) -> Any:
+    """在共享进程池中执行 CPU 密集的函数."""
+    return await get_executor().run(job, *args, **kwargs)
+
+
+def shutdown_executor() -> None:
+    """关闭共享进程池（应用退出时调用）."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
@@ -0,0 +1,206 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+import asyncio
+import json
+import logging
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+_WAL_NAME = re.compile(r"^wal\.(\d+)\.jsonl$")
+
+# JSON 不能直接表示、但需要原样恢复的类型，写入时带上类型标记
+_TYPE_TAG = "__blackboard_type__"
+
+
+def _encode_value(value: Any) -> Dict[str, Any]:
+    """json.dumps 的 default：显式转换已知类型，其余类型直接报错而不是悄悄变成字符串."""
+    if isinstance(value, datetime):
+        return {_TYPE_TAG: "datetime", "value": value.isoformat()}
+    if isinstance(value, date):
+        return {_TYPE_TAG: "date", "value": value.isoformat()}
+    if isinstance(value, frozenset):
+        return {_TYPE_TAG: "frozenset", "value": list(value)}
+    if isinstance(value, set):
+        return {_TYPE_TAG: "set", "value": list(value)}
+    raise TypeError(f"Object of type {type(value).__name__} cannot be persisted to the blackboard log")
+
+
+_DECODERS: Dict[str, Callable[[Any], Any]] = {
+    "datetime": datetime.fromisoformat,
+    "date": date.fromisoformat,
+    "frozenset": frozenset,
+    "set": set,
+}
+
+
+def _decode_object(data: Dict[str, Any]) -> Any:
+    tag = data.get(_TYPE_TAG)
+    if tag in _DECODERS and len(data) == 2:
+        return _DECODERS[tag](data["value"])
+    return data
+
+
+def dumps(record: Any) -> str:
+    """把记录编码为一行 JSON；包含无法持久化的值时抛出 TypeError."""
+    return json.dumps(record, ensure_ascii=False, default=_encode_value)
+
+
+def loads(line: str) -> Any:
+    return json.loads(line, object_hook=_decode_object)
+
+
+class BlackboardLog:
+    """黑板的持久化后端：追加写的 WAL（JSON Lines）加定期压缩的快照.
+
+    - 写入只把记录追加到内存缓冲区，后台任务每 flush_interval 秒把整批记录
+      一次写入并 fsync（group commit），所以不会每次 write 都付出一次 fsync；
+      进程崩溃最多丢失最后一个刷盘周期内的写入。
+    - WAL 记录数超过 compact_every 时切换到新的 WAL 文件并写入快照，
+      之后删除旧 WAL，启动时只需读取快照和其后的 WAL。
+    - 所有文件 IO 都在一个单线程执行器中按提交顺序执行，不阻塞事件循环。
+    """
+
+    def __init__(self, directory: str, flush_interval: float = 0.05,
+                 compact_every: int = 10000):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.compact_every = compact_every
+        os.makedirs(directory, exist_ok=True)
+
+        self._buffer: List[str] = []
+        self._generation = 0
+        self._records_since_snapshot = 0
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="blackboard-wal")
+        self._file = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._snapshot_provider: Optional[Callable[[], Dict[str, Any]]] = None
+
+    @property
+    def _snapshot_path(self) -> str:
+        return os.path.join(self.directory, "snapshot.json")
+
+    def _wal_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"wal.{generation}.jsonl")
+
+    def _wal_generations(self) -> List[int]:
+        generations = []
+        for name in os.listdir(self.directory):
+            match = _WAL_NAME.match(name)
+            if match:
+                generations.append(int(match.group(1)))
+        return sorted(generations)
+
+    def load(self) -> Tuple[Optional[Dict[str, Any]], Iterator[Dict[str, Any]]]:
+        """读取快照和其后的所有 WAL 记录（用于启动时重放）."""
+        snapshot = None
+        if os.path.exists(self._snapshot_path):
+            with open(self._snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f, object_hook=_decode_object)
+        start = snapshot.get("wal_generation", 0) if snapshot else 0
+        generations = [g for g in self._wal_generations() if g >= start]
+        self._generation = max(generations + [start])
+        return snapshot, self._read_records(generations)
+
+    def _read_records(self, generations: List[int]) -> Iterator[Dict[str, Any]]:
+        for generation in generations:
+            with open(self._wal_path(generation), "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = loads(line)
+                    except json.JSONDecodeError:
+                        # 崩溃时最后一行可能只写了一半
+                        logger.warning(f"Skipping torn record in WAL generation {generation}")
+                        continue
+                    self._records_since_snapshot += 1
+                    yield record
+
+    def start(self, snapshot_provider: Callable[[], Dict[str, Any]]) -> None:
+        """开始接受记录；snapshot_provider 返回压缩时要写入的完整状态."""
+        self._snapshot_provider = snapshot_provider
+        self._wakeup = asyncio.Event()
+        self._flusher = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """追加一条记录，稍后批量刷盘；记录无法序列化时抛出 TypeError，不写入任何内容."""
+        self._buffer.append(dumps(record))
+        self._records_since_snapshot += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            # 等一个刷盘周期，让这段时间内的写入合并成一次 fsync
+            await asyncio.sleep(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                await self.flush()
+                if self.compact_every and self._records_since_snapshot >= self.compact_every:
+                    await self.compact()
+            except Exception as e:
+                logger.error(f"Error flushing blackboard WAL: {str(e)}")
+
+    async def flush(self) -> None:
+        """把缓冲区中的记录写入当前 WAL 并 fsync."""
+        if not self._buffer:
+            return
+        lines, self._buffer = self._buffer, []
+        await asyncio.get_running_loop().run_in_executor(self._io, self._write_lines, lines)
+
+    def _write_lines(self, lines: List[str], generation: Optional[int] = None) -> None:
+        if self._file is None:
+            generation = self._generation if generation is None else generation
+            self._file = open(self._wal_path(generation), "a", encoding="utf-8")
+        self._file.write("\n".join(lines) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    async def compact(self) -> None:
+        """切换到新的 WAL 文件，写入快照，然后删除旧的 WAL."""
+        if self._snapshot_provider is None:
+            return
+        loop = asyncio.get_running_loop()
+        # 取状态、交换缓冲区、递增代号必须在同一个同步步骤中完成，
+        # 这样快照之后的记录一定落在新一代 WAL 中
+        lines, self._buffer = self._buffer, []
+        previous = self._generation
+        self._generation += 1
+        self._records_since_snapshot = 0
+        state = self._snapshot_provider()
+        state["wal_generation"] = self._generation
+        await loop.run_in_executor(self._io, self._rotate, lines, previous)
+        await loop.run_in_executor(self._io, self._write_snapshot, state)
+
+    def _rotate(self, lines: List[str], generation: Optional[int] = None) -> None:
+        # 快照之前的记录属于旧一代 WAL（当前还没打开文件时也一样），快照写好后随旧 WAL 一起删除
+        if lines:
+            self._write_lines(lines, generation)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write_snapshot(self, state: Dict[str, Any]) -> None:
+        tmp_path = self._snapshot_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(dumps(state))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._snapshot_path)
+        for generation in self._wal_generations():
+            if generation < state["wal_generation"]:
+                os.remove(self._wal_path(generation))
+
+    async def close(self) -> None:
+        """刷出剩余记录并关闭文件."""
+        if self._flusher and not self._flusher.done():
+            self._flusher.cancel()
+        await self.flush()
+        await asyncio.get_running_loop().run_in_executor(self._io, self._rotate, [])
+        self._io.shutdown(wait=True)
@@ -0,0 +1,81 @@
+from typing import Dict, Iterable, List, Optional
+from enum import Enum
+import logging
+import random
+
+from .agent import Agent
+
+logger = logging.getLogger(__name__)
+
+
+class DispatchStrategy(str, Enum):
+    LEAST_OUTSTANDING = "least_outstanding"    # 选未完成请求最少的副本
+    POWER_OF_TWO = "power_of_two"              # 随机取两个副本，选负载较低的一个
+
+
+class CapabilityRegistry:
+    """按能力组织的 Agent 副本池.
+
+    每个 Agent 自动拥有以自己 agent_id 命名的能力，另外可以声明任意能力
+    （如 "teach"）；同一能力下的多个 Agent 组成副本池。pick() 根据副本的
+    实时负载（Agent.load()：处理中 + 排队中的请求数）选择副本，负载相同
+    时轮换，避免总是落到同一个副本上。
+    """
+
+    def __init__(self, strategy: DispatchStrategy = DispatchStrategy.LEAST_OUTSTANDING):
+        self.strategy = DispatchStrategy(strategy)
+        self._pools: Dict[str, List[Agent]] = {}
+        self._capabilities: Dict[str, List[str]] = {}
+        self._rotation: Dict[str, int] = {}
+
+    def register(self, agent: Agent, capabilities: Iterable[str] = ()) -> None:
+        """注册（或重新注册）一个 Agent 及其能力."""
+        self.unregister(agent.agent_id)
+        names = [agent.agent_id] + [c for c in capabilities if c != agent.agent_id]
+        self._capabilities[agent.agent_id] = names
+        for name in names:
+            self._pools.setdefault(name, []).append(agent)
+
+    def unregister(self, agent_id: str) -> None:
+        for name in self._capabilities.pop(agent_id, []):
+            pool = [a for a in self._pools.get(name, []) if a.agent_id != agent_id]
+            if pool:
+                self._pools[name] = pool
+            else:
+                self._pools.pop(name, None)
+
+    def replicas(self, capability: str) -> List[Agent]:
+        """某个能力下的所有副本."""
+        return list(self._pools.get(capability, []))
+
+    def capabilities_of(self, agent_id: str) -> List[str]:
+        return list(self._capabilities.get(agent_id, []))
+
+    def pick(self, capability: str) -> Optional[Agent]:
+        """按调度策略为一个请求选择副本；没有副本时返回 None."""
+        pool = self._pools.get(capability)
+        if not pool:
+            return None
+        if len(pool) == 1:
+            return pool[0]
+        if self.strategy == DispatchStrategy.POWER_OF_TWO:
+            first, second = random.sample(pool, 2)
+            return first if first.load() <= second.load() else second
+        # 从轮换位置开始找最小负载，负载相同的副本轮流被选中
+        start = self._rotation.get(capability, 0) % len(pool)
+        self._rotation[capability] = start + 1
+        ordered = pool[start:] + pool[:start]
+        return min(ordered, key=lambda agent: agent.load())
+
+    def candidates(self, capability: str) -> List[Agent]:
+        """按负载从低到高排列的副本，pick() 的结果排在最前（用于过载时换副本重试）."""
+        first = self.pick(capability)
+        if first is None:
+            return []
+        rest = sorted((a for a in self._pools[capability] if a is not first), key=lambda a: a.load())
+        return [first] + rest
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """每个能力下各副本的当前负载."""
+        return {name: {agent.agent_id: agent.load() for agent in pool}
+                for name, pool in self._pools.items()}
@@ -0,0 +1,171 @@
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+from collections import deque
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AhoCorasick:
+    """多模式字符串匹配自动机：一次扫描找出文本中出现的所有模式.
+
+    保存稀疏的 goto 转移和失败链接，匹配时沿失败链接回退；每个状态只存
+    自己的转移，内存与模式总长度成正比。回退次数摊还后不超过文本长度，
+    匹配耗时与模式数量无关。
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns = list(patterns)
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                nxt = goto[state].get(char)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][char] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(index)
+
+        # 按 BFS 顺序计算失败链接；失败状态更浅，它的输出已经合并完毕
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state] = outputs[state] + outputs[fail[state]]
+            for char, nxt in goto[state].items():
+                target = fail[state]
+                while target and char not in goto[target]:
+                    target = fail[target]
+                fail[nxt] = goto[target].get(char, 0)
+                queue.append(nxt)
+        self._goto = goto
+        self._fail = fail
+        self._outputs: List[Tuple[int, ...]] = [tuple(o) for o in outputs]
+
+    def iter_matches(self, text: str) -> Iterator[int]:
+        """依次产出在 text 中出现的模式序号（同一模式出现多次就产出多次）."""
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                yield from outputs[state]
+
+    def matches(self, text: str) -> set:
+        """text 中出现过的模式序号集合."""
+        goto = self._goto
+        fail = self._fail
+        outputs = self._outputs
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return found
+
+
+@dataclass(frozen=True)
+class RoutingRule:
+    agent: str
+    keywords: Tuple[str, ...]
+    weight: float = 1.0
+
+
+# config.json 中没有 routing 配置时使用的默认规则
+DEFAULT_ROUTING = {
+    "default_agent": "teacher_agent",
+    "rules": [
+        {"agent": "faq_generator", "keywords": ["faq", "常见问题"], "weight": 1.0},
+        {"agent": "knowledge_crawler", "keywords": ["搜索", "查找"], "weight": 1.0},
+        {"agent": "quiz_generator", "keywords": ["测试", "quiz", "考试"], "weight": 1.0},
+    ],
+    "topic_overrides": {
+        "system_faq": "faq_generator",
+        "search": "knowledge_crawler",
+        "quiz": "quiz_generator",
+    },
+}
+
+
+class KeywordRouter:
+    """数据驱动的关键词路由.
+
+    所有规则的关键词编译进同一个 Aho-Corasick 自动机，每个问题只扫描一遍。
+    每个命中的关键词（无论出现几次）为其规则的 Agent 加上规则权重，
+    得分最高的 Agent 胜出，同分时规则在配置中靠前者优先；没有命中时返回
+    default_agent。topic_overrides 中列出的主题直接决定 Agent，不看问题内容。
+    """
+
+    def __init__(self, rules: Sequence[RoutingRule], topic_overrides: Optional[Dict[str, str]] = None,
+                 default_agent: str = "teacher_agent"):
+        self.rules = list(rules)
+        self.topic_overrides = {k.lower(): v for k, v in (topic_overrides or {}).items()}
+        self.default_agent = default_agent
+
+        # 同一个关键词可以属于多条规则
+        keyword_rules: Dict[str, List[int]] = {}
+        for rule_index, rule in enumerate(self.rules):
+            for keyword in rule.keywords:
+                keyword_rules.setdefault(keyword.lower(), []).append(rule_index)
+        self._automaton = AhoCorasick(list(keyword_rules))
+        self._pattern_rules = [tuple(keyword_rules[p]) for p in self._automaton.patterns]
+        # Agent 在配置中第一次出现的位置，用于同分时决定先后
+        self._agent_rank: Dict[str, int] = {}
+        for rule_index, rule in enumerate(self.rules):
+            self._agent_rank.setdefault(rule.agent, rule_index)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "KeywordRouter":
+        """从 config.json 的 routing 部分构建路由器."""
+        routing = config.get("routing") or DEFAULT_ROUTING
+        rules = [RoutingRule(r["agent"], tuple(r.get("keywords", [])), float(r.get("weight", 1.0)))
+                 for r in routing.get("rules", [])]
+        return cls(rules, routing.get("topic_overrides"), routing.get("default_agent", "teacher_agent"))
+
+    @classmethod
+    def from_file(cls, path: str = "config.json") -> "KeywordRouter":
+        """读取配置文件；文件不可用时退回默认规则."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load routing config from {path}: {str(e)}")
+            config = {}
+        return cls.from_config(config)
+
+    def scores(self, question: str) -> Dict[str, float]:
+        """每个 Agent 的得分（只包含有关键词命中的 Agent）."""
+        scores: Dict[str, float] = {}
+        rules = self.rules
+        for pattern in self._automaton.matches(question.lower()):
+            for rule_index in self._pattern_rules[pattern]:
+                rule = rules[rule_index]
+                scores[rule.agent] = scores.get(rule.agent, 0.0) + rule.weight
+        return scores
+
+    def match(self, question: str, topic: str = "") -> Optional[str]:
+        """按主题和关键词选择 Agent；没有任何规则命中时返回 None."""
+        override = self.topic_overrides.get(topic.lower()) if topic else None
+        if override:
+            return override
+        scores = self.scores(question)
+        if not scores:
+            return None
+        # 同分时按规则顺序（先出现的 Agent 优先）
+        return max(scores, key=lambda agent: (scores[agent], -self._agent_rank[agent]))
+
+    def route(self, question: str, topic: str = "") -> str:
+        """为一个问题选择 Agent，没有命中时返回 default_agent."""
+        return self.match(question, topic) or self.default_agent
@@ -0,0 +1,179 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import logging
+import re
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 是可选依赖，缺失时语义路由不可用
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+class HashedNgramEmbedder:
+    """把文本映射为定长向量：字符 n-gram 经哈希落到 dim 个桶里（带符号），再做 L2 归一化.
+
+    不需要模型文件，也不需要训练或分词；对改写、语序变化和错别字有一定容忍度。
+    单个字符几乎不区分意图（英文字母在所有问题中都出现），按 unigram_weight 降权，
+    只为中文单字保留少量信号。
+    """
+
+    def __init__(self, dim: int = 1024, ngram_range: Tuple[int, int] = (1, 4),
+                 unigram_weight: float = 0.25):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.unigram_weight = unigram_weight
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return " " + re.sub(r"\s+", " ", text.lower()).strip() + " "
+
+    def _features(self, text: str) -> Dict[int, float]:
+        text = self._normalize(text)
+        features: Dict[int, float] = {}
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            weight = self.unigram_weight if n == 1 else 1.0
+            if not weight:
+                continue
+            for i in range(len(text) - n + 1):
+                h = zlib.crc32(text[i:i + n].encode("utf-8"))
+                bucket = h % self.dim
+                # 用哈希的最高位决定符号，减少桶冲突带来的偏差
+                features[bucket] = features.get(bucket, 0.0) + (weight if h & 0x80000000 else -weight)
+        return features
+
+    def embed_many(self, texts: Sequence[str]) -> "np.ndarray":
+        """返回形状为 (len(texts), dim) 的 float32 矩阵，每行已归一化."""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            features = self._features(text)
+            if features:
+                matrix[row, list(features)] = list(features.values())
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+class CentroidIndex:
+    """每个 Agent 一个示例问题的质心向量；查询就是一次矩阵乘法."""
+
+    def __init__(self, embedder: HashedNgramEmbedder):
+        self.embedder = embedder
+        self.agents: List[str] = []
+        self._centroids: Optional["np.ndarray"] = None
+
+    def build(self, exemplars: Dict[str, Sequence[str]]) -> None:
+        """用 {agent_id: [示例问题, ...]} 构建索引."""
+        self.agents = [agent for agent, texts in exemplars.items() if texts]
+        rows = []
+        for agent in self.agents:
+            centroid = self.embedder.embed_many(exemplars[agent]).mean(axis=0)
+            norm = np.linalg.norm(centroid)
+            rows.append(centroid / norm if norm else centroid)
+        self._centroids = np.vstack(rows) if rows else np.zeros((0, self.embedder.dim), dtype=np.float32)
+
+    def similarities(self, vectors: "np.ndarray") -> "np.ndarray":
+        """每个查询向量与每个 Agent 质心的余弦相似度，形状为 (查询数, Agent 数)."""
+        return vectors @ self._centroids.T
+
+    def query(self, vectors: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+        """返回每个查询向量最相近的 Agent 序号及其余弦相似度."""
+        similarities = self.similarities(vectors)
+        best = similarities.argmax(axis=1)
+        return best, similarities[np.arange(len(best)), best]
+
+    def __len__(self) -> int:
+        return len(self.agents)
+
+
+class SemanticRouter:
+    """按语义相似度把问题路由到 Agent，用于关键词规则没有命中的问题.
+
+    并发到达的问题会在 batch_window 秒内（默认 0：同一轮事件循环内）或攒够
+    max_batch 个后合并成一批，一次完成向量化和矩阵乘法。
+
+    误路由的代价是一次额外的 Agent 往返，所以只有把握足够时才离开默认 Agent：
+    最相近的 Agent 的相似度要不低于 threshold，并且比 default_agent 的相似度
+    高出至少 margin，否则不给出结论。
+    """
+
+    def __init__(self, exemplars: Dict[str, Sequence[str]], threshold: float = 0.1,
+                 margin: float = 0.1, default_agent: str = "teacher_agent",
+                 dim: int = 1024, batch_window: float = 0.0, max_batch: int = 64):
+        if np is None:
+            raise ImportError("SemanticRouter requires numpy")
+        self.threshold = threshold
+        self.margin = margin
+        self.default_agent = default_agent
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.index = CentroidIndex(HashedNgramEmbedder(dim))
+        self.index.build(exemplars)
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.Handle] = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["SemanticRouter"]:
+        """从 config.json 的 routing.semantic 部分构建；未配置或缺少 NumPy 时返回 None."""
+        semantic = (config.get("routing") or {}).get("semantic") or {}
+        if not semantic.get("enabled") or not semantic.get("exemplars"):
+            return None
+        if np is None:
+            logger.warning("Semantic routing is enabled but numpy is not installed; falling back to keywords")
+            return None
+        return cls(semantic["exemplars"], threshold=float(semantic.get("threshold", 0.1)),
+                   margin=float(semantic.get("margin", 0.1)),
+                   default_agent=(config.get("routing") or {}).get("default_agent", "teacher_agent"),
+                   dim=int(semantic.get("dim", 1024)))
+
+    def classify_many(self, questions: Sequence[str]) -> List[Tuple[Optional[str], float]]:
+        """同步地为一批问题选择 Agent，返回 (agent_id 或 None, 相似度)."""
+        if not questions or not len(self.index):
+            return [(None, 0.0) for _ in questions]
+        similarities = self.index.similarities(self.index.embedder.embed_many(questions))
+        best = similarities.argmax(axis=1)
+        scores = similarities[np.arange(len(best)), best]
+        if self.default_agent in self.index.agents:
+            baseline = similarities[:, self.index.agents.index(self.default_agent)]
+        else:
+            baseline = np.zeros(len(best), dtype=similarities.dtype)
+        results = []
+        for i, score, base in zip(best.tolist(), scores.tolist(), baseline.tolist()):
+            confident = score >= self.threshold and score - base >= self.margin
+            results.append((self.index.agents[i] if confident else None, float(score)))
+        return results
+
+    async def classify(self, question: str) -> Tuple[Optional[str], float]:
+        """为一个问题选择 Agent；与同一时间窗内的其他问题合并计算."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((question, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            if self.batch_window > 0:
+                self._flush_handle = loop.call_later(self.batch_window, self._flush)
+            else:
+                self._flush_handle = loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        try:
+            results = self.classify_many([question for question, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
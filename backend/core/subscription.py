@@ -0,0 +1,190 @@
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+from collections import OrderedDict, deque
+from enum import Enum
+from fnmatch import fnmatchcase
+import asyncio
+import inspect
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(str, Enum):
+    """订阅者队列已满时的处理策略."""
+    DROP_OLDEST = "drop_oldest"            # 丢弃最早的一条通知
+    COALESCE_LATEST = "coalesce_latest"    # 同一个键只保留最新的一条
+    DISCONNECT = "disconnect"              # 断开这个订阅者
+
+
+class Subscription:
+    """一个订阅者：拥有独立的有界通知队列和投递任务.
+
+    写入方只调用 deliver() 把条目放进队列（O(1)，不等待），
+    回调在订阅者自己的任务里按顺序执行，慢订阅者不会拖慢写入方。
+    """
+
+    def __init__(self, key: str, callback: Callable[[Any], Awaitable[None]],
+                 max_pending: int = 100, overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+                 on_disconnect: Optional[Callable[["Subscription"], Any]] = None):
+        self.key = key
+        self.callback = callback
+        self.max_pending = max(1, max_pending)
+        self.overflow = OverflowPolicy(overflow)
+        self.on_disconnect = on_disconnect
+        self.dropped = 0
+        self.closed = False
+        if self.overflow == OverflowPolicy.COALESCE_LATEST:
+            self._pending: "OrderedDict[str, Any]" = OrderedDict()
+        else:
+            self._pending: Deque[Any] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def deliver(self, entry: Any) -> bool:
+        """把条目放入通知队列，订阅者已关闭时返回 False."""
+        if self.closed:
+            return False
+        if self.overflow == OverflowPolicy.COALESCE_LATEST:
+            self._pending[entry.key] = entry
+            self._pending.move_to_end(entry.key)
+            if len(self._pending) > self.max_pending:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+        else:
+            if len(self._pending) >= self.max_pending:
+                if self.overflow == OverflowPolicy.DISCONNECT:
+                    logger.warning(f"Subscriber on {self.key} is too slow, disconnecting")
+                    self.close()
+                    if self.on_disconnect:
+                        # 不在写入方的调用栈里执行回调，回调慢或出错都不影响写入
+                        asyncio.get_running_loop().call_soon(self._run_on_disconnect)
+                    return False
+                self._pending.popleft()
+                self.dropped += 1
+            self._pending.append(entry)
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._pump())
+        self._wakeup.set()
+        return True
+
+    def pending(self) -> int:
+        """队列中尚未投递的通知数."""
+        return len(self._pending)
+
+    def close(self) -> None:
+        """关闭订阅并停止投递任务."""
+        self.closed = True
+        self._pending.clear()
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    def _run_on_disconnect(self) -> None:
+        try:
+            result = self.on_disconnect(self)
+            if inspect.isawaitable(result):
+                asyncio.ensure_future(result).add_done_callback(self._log_disconnect_error)
+        except Exception as e:
+            logger.error(f"Error in disconnect callback for {self.key}: {str(e)}")
+
+    def _log_disconnect_error(self, future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Error in disconnect callback for {self.key}: {str(future.exception())}")
+
+    def _pop(self) -> Any:
+        if self.overflow == OverflowPolicy.COALESCE_LATEST:
+            return self._pending.popitem(last=False)[1]
+        return self._pending.popleft()
+
+    async def _pump(self) -> None:
+        while not self.closed:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending and not self.closed:
+                entry = self._pop()
+                try:
+                    await self.callback(entry)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error in subscriber callback for {self.key}: {str(e)}")
+
+
+_WILDCARDS = "*?["
+
+
+class _TrieNode:
+    __slots__ = ("children", "subscriptions")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # (subscription, 是否还需要 fnmatch 校验键的剩余部分)
+        self.subscriptions: List[Tuple[Subscription, bool]] = []
+
+
+class PatternIndex:
+    """按模式的字面前缀建立的前缀树索引.
+
+    模式支持前缀（"student_model_*"）和 glob（"task_result_*_2024*"）。
+    订阅挂在模式第一个通配符之前的字面前缀节点上；匹配一个键时只沿着键的
+    字符走一遍树，代价是 O(键长度)，与订阅数量无关。纯前缀模式无需额外校验，
+    其余 glob 只对前缀命中的候选做 fnmatch。
+    """
+
+    def __init__(self):
+        self._root = _TrieNode()
+        self._size = 0
+
+    @staticmethod
+    def _split(pattern: str) -> Tuple[str, bool]:
+        cut = min((i for i in (pattern.find(c) for c in _WILDCARDS) if i >= 0), default=len(pattern))
+        prefix = pattern[:cut]
+        # "prefix*" 之外的形式都需要 fnmatch；不含通配符的模式就是精确匹配
+        needs_glob = pattern[cut:] != "*"
+        return prefix, needs_glob
+
+    def add(self, pattern: str, subscription: Subscription) -> None:
+        prefix, needs_glob = self._split(pattern)
+        node = self._root
+        for char in prefix:
+            node = node.children.setdefault(char, _TrieNode())
+        node.subscriptions.append((subscription, needs_glob))
+        self._size += 1
+
+    def remove(self, pattern: str, subscription: Subscription) -> bool:
+        prefix, _ = self._split(pattern)
+        path = [self._root]
+        for char in prefix:
+            node = path[-1].children.get(char)
+            if node is None:
+                return False
+            path.append(node)
+        node = path[-1]
+        before = len(node.subscriptions)
+        node.subscriptions = [item for item in node.subscriptions if item[0] is not subscription]
+        removed = before - len(node.subscriptions)
+        self._size -= removed
+        # 回收空节点
+        for depth in range(len(prefix), 0, -1):
+            child = path[depth]
+            if child.subscriptions or child.children:
+                break
+            del path[depth - 1].children[prefix[depth - 1]]
+        return removed > 0
+
+    def match(self, key: str) -> List[Subscription]:
+        """返回所有模式匹配 key 的订阅."""
+        matched: List[Subscription] = []
+        node = self._root
+        depth = 0
+        while node is not None:
+            for subscription, needs_glob in node.subscriptions:
+                if not needs_glob or fnmatchcase(key, subscription.key):
+                    matched.append(subscription)
+            if depth == len(key):
+                break
+            node = node.children.get(key[depth])
+            depth += 1
+        return matched
+
+    def __len__(self) -> int:
+        return self._size
@@ -0,0 +1,101 @@
+from typing import Any, Callable, Deque, Dict, Iterator, List
+from collections import deque
+from enum import IntEnum
+import asyncio
+
+
+class TaskPriority(IntEnum):
+    """任务优先级，数值越大越先被处理."""
+    LOW = 1
+    MEDIUM = 2
+    HIGH = 3
+    URGENT = 4
+
+
+class _PriorityDeques:
+    """每个优先级一个 deque：入队、出队均为 O(1)（优先级个数固定）."""
+
+    def __init__(self, starvation_limit: int, task_of: Callable[[Any], Dict[str, Any]]):
+        self._task_of = task_of
+        self._levels: List[int] = sorted((int(p) for p in TaskPriority), reverse=True)
+        self._deques: Dict[int, Deque[Any]] = {p: deque() for p in self._levels}
+        # 每个优先级在非空状态下连续被跳过的次数，用于防止饥饿
+        self._skipped: Dict[int, int] = {p: 0 for p in self._levels}
+        self._starvation_limit = starvation_limit
+        self._size = 0
+
+    def _level_of(self, item: Any) -> int:
+        try:
+            priority = int(self._task_of(item).get("priority", TaskPriority.MEDIUM))
+        except (TypeError, ValueError):
+            return int(TaskPriority.MEDIUM)
+        return max(min(priority, self._levels[0]), self._levels[-1])
+
+    def append(self, item: Any) -> None:
+        self._deques[self._level_of(item)].append(item)
+        self._size += 1
+
+    def appendleft(self, item: Any) -> None:
+        self._deques[self._level_of(item)].appendleft(item)
+        self._size += 1
+
+    def popleft(self) -> Any:
+        chosen = None
+        for level in self._levels:
+            if not self._deques[level]:
+                continue
+            if chosen is None:
+                chosen = level
+            elif self._starvation_limit and self._skipped[level] >= self._starvation_limit:
+                # 低优先级任务等待太久，本次让它先走
+                chosen = level
+                break
+        for level in self._levels:
+            if level == chosen:
+                self._skipped[level] = 0
+            elif self._deques[level] and level < chosen:
+                self._skipped[level] += 1
+        self._size -= 1
+        return self._deques[chosen].popleft()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Any]:
+        for level in self._levels:
+            yield from self._deques[level]
+
+
+class TaskQueue(asyncio.Queue):
+    """按 TaskPriority 出队的有界异步任务队列.
+
+    同一优先级内保持 FIFO；低优先级任务在连续被跳过 starvation_limit 次后
+    会被提前处理一次，避免在高优先级任务持续涌入时饿死。
+    队列元素默认就是任务字典；task_of 用于元素包装了任务的情况（例如 (序号, 任务)）。
+    """
+
+    def __init__(self, maxsize: int = 0, starvation_limit: int = 8,
+                 task_of: Callable[[Any], Dict[str, Any]] = lambda item: item):
+        self._starvation_limit = starvation_limit
+        self._task_of = task_of
+        super().__init__(maxsize)
+
+    def _init(self, maxsize: int) -> None:
+        self._queue = _PriorityDeques(self._starvation_limit, self._task_of)
+
+    def _put(self, item: Any) -> None:
+        self._queue.append(item)
+
+    def _get(self) -> Any:
+        return self._queue.popleft()
+
+    def put_front_nowait(self, item: Any) -> None:
+        """把已出队但没有被处理的任务放回同优先级的队首；不受容量限制."""
+        self._queue.appendleft(item)
+        self._unfinished_tasks += 1
+        self._finished.clear()
+        self._wakeup_next(self._getters)
+
+    def snapshot(self) -> List[Any]:
+        """按出队顺序返回当前排队中的任务（不出队）."""
+        return list(self._queue)
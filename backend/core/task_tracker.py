@@ -0,0 +1,158 @@
+from typing import Any, Awaitable, Dict, Optional
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+import asyncio
+import logging
+import uuid
+
+from .blackboard import Blackboard
+
+logger = logging.getLogger(__name__)
+
+
+class TaskStatus(str, Enum):
+    PENDING = "pending"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed_out"
+
+
+@dataclass
+class TrackedTask:
+    task_id: str
+    future: asyncio.Future
+    status: TaskStatus = TaskStatus.PENDING
+    result: Any = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+    runner: Optional[asyncio.Task] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "task_id": self.task_id,
+            "status": self.status.value,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class TaskTracker:
+    """把任务 ID 映射到 future，调用方可以等待、查询或取消任务.
+
+    每个任务在自己的 asyncio.Task 中运行，超过 timeout 秒会被取消并标记为
+    timed_out。任务结束时（任何状态）结果写入黑板的 task_result_{task_id}，
+    其他进程可以通过订阅或变更流拿到；本进程内的等待者直接由 future 唤醒，
+    不需要轮询黑板。结束的任务在内存中保留 retention 秒供查询。
+    """
+
+    def __init__(self, blackboard: Blackboard, agent_id: str = "task_tracker",
+                 default_timeout: float = 120.0, retention: float = 300.0):
+        self.blackboard = blackboard
+        self.agent_id = agent_id
+        self.default_timeout = default_timeout
+        self.retention = retention
+        self._tasks: Dict[str, TrackedTask] = {}
+
+    @staticmethod
+    def new_task_id() -> str:
+        return f"task_{uuid.uuid4().hex}"
+
+    def submit(self, work: Awaitable[Any], task_id: Optional[str] = None,
+               timeout: Optional[float] = None) -> TrackedTask:
+        """开始跟踪并执行一个协程，立即返回（不等待结果）."""
+        task_id = task_id or self.new_task_id()
+        if task_id in self._tasks:
+            if asyncio.iscoroutine(work):
+                work.close()
+            raise ValueError(f"Task {task_id} already exists")
+        tracked = TrackedTask(task_id, asyncio.get_running_loop().create_future())
+        self._tasks[task_id] = tracked
+        tracked.runner = asyncio.create_task(
+            self._run(tracked, work, self.default_timeout if timeout is None else timeout))
+        tracked.runner.add_done_callback(lambda _: self._on_runner_done(tracked, work))
+        return tracked
+
+    def _on_runner_done(self, tracked: TrackedTask, work: Awaitable[Any]) -> None:
+        # 任务在开始执行之前就被取消时 _run 不会运行，这里补上收尾
+        if tracked.future.done():
+            return
+        if asyncio.iscoroutine(work):
+            work.close()
+        self._finish(tracked, TaskStatus.CANCELLED, error="Task was cancelled")
+        asyncio.get_running_loop().create_task(self._publish(tracked))
+
+    async def _run(self, tracked: TrackedTask, work: Awaitable[Any], timeout: Optional[float]) -> None:
+        try:
+            result = await asyncio.wait_for(work, timeout=timeout or None)
+            self._finish(tracked, TaskStatus.COMPLETED, result=result)
+        except asyncio.TimeoutError:
+            self._finish(tracked, TaskStatus.TIMED_OUT, error=f"Task timed out after {timeout}s")
+        except asyncio.CancelledError:
+            self._finish(tracked, TaskStatus.CANCELLED, error="Task was cancelled")
+        except Exception as e:
+            logger.error(f"Task {tracked.task_id} failed: {str(e)}")
+            self._finish(tracked, TaskStatus.FAILED, error=str(e))
+        await self._publish(tracked)
+
+    async def _publish(self, tracked: TrackedTask) -> None:
+        try:
+            await self.blackboard.write(
+                key=f"task_result_{tracked.task_id}",
+                value=tracked.to_dict(),
+                agent_id=self.agent_id,
+                metadata={"status": tracked.status.value}
+            )
+        except Exception as e:
+            logger.error(f"Error publishing result of task {tracked.task_id}: {str(e)}")
+
+    def _finish(self, tracked: TrackedTask, status: TaskStatus, result: Any = None,
+                error: Optional[str] = None) -> None:
+        tracked.status = status
+        tracked.result = result
+        tracked.error = error
+        tracked.finished_at = datetime.now()
+        if not tracked.future.done():
+            tracked.future.set_result(tracked)
+        asyncio.get_running_loop().call_later(self.retention, self._tasks.pop, tracked.task_id, None)
+
+    def get(self, task_id: str) -> Optional[TrackedTask]:
+        return self._tasks.get(task_id)
+
+    async def wait(self, task_id: str, timeout: Optional[float] = None) -> TrackedTask:
+        """等待任务结束，最多 timeout 秒；超时返回仍为 pending 的任务，不会取消它.
+
+        任务不存在时抛出 KeyError。
+        """
+        tracked = self._tasks.get(task_id)
+        if tracked is None:
+            raise KeyError(task_id)
+        if not tracked.future.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(tracked.future), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        return tracked
+
+    def cancel(self, task_id: str) -> bool:
+        """取消一个仍在运行的任务；任务不存在或已结束时返回 False."""
+        tracked = self._tasks.get(task_id)
+        if tracked is None or tracked.future.done() or tracked.runner is None:
+            return False
+        tracked.runner.cancel()
+        return True
+
+    def pending(self) -> int:
+        """仍在运行的任务数."""
+        return sum(1 for tracked in self._tasks.values() if not tracked.future.done())
+
+    async def close(self) -> None:
+        """取消所有仍在运行的任务."""
+        runners = [t.runner for t in self._tasks.values() if t.runner and not t.runner.done()]
+        for runner in runners:
+            runner.cancel()
+        await asyncio.gather(*runners, return_exceptions=True)
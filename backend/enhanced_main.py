@@ -5,6 +5,7 @@ from typing import Dict, Any, Optional, List
 from datetime import datetime
 
 from fastapi import FastAPI, WebSocket, HTTPException, Depends, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from sqlalchemy import create_engine
@@ -15,7 +16,12 @@ from sqlalchemy.ext.declarative import declarative_base
 from agents.enhanced_teacher_agent import EnhancedTeacherAgent
 from agents.enhanced_student_agent import EnhancedStudentAgent
 from agents.coordinator_agent import CoordinatorAgent, TaskPriority
-from core.blackboard import Blackboard
+from core.agent import AgentScheduler
+from core.blackboard import Blackboard, ChangeFeedGapError
+from core.blackboard_server import RemoteBlackboard
+from core.change_feed import stream_changes
+from core.persistence import BlackboardLog
+from core.subscription import OverflowPolicy
 
 # Setup logging
 logging.basicConfig(
@@ -56,8 +62,21 @@ class MessageRequest(BaseModel):
     topic: Optional[str] = None
 
 # Global state
-blackboard = Blackboard()
+# Set BLACKBOARD_SOCKET to share one blackboard server (python -m core.blackboard_server)
+# across uvicorn workers; otherwise BLACKBOARD_DATA_DIR keeps the in-process
+# blackboard's state and queued tasks across restarts
+BLACKBOARD_SOCKET = os.environ.get("BLACKBOARD_SOCKET")
+BLACKBOARD_DATA_DIR = os.environ.get("BLACKBOARD_DATA_DIR")
+if BLACKBOARD_SOCKET:
+    blackboard = RemoteBlackboard(BLACKBOARD_SOCKET)
+else:
+    blackboard = Blackboard(
+        persistence=BlackboardLog(BLACKBOARD_DATA_DIR) if BLACKBOARD_DATA_DIR else None
+    )
 coordinator: Optional[CoordinatorAgent] = None
+# Students are multiplexed over a fixed worker pool instead of one loop each
+scheduler = AgentScheduler(workers=int(os.environ.get("AGENT_WORKERS", "8")))
+TEACHER_REPLICAS = int(os.environ.get("TEACHER_REPLICAS", "1"))
 teachers: Dict[str, EnhancedTeacherAgent] = {}
 students: Dict[str, EnhancedStudentAgent] = {}
 active_connections: Dict[str, WebSocket] = {}
@@ -67,23 +86,32 @@ async def initialize_system():
     global coordinator, teachers, students
     
     try:
+        # Replay persisted blackboard state before any agent touches it
+        await blackboard.restore()
+        
+        await scheduler.start()
+        
         # Create coordinator agent
         coordinator = CoordinatorAgent("coordinator_1", blackboard)
         await coordinator.start()
         logger.info("Coordinator agent started successfully")
         
-        # Create initial teacher agent
-        teacher = EnhancedTeacherAgent("teacher_1", blackboard)
-        teachers["teacher_1"] = teacher
-        await teacher.start()
-        logger.info("Teacher agent started successfully")
-        
-        # Register teacher with coordinator
-        await coordinator.process_message({
-            "type": "register_agent",
-            "agent_id": "teacher_1",
-            "capabilities": ["teach", "evaluate", "plan"]
-        })
+        # Create teacher replicas; the coordinator balances teaching traffic across them.
+        # Only teacher_1 polls student_messages, so replicas do not all re-process the same messages
+        for i in range(1, TEACHER_REPLICAS + 1):
+            teacher_id = f"teacher_{i}"
+            teacher = EnhancedTeacherAgent(teacher_id, blackboard, poll_blackboard=(i == 1))
+            teachers[teacher_id] = teacher
+            await teacher.start()
+            
+            # Register teacher with coordinator ("teacher_agent" is the routing target for general questions)
+            await coordinator.process_message({
+                "type": "register_agent",
+                "agent_id": teacher_id,
+                "agent": teacher,
+                "capabilities": ["teacher_agent", "teach", "evaluate", "plan"]
+            })
+        logger.info(f"{TEACHER_REPLICAS} teacher agent(s) started successfully")
         
     except Exception as e:
         logger.error(f"Error initializing system: {str(e)}")
@@ -99,10 +127,10 @@ async def shutdown_event():
     """Cleanup on shutdown"""
     for teacher in teachers.values():
         await teacher.stop()
-    for student in students.values():
-        await student.stop()
+    await scheduler.stop()
     if coordinator:
         await coordinator.stop()
+    await blackboard.close()
 
 @app.post("/student/register")
 async def register_student(request: StudentRequest):
@@ -111,13 +139,14 @@ async def register_student(request: StudentRequest):
         # Create new student agent
         student = EnhancedStudentAgent(request.student_id, blackboard, request.name)
         students[request.student_id] = student
-        await student.start()
+        await scheduler.add(student)
         
         # Register student with coordinator
         if coordinator:
             await coordinator.process_message({
                 "type": "register_agent",
                 "agent_id": request.student_id,
+                "agent": student,
                 "capabilities": ["learn", "ask_questions", "submit_answers"]
             })
         
@@ -129,23 +158,30 @@ async def register_student(request: StudentRequest):
 @app.post("/message/send")
 async def send_message(request: MessageRequest):
     """Send a message to the system"""
+    if not coordinator:
+        raise HTTPException(status_code=503, detail="Coordinator is not running")
     try:
         # Create task for the message
-        if coordinator:
-            task_response = await coordinator.process_message({
-                "type": "new_task",
-                "task_id": f"msg_{datetime.now().timestamp()}",
-                "task_type": "process_message",
-                "priority": TaskPriority.MEDIUM.value,
-                "data": {
-                    "sender_id": request.sender_id,
-                    "content": request.content,
-                    "topic": request.topic,
-                    "timestamp": datetime.now().isoformat()
-                }
-            })
-            
-            return {"status": "success", "task_id": task_response.get("task_id")}
+        task_response = await coordinator.process_message({
+            "type": "new_task",
+            "task_id": coordinator.task_tracker.new_task_id(),
+            "task_type": "process_message",
+            "priority": TaskPriority.MEDIUM.value,
+            "data": {
+                "sender_id": request.sender_id,
+                "content": request.content,
+                "topic": request.topic,
+                "timestamp": datetime.now().isoformat()
+            }
+        })
+        
+        if task_response is None:
+            raise HTTPException(status_code=500, detail="Coordinator failed to accept the task")
+        if task_response.get("type") != "task_accepted":
+            raise HTTPException(status_code=409, detail=task_response.get("content"))
+        return {"status": "success", "task_id": task_response.get("task_id")}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error sending message: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -169,22 +205,104 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
                     }
                 })
         
-        await blackboard.subscribe(f"response_{client_id}", handle_update)
+        # Slow clients only ever see the latest response instead of stalling writers
+        subscription = await blackboard.subscribe(
+            f"response_{client_id}",
+            handle_update,
+            overflow=OverflowPolicy.COALESCE_LATEST
+        )
+        
+        # Push each task's result to the client as soon as it completes
+        async def push_result(task_id: str):
+            try:
+                result = (await coordinator.task_tracker.wait(task_id)).to_dict()
+            except KeyError:
+                # The tracker already dropped the task; its result is still on the blackboard until the TTL
+                entry = await blackboard.read(f"task_result_{task_id}")
+                if entry is None:
+                    return
+                result = entry.value
+            await websocket.send_json(jsonable_encoder({"type": "task_result", "data": result}))
         
+        pushes = set()
         try:
             while True:
                 data = await websocket.receive_json()
-                await send_message(MessageRequest(**data))
+                try:
+                    accepted = await send_message(MessageRequest(**data))
+                except HTTPException as e:
+                    await websocket.send_json({"type": "error", "data": {"detail": e.detail}})
+                    continue
+                if accepted and accepted.get("task_id"):
+                    push = asyncio.create_task(push_result(accepted["task_id"]))
+                    pushes.add(push)
+                    push.add_done_callback(pushes.discard)
         except WebSocketDisconnect:
             active_connections.pop(client_id, None)
-            # Cleanup
-            # Note: We should also unsubscribe from blackboard updates here
+        finally:
+            for push in list(pushes):
+                push.cancel()
+            await blackboard.unsubscribe(f"response_{client_id}", subscription)
             
     except Exception as e:
         logger.error(f"WebSocket error: {str(e)}")
         if client_id in active_connections:
             active_connections.pop(client_id)
 
+@app.get("/tasks/{task_id}")
+async def get_task_result(task_id: str, wait: float = 0):
+    """Return a task's status and result, long-polling up to `wait` seconds for it to finish"""
+    if not coordinator:
+        raise HTTPException(status_code=503, detail="Coordinator is not running")
+    try:
+        tracked = await coordinator.task_tracker.wait(task_id, timeout=min(max(wait, 0), 60))
+    except KeyError:
+        # Finished tasks leave the tracker after a while but stay on the blackboard until their TTL
+        entry = await blackboard.read(f"task_result_{task_id}")
+        if entry is None:
+            raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+        return jsonable_encoder(entry.value)
+    return jsonable_encoder(tracked.to_dict())
+
+@app.delete("/tasks/{task_id}")
+async def cancel_task(task_id: str):
+    """Cancel a running task"""
+    if not coordinator or not coordinator.task_tracker.cancel(task_id):
+        raise HTTPException(status_code=404, detail=f"Task {task_id} is not running")
+    return {"status": "success", "task_id": task_id}
+
+@app.get("/blackboard/changes")
+async def get_blackboard_changes(since: int = 0, wait: float = 0, epoch: Optional[str] = None):
+    """Return blackboard changes after `since`, long-polling up to `wait` seconds
+
+    `since` is only meaningful within the epoch it was issued in; 410 tells the
+    client its cursor is stale (e.g. after a restart) and it must resync.
+    """
+    current_epoch = await blackboard.get_epoch()
+    if epoch is not None and epoch != current_epoch:
+        raise HTTPException(status_code=410, detail=f"Blackboard epoch changed to {current_epoch}")
+    try:
+        changes, seq = await blackboard.wait_for_changes(since, timeout=min(max(wait, 0), 60))
+    except ChangeFeedGapError as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    return jsonable_encoder({"epoch": current_epoch, "seq": seq, "changes": changes})
+
+@app.websocket("/ws/blackboard/changes")
+async def blackboard_changes_endpoint(websocket: WebSocket, since: Optional[int] = None,
+                                     epoch: Optional[str] = None):
+    """Stream blackboard deltas; clients only get a full snapshot when they cannot resume"""
+    await websocket.accept()
+
+    async def send(message: Dict[str, Any]) -> None:
+        await websocket.send_json(jsonable_encoder(message))
+
+    try:
+        await stream_changes(blackboard, send, since, epoch)
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Blackboard change feed error: {str(e)}")
+
 @app.get("/system/status")
 async def get_system_status():
     """Get current system status"""
@@ -192,6 +310,7 @@ async def get_system_status():
         return {
             "coordinator_status": coordinator.get_status() if coordinator else None,
             "active_teachers": len(teachers),
+            "dispatch_load": coordinator.registry.get_stats() if coordinator else None,
             "active_students": len(students),
             "active_connections": len(active_connections)
         }
@@ -4,8 +4,10 @@ import os
 import asyncio
 from typing import Dict, List, Optional, Any
 
+import aiohttp
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Depends, File, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from contextlib import asynccontextmanager
@@ -22,6 +24,12 @@ from agents.knowledge_crawler_agent import KnowledgeCrawlerAgent
 from agents.faq_generator_agent import FAQGeneratorAgent
 from agents.quiz_generator_agent import QuizGeneratorAgent
 from agents.coordinator_agent import CoordinatorAgent
+from core.agent import AgentOverloadedError
+from core.executor import run_cpu, shutdown_executor
+from tools.duckduckgo_search import get_search_tool
+from tools.http_client import close_session
+from tools.page_cache import PageCache
+from tools.web_scraper import WebScraperTool
 from core.blackboard import Blackboard
 
 # 创建异步数据库引擎
@@ -77,9 +85,11 @@ async def lifespan(app: FastAPI):
     from agents.quiz_generator_agent import QuizGeneratorAgent
     from agents.coordinator_agent import CoordinatorAgent
     from core.blackboard import Blackboard
+    from core.blackboard_server import RemoteBlackboard
 
-    # 创建共享黑板
-    blackboard = Blackboard()
+    # 创建共享黑板；设置 BLACKBOARD_SOCKET 时多个 worker 共用同一个黑板服务进程
+    blackboard_socket = os.environ.get("BLACKBOARD_SOCKET")
+    blackboard = RemoteBlackboard(blackboard_socket) if blackboard_socket else Blackboard()
 
     # 初始化协调者 Agent
     coordinator = CoordinatorAgent("coordinator", blackboard)
@@ -111,9 +121,15 @@ async def lifespan(app: FastAPI):
     print("==============================")
     yield
     print("正在关闭服务器...")
+    await close_session()
+    shutdown_executor()
 
 app = FastAPI(lifespan=lifespan)
 
+# 抓取结果的磁盘缓存；config.json 中的 target_websites 会被反复抓取
+page_cache = PageCache(os.environ.get("PAGE_CACHE_DIR", "cache/pages"),
+                       max_bytes=int(os.environ.get("PAGE_CACHE_MAX_BYTES", str(100 * 1024 * 1024))))
+
 # ===================== API 路由 =====================
 @app.post("/api/ask")
 async def ask_question(request: AskRequest, db: AsyncSession = Depends(get_db)):
@@ -148,8 +164,11 @@ async def ask_question(request: AskRequest, db: AsyncSession = Depends(get_db)):
             "timestamp": datetime.now().isoformat()
         }
         
-        # 让 Agent 处理问题
-        response = await agent.process_message(task)
+        # 让 Agent 处理问题（经由其有界收件箱，超出并发上限时排队）
+        try:
+            response = await agent.submit(task)
+        except AgentOverloadedError as e:
+            raise HTTPException(status_code=503, detail=str(e))
         print(f"Agent response: {response}")
         
         # 保存 Agent 的回复
@@ -167,6 +186,8 @@ async def ask_question(request: AskRequest, db: AsyncSession = Depends(get_db)):
         
         return {"status": "success", "message": response.get("content", str(response)), "agent_id": request.agent_name}
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in ask_question: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -267,22 +288,43 @@ async def student_interact(request: StudentInteractRequest):
 async def use_search_tool(request: ToolRequest):
     """使用 DuckDuckGo 搜索工具."""
     try:
-        tool = DuckDuckGoSearchTool()
-        result = tool.search(request.params.get("query", ""))
+        # 共享客户端与结果缓存；同一查询并发到达时只请求一次
+        result = await get_search_tool().search(request.params.get("query", ""))
         return {"result": result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/tools/scrape")
 async def use_scrape_tool(request: ToolRequest):
-    """使用网页抓取工具."""
+    """使用网页抓取工具；params 中给出 urls 列表时并发抓取多个页面."""
     try:
-        tool = WebScraperTool()
-        result = tool.scrape(request.params.get("url", ""))
+        tool = WebScraperTool(cache=page_cache)
+        urls = request.params.get("urls")
+        if urls:
+            results = await tool.scrape_many(urls)
+            return {"results": dict(zip(urls, results))}
+        result = await tool.ascrape(request.params.get("url", ""))
         return {"result": result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/tools/scrape/stream")
+async def stream_scrape_tool(request: ToolRequest):
+    """边下载边解析，以纯文本流的形式返回网页正文."""
+    tool = WebScraperTool()
+    # 响应头一旦发出就无法再改状态码，所以先确认上游可用再开始流式输出
+    try:
+        chunks = await tool.open_stream(request.params.get("url", ""))
+    except aiohttp.InvalidURL as e:
+        raise HTTPException(status_code=400, detail=f"Invalid URL: {e}")
+    except aiohttp.ClientResponseError as e:
+        raise HTTPException(status_code=502, detail=f"Upstream returned {e.status}: {e.message}")
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Upstream timed out")
+    except aiohttp.ClientError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    return StreamingResponse(chunks, media_type="text/plain; charset=utf-8")
+
 @app.post("/api/admin/action")
 async def admin_action(request: AdminRequest):
     """管理员操作接口."""
@@ -351,9 +393,9 @@ async def handle_multimodal_question(request: MultimodalRequest):
         # 如果有图片，先处理图片
         image_data = None
         if request.image:
-            # 解码 Base64 图片
-            image_bytes = base64.b64decode(request.image)
-            image = Image.open(BytesIO(image_bytes))
+            # 解码并缩放图片（在进程池中进行，不阻塞其他请求）；只有尺寸等信息和缩略图回到主进程
+            from tools.image_decoder import decode_image
+            image_data = await run_cpu(decode_image, request.image)
             # TODO: 处理图片
 
         # 获取教师 Agent
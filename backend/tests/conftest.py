@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+# 与 main.py / enhanced_main.py 相同，模块按 backend/ 为根导入（core.*、tools.*、agents.*）
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+async def stub_site():
+    from stub_site import StubSite
+
+    site = StubSite()
+    await site.start()
+    yield site
+    await site.stop()
+
+
+@pytest.fixture
+async def http_session():
+    """使用共享 aiohttp 会话的测试结束后关闭它（会话绑定在每个测试自己的事件循环上）."""
+    from tools.http_client import close_session, get_session
+
+    yield get_session()
+    await close_session()
+
+
+@pytest.fixture
+def inline_cpu(monkeypatch):
+    """让 run_cpu 在当前进程内执行，测试不需要启动进程池."""
+    from core import executor
+
+    monkeypatch.setattr(executor, "_executor", executor.CPUExecutor(0))
@@ -0,0 +1,80 @@
+"""本地桩网站：在 127.0.0.1 的随机端口上提供可配置的页面，供抓取相关的测试使用."""
+from typing import Dict, Optional, Set
+from dataclasses import dataclass, field
+import asyncio
+
+from aiohttp import web
+
+
+@dataclass
+class StubPage:
+    body: bytes
+    content_type: str = "text/html"
+    charset: Optional[str] = "utf-8"
+    status: int = 200
+    delay: float = 0.0
+    etag: Optional[str] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class StubSite:
+    """记录每个路径的请求次数、同时进行的最大请求数和使用过的 TCP 连接."""
+
+    def __init__(self):
+        self.pages: Dict[str, StubPage] = {}
+        self.hits: Dict[str, int] = {}
+        self.conditional_hits = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connections: Set[object] = set()
+        self.url = ""
+        self._runner: Optional[web.AppRunner] = None
+
+    def add(self, path: str, body, **options) -> str:
+        if isinstance(body, str):
+            body = body.encode(options.get("charset") or "utf-8")
+        self.pages[path] = StubPage(body, **options)
+        return self.url + path
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_route("GET", "/{path:.*}", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        path = "/" + request.match_info["path"]
+        self.hits[path] = self.hits.get(path, 0) + 1
+        self.connections.add(request.transport.get_extra_info("peername"))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            page = self.pages.get(path)
+            if page is None:
+                return web.Response(status=404, text="not found")
+            if page.delay:
+                await asyncio.sleep(page.delay)
+            headers = dict(page.headers)
+            if page.etag:
+                headers["ETag"] = page.etag
+                if request.headers.get("If-None-Match") == page.etag:
+                    self.conditional_hits += 1
+                    return web.Response(status=304, headers=headers)
+            content_type = page.content_type
+            if page.charset:
+                content_type += f"; charset={page.charset}"
+            headers["Content-Type"] = content_type
+            response = web.Response(status=page.status, body=page.body, headers=headers)
+            if "gzip" in request.headers.get("Accept-Encoding", ""):
+                response.enable_compression()
+            return response
+        finally:
+            self.in_flight -= 1
@@ -0,0 +1,31 @@
+import json
+
+from agents.admin_agent import AdminAgent
+
+
+def test_saving_topics_keeps_the_routing_section(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    routing = {"default_agent": "teacher_agent", "dispatch_strategy": "power_of_two",
+               "rules": [{"agent": "quiz_generator", "keywords": ["测试"], "weight": 1.0}]}
+    (tmp_path / "config.json").write_text(json.dumps({
+        "available_topics": ["math"],
+        "topic_config": {"math": {"keywords": ["函数"]}},
+        "routing": routing,
+    }, ensure_ascii=False), encoding="utf-8")
+
+    admin = AdminAgent()
+    assert admin.update_config("add_topic", {"topic_name": "history", "topic_info": {"keywords": ["二战"]}}) \
+        .startswith("Config updated")
+    admin.update_config("delete_topic", {"topic_name": "math"})
+
+    config = json.loads((tmp_path / "config.json").read_text(encoding="utf-8"))
+    assert config["routing"] == routing
+    assert config["available_topics"] == ["history"]
+    assert config["topic_config"] == {"history": {"keywords": ["二战"]}}
+
+
+def test_missing_config_is_created_with_topics_only(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    AdminAgent()
+    config = json.loads((tmp_path / "config.json").read_text(encoding="utf-8"))
+    assert config == {"available_topics": [], "topic_config": {}}
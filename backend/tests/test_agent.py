@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+
+from core.agent import Agent, AgentOverloadedError, AgentState
+from core.blackboard import Blackboard
+
+
+class EchoAgent(Agent):
+    """测试用 Agent：process_message 等待 delay 秒后原样返回，type 为 fail 时抛出异常."""
+
+    def __init__(self, agent_id: str, blackboard: Blackboard, delay: float = 0.0):
+        super().__init__(agent_id, blackboard)
+        self.delay = delay
+
+    async def run(self) -> None:
+        await self._stop_event.wait()
+
+    async def process_message(self, message):
+        await asyncio.sleep(self.delay)
+        if message.get("type") == "fail":
+            raise ValueError("bad message")
+        return {"agent": self.agent_id, **message}
+
+
+async def test_last_error_is_recorded():
+    agent = EchoAgent("echo", Blackboard())
+    assert agent.last_error is None
+    assert (await agent.submit({"type": "ok"}))["agent"] == "echo"
+    with pytest.raises(ValueError):
+        await agent.submit({"type": "fail"})
+    assert agent.last_error == "bad message"
+
+
+async def test_cancelled_wait_for_task_keeps_the_task():
+    blackboard = Blackboard()
+    agent = EchoAgent("waiter", blackboard)
+    for i in range(10):
+        waiter = asyncio.create_task(agent.wait_for_task())
+        await asyncio.sleep(0)
+        await blackboard.post_task({"id": i})
+        for _ in range(i % 3):
+            await asyncio.sleep(0)
+        waiter.cancel()
+        try:
+            received = await waiter
+        except asyncio.CancelledError:
+            received = await blackboard.get_task()
+        assert received["id"] == i
+    assert blackboard.pending_tasks() == 0
+
+
+async def test_concurrency_limit_and_bounded_inbox():
+    agent = EchoAgent("echo", Blackboard(), delay=0.01)
+    agent.max_concurrency = 2
+    agent.max_inbox = 3
+    running = [asyncio.create_task(agent.submit({"i": i})) for i in range(5)]
+    await asyncio.sleep(0)
+    assert agent._active == 2 and agent.pending_messages() == 3
+    with pytest.raises(AgentOverloadedError):
+        await agent.submit({"i": 5})
+    results = await asyncio.gather(*running)
+    assert [r["i"] for r in results] == list(range(5))
+    assert agent.load() == 0
+
+
+async def test_blackboard_helpers_leave_a_paused_agent_paused():
+    agent = EchoAgent("echo", Blackboard())
+    await agent.pause()
+    await agent.write_to_blackboard("k", 1)
+    assert await agent.read_from_blackboard("k") == 1
+    await agent.update_on_blackboard("k", lambda v: v + 1)
+    assert agent.get_state() == AgentState.PAUSED
+
+
+async def test_question_agents_answer_concurrent_requests_in_parallel():
+    from agents.teacher_agent import TeacherAgent
+
+    class SlowTeacher(TeacherAgent):
+        async def update_knowledge_base(self, key, value):
+            await asyncio.sleep(0.05)
+
+    teacher = SlowTeacher("teacher", Blackboard())
+    start = asyncio.get_running_loop().time()
+    results = await asyncio.gather(*(teacher.submit({"content": f"q{i}", "student_id": f"s{i}"})
+                                     for i in range(10)))
+    assert asyncio.get_running_loop().time() - start < 0.25
+    assert all(r["type"] == "response" for r in results)
+    assert len(teacher.conversation_history) == 10
+
+
+class OneTaskAgent(Agent):
+    """测试用 Agent：每次 run() 阻塞等待一个任务，处理完就返回."""
+
+    def __init__(self, agent_id: str, blackboard: Blackboard):
+        super().__init__(agent_id, blackboard)
+        self.handled = []
+        self.runs = 0
+
+    async def run(self) -> None:
+        self.runs += 1
+        task = await self.wait_for_task()
+        if task:
+            self.handled.append(task["id"])
+
+    async def process_message(self, message):
+        return None
+
+
+async def test_blocking_run_is_restarted_without_delay():
+    blackboard = Blackboard()
+    agent = OneTaskAgent("worker", blackboard)
+    await agent.start()
+    start = asyncio.get_running_loop().time()
+    for i in range(5):
+        await blackboard.post_task({"id": i})
+        while len(agent.handled) <= i:
+            await asyncio.sleep(0.001)
+    # 以前每次 run() 返回后固定 sleep(0.1)，五个任务至少需要 0.4 秒
+    assert asyncio.get_running_loop().time() - start < 0.2
+    await agent.stop()
+
+
+async def test_non_blocking_run_is_throttled_and_stops_promptly():
+    class PollingAgent(OneTaskAgent):
+        async def run(self) -> None:
+            self.runs += 1
+
+    agent = PollingAgent("poller", Blackboard())
+    agent.poll_interval = 0.05
+    await agent.start()
+    await asyncio.sleep(0.22)
+    start = asyncio.get_running_loop().time()
+    await agent.stop()
+    assert 3 <= agent.runs <= 6
+    assert asyncio.get_running_loop().time() - start < 0.02
+
+
+async def test_specialist_agents_leave_the_shared_task_queue_to_the_coordinator():
+    from agents.faq_generator_agent import FAQGeneratorAgent
+    from agents.teacher_agent import TeacherAgent
+
+    blackboard = Blackboard()
+    specialists = [TeacherAgent("teacher", blackboard), FAQGeneratorAgent("faq", blackboard)]
+    for agent in specialists:
+        await agent.start()
+    await blackboard.post_task({"question": "什么是导数？"})
+    await asyncio.sleep(0.02)
+    assert blackboard.pending_tasks() == 1
+    # 它们的工作经由 submit() 派发
+    assert (await specialists[0].submit({"content": "什么是导数？"}))["type"] == "response"
+    for agent in specialists:
+        await agent.stop()
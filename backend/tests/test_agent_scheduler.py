@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+
+from core.agent import Agent, AgentScheduler, AgentState
+from core.blackboard import Blackboard
+
+
+class RecordingAgent(Agent):
+    """测试用 Agent：记录处理过的消息和同时处理中的最大消息数；可选地在 key 被写入时唤醒."""
+
+    def __init__(self, agent_id: str, blackboard: Blackboard, delay: float = 0.0,
+                 wake_key: str = None):
+        super().__init__(agent_id, blackboard)
+        self.delay = delay
+        self.wake_key = wake_key
+        self.received = []
+        self.running = 0
+        self.peak = 0
+
+    async def run(self) -> None:
+        raise AssertionError("scheduled agents must not run their loop")
+
+    async def on_scheduled(self) -> None:
+        if self.wake_key:
+            await self.wake_on(self.wake_key)
+
+    async def process_message(self, message):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            self.received.append(message)
+            return message
+        finally:
+            self.running -= 1
+
+
+@pytest.fixture
+async def scheduler():
+    scheduler = AgentScheduler(workers=4)
+    yield scheduler
+    await scheduler.stop()
+
+
+async def test_agent_is_queued_once_however_many_messages_arrive(scheduler):
+    agent = RecordingAgent("a", Blackboard())
+    await scheduler.add(agent)
+    for i in range(5):
+        agent.deliver({"i": i})
+    assert list(scheduler._ready) == [agent]
+
+    await scheduler.start()
+    assert await agent.submit({"i": 5}) == {"i": 5}
+    assert [m["i"] for m in agent.received] == list(range(6))
+    assert not scheduler._ready and agent.load() == 0
+
+
+async def test_workers_respect_each_agents_concurrency_limit(scheduler):
+    limited = RecordingAgent("limited", Blackboard(), delay=0.01)
+    limited.max_concurrency = 2
+    single = RecordingAgent("single", Blackboard(), delay=0.01)
+    await scheduler.add(limited)
+    await scheduler.add(single)
+    await scheduler.start()
+
+    await asyncio.gather(*(limited.submit({"i": i}) for i in range(8)),
+                         *(single.submit({"i": i}) for i in range(4)))
+    assert (limited.peak, single.peak) == (2, 1)
+    # 单并发的 Agent 按到达顺序处理
+    assert [m["i"] for m in single.received] == list(range(4))
+
+
+async def test_remove_cancels_pending_submissions(scheduler):
+    agent = RecordingAgent("a", Blackboard(), wake_key="k")
+    await scheduler.add(agent)
+    waiting = [asyncio.create_task(agent.submit({"i": i})) for i in range(3)]
+    await asyncio.sleep(0)
+
+    await scheduler.remove(agent)
+    for task in waiting:
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    assert agent.pending_messages() == 0
+    assert agent.state == AgentState.IDLE
+    assert not agent._wake_subscriptions and len(scheduler) == 0
+
+
+async def test_stop_cancels_pending_submissions_of_every_agent():
+    scheduler = AgentScheduler(workers=1)
+    agents = [RecordingAgent(f"a{i}", Blackboard()) for i in range(2)]
+    for agent in agents:
+        await scheduler.add(agent)
+    waiting = [asyncio.create_task(agent.submit({})) for agent in agents]
+    await asyncio.sleep(0)
+
+    await scheduler.stop()
+    results = await asyncio.gather(*waiting, return_exceptions=True)
+    assert all(isinstance(r, asyncio.CancelledError) for r in results)
+    assert all(agent._scheduler is None for agent in agents)
+
+
+async def test_wake_on_delivers_blackboard_writes_until_removed(scheduler):
+    blackboard = Blackboard()
+    agent = RecordingAgent("a", blackboard, wake_key="k")
+    await scheduler.add(agent)
+    await scheduler.start()
+
+    await blackboard.write("k", {"v": 1}, "writer")
+    await blackboard.write("other", 0, "writer")
+    for _ in range(50):
+        if agent.received:
+            break
+        await asyncio.sleep(0.01)
+    assert agent.received == [{"type": "blackboard_update", "key": "k", "value": {"v": 1},
+                               "agent_id": "writer"}]
+
+    await scheduler.remove(agent)
+    await blackboard.write("k", {"v": 2}, "writer")
+    await asyncio.sleep(0.05)
+    assert len(agent.received) == 1
+
+
+async def test_paused_agent_is_not_scheduled_until_resumed(scheduler):
+    agent = RecordingAgent("a", Blackboard())
+    await scheduler.add(agent)
+    await scheduler.start()
+    await agent.pause()
+    agent.deliver({"i": 0})
+    await asyncio.sleep(0.02)
+    assert agent.received == []
+
+    await agent.resume()
+    for _ in range(50):
+        if agent.received:
+            break
+        await asyncio.sleep(0.01)
+    assert agent.received == [{"i": 0}]
@@ -0,0 +1,117 @@
+import asyncio
+import os
+import tempfile
+import time
+
+import pytest
+
+from core.agent import Agent
+from core.blackboard import Blackboard, BlackboardConflictError
+from core.blackboard_server import BlackboardServer, RemoteBlackboard
+
+
+class Reader(Agent):
+    async def run(self) -> None:
+        pass
+
+    async def process_message(self, message):
+        return None
+
+
+async def test_read_many_and_write_many():
+    blackboard = Blackboard()
+    await blackboard.write_many({"a": 1, "b": 2}, "agent", metadata={"batch": True})
+    entries = await blackboard.read_many(["a", "b", "missing"])
+    assert entries["a"].value == 1 and entries["b"].metadata == {"batch": True}
+    assert entries["missing"] is None
+
+
+async def test_batch_is_visible_all_at_once():
+    blackboard = Blackboard()
+    seen = []
+
+    async def on_update(entry):
+        # 收到第一条通知时整批都已经写入
+        seen.append(sorted((await blackboard.get_all_entries()).keys()))
+
+    await blackboard.subscribe_pattern("k*", on_update)
+    await blackboard.write_many({"k1": 1, "k2": 2, "k3": 3}, "agent")
+    await asyncio.sleep(0.01)
+    assert seen and seen[0] == ["k1", "k2", "k3"]
+
+
+async def test_commit_checks_versions():
+    blackboard = Blackboard()
+    await blackboard.write("a", 1, "agent")
+    assert not await blackboard.commit({"a": 2, "b": 2}, "agent", expected_versions={"a": 0})
+    assert (await blackboard.read("a")).value == 1
+    assert await blackboard.read("b") is None
+    assert await blackboard.commit({"a": 2, "b": 2}, "agent", expected_versions={"a": 1, "b": 0})
+    assert (await blackboard.read("a")).version == 2
+
+
+async def test_transaction_conflict():
+    blackboard = Blackboard()
+    await blackboard.write("model", {"level": 1}, "student")
+    with pytest.raises(BlackboardConflictError):
+        async with blackboard.transaction("teacher") as txn:
+            model = await txn.read("model")
+            await blackboard.write("model", {"level": 5}, "student")
+            txn.write("model", {**model, "seen": True})
+    assert (await blackboard.read("model")).value == {"level": 5}
+
+    async with blackboard.transaction("teacher") as txn:
+        values = await txn.read_many(["model", "progress"])
+        txn.write("progress", {"level": values["model"]["level"]})
+    assert (await blackboard.read("progress")).value == {"level": 5}
+
+
+async def test_agent_batch_helpers():
+    blackboard = Blackboard()
+    agent = Reader("reader", blackboard)
+    await agent.write_many_to_blackboard({"x": 1, "y": 2})
+    assert await agent.read_many_from_blackboard(["x", "y", "z"]) == {"x": 1, "y": 2, "z": None}
+    assert (await blackboard.read("x")).agent_id == "reader"
+
+
+async def _per_message(agent: Agent, n: int):
+    """教师处理一条消息需要读 3 个键、写 2 个键：逐个调用 vs 批量调用，返回每条消息的耗时."""
+    start = time.perf_counter()
+    for i in range(n):
+        sid = i % 100
+        await agent.read_from_blackboard(f"student_model_{sid}")
+        await agent.read_from_blackboard(f"student_progress_{sid}")
+        await agent.read_from_blackboard("available_topics")
+        await agent.write_to_blackboard(f"teacher_response_{sid}", i)
+        await agent.write_to_blackboard(f"teaching_state_{sid}", i)
+    sequential = (time.perf_counter() - start) / n
+
+    start = time.perf_counter()
+    for i in range(n):
+        sid = i % 100
+        await agent.read_many_from_blackboard([f"student_model_{sid}", f"student_progress_{sid}",
+                                               "available_topics"])
+        await agent.write_many_to_blackboard({f"teacher_response_{sid}": i, f"teaching_state_{sid}": i})
+    batched = (time.perf_counter() - start) / n
+    return sequential, batched
+
+
+@pytest.mark.benchmark
+async def test_benchmark_per_message_overhead():
+    local_sequential, local_batched = await _per_message(Reader("teacher", Blackboard()), 20_000)
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bb"), "bb.sock")
+    server = BlackboardServer(Blackboard(), path)
+    await server.start()
+    remote = RemoteBlackboard(path)
+    try:
+        remote_sequential, remote_batched = await _per_message(Reader("teacher", remote), 1_000)
+    finally:
+        await remote.close()
+        await server.stop()
+
+    print(f"\nper message: in-process sequential {local_sequential * 1e6:.1f}us, "
+          f"batched {local_batched * 1e6:.1f}us; blackboard server sequential "
+          f"{remote_sequential * 1e6:.0f}us, batched {remote_batched * 1e6:.0f}us")
+    assert local_batched < local_sequential * 1.5
+    assert remote_batched < remote_sequential * 0.7
@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+import pytest
+
+from core.blackboard import Blackboard
+
+
+async def test_slow_subscriber_does_not_block_writers():
+    blackboard = Blackboard()
+    release = asyncio.Event()
+
+    async def slow_callback(entry):
+        await release.wait()
+
+    await blackboard.subscribe("agent_status", slow_callback)
+    await blackboard.write("agent_status", {"state": "busy"}, "coordinator")
+    # 订阅者仍卡在回调里，其他键的读写不受影响
+    await asyncio.wait_for(blackboard.write("student_model_1", {"level": 1}, "student_1"), 0.1)
+    assert (await blackboard.read("student_model_1")).value == {"level": 1}
+    await asyncio.wait_for(blackboard.get_all_entries(), 0.1)
+    release.set()
+    await blackboard.unsubscribe("agent_status", slow_callback)
+
+
+async def test_concurrent_students_keep_their_own_keys():
+    blackboard = Blackboard()
+
+    async def student(i: int):
+        for step in range(20):
+            await blackboard.write(f"student_model_{i}", {"step": step}, f"student_{i}")
+            await blackboard.read("agent_status")
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(student(i) for i in range(200)))
+    entries = await blackboard.get_all_entries()
+    assert len(entries) == 200
+    assert all(entry.value == {"step": 19} and entry.version == 20 for entry in entries.values())
+
+
+async def test_concurrent_updates_are_not_lost():
+    blackboard = Blackboard()
+
+    async def bump():
+        for _ in range(10):
+            await blackboard.update("counter", lambda n: n + 1, "student", default=0)
+            await asyncio.sleep(0)
+
+    await asyncio.gather(*(bump() for _ in range(50)))
+    assert (await blackboard.read("counter")).value == 500
+
+
+@pytest.mark.benchmark
+async def test_benchmark_contention():
+    """数百个模拟学生并发读写各自的键，同时协调者持续刷新 agent_status 并有一个慢订阅者."""
+    blackboard = Blackboard()
+    students, rounds = 500, 50
+
+    async def slow_callback(entry):
+        await asyncio.sleep(0.01)
+
+    await blackboard.subscribe("agent_status", slow_callback)
+    stop = asyncio.Event()
+
+    async def coordinator():
+        while not stop.is_set():
+            await blackboard.write("agent_status", {"ok": True}, "coordinator")
+            await asyncio.sleep(0)
+
+    async def student(i: int):
+        latencies = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            await blackboard.read(f"student_model_{i}")
+            await blackboard.write(f"student_model_{i}", {"i": i}, f"student_{i}")
+            await blackboard.read("agent_status")
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0)
+        return latencies
+
+    monitor = asyncio.create_task(coordinator())
+    start = time.perf_counter()
+    results = await asyncio.gather(*(student(i) for i in range(students)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await monitor
+    await blackboard.unsubscribe("agent_status", slow_callback)
+
+    latencies = sorted(l for result in results for l in result)
+    p99 = latencies[int(len(latencies) * 0.99)]
+    ops = students * rounds * 3
+    print(f"\n{students} students: {ops / elapsed:,.0f} ops/s, p99 round latency {p99 * 1e6:.0f}us")
+    assert p99 < 0.005
@@ -0,0 +1,87 @@
+from datetime import datetime
+from typing import Any, Dict
+import json
+import time
+import tracemalloc
+
+import pytest
+from pydantic import BaseModel
+
+from core.blackboard import Blackboard, BlackboardEntry
+
+
+async def test_entry_dict_round_trip():
+    blackboard = Blackboard()
+    await blackboard.write("k", {"a": [1, 2]}, "agent", metadata={"topic": "math"})
+    await blackboard.write("k", {"a": [3]}, "agent")
+    entry = await blackboard.read("k")
+    data = entry.to_dict()
+    assert json.loads(json.dumps(data)) == data
+    assert data["version"] == 2
+    assert BlackboardEntry.from_dict(data) == entry
+
+
+async def test_change_feed_and_to_json_use_entry_format():
+    blackboard = Blackboard()
+    await blackboard.write("k", 1, "agent", metadata={"m": 1})
+    await blackboard.delete("k")
+    changes, seq = blackboard.changes_since(0)
+    assert seq == 2
+    assert changes[0] == {**(BlackboardEntry.from_dict(changes[0]).to_dict()), "seq": 1, "op": "set"}
+    assert changes[1] == {"key": "k", "seq": 2, "op": "del"}
+
+    await blackboard.write("x", "v", "agent")
+    assert json.loads(blackboard.to_json())["x"] == (await blackboard.read("x")).to_dict()
+
+
+async def test_entries_are_not_validated_or_copied():
+    blackboard = Blackboard()
+    value = {"nested": object()}
+    await blackboard.write("k", value, "agent")
+    entry = await blackboard.read("k")
+    assert entry.value is value
+    assert not hasattr(entry, "__dict__")
+
+
+class PydanticEntry(BaseModel):
+    """此前每次写入都会创建的 Pydantic 条目，作为基准对照."""
+    key: str
+    value: Any
+    timestamp: datetime
+    agent_id: str
+    metadata: Dict = {}
+    version: int = 1
+
+
+def _bytes_per_entry(factory, n: int = 20_000) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entries = [factory(i) for i in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(entries) == n
+    return (after - before) / n
+
+
+@pytest.mark.benchmark
+async def test_benchmark_entry_memory_and_write_throughput():
+    now = datetime.now()
+    slotted = _bytes_per_entry(lambda i: BlackboardEntry("agent_status", i, now, "coordinator"))
+    model = _bytes_per_entry(lambda i: PydanticEntry(key="agent_status", value=i, timestamp=now,
+                                                     agent_id="coordinator"))
+
+    n = 100_000
+    start = time.perf_counter()
+    for i in range(n):
+        PydanticEntry(key="agent_status", value=i, timestamp=datetime.now(), agent_id="coordinator")
+    model_rate = n / (time.perf_counter() - start)
+
+    blackboard = Blackboard()
+    start = time.perf_counter()
+    for i in range(n):
+        await blackboard.write("agent_status", i, "coordinator")
+    write_rate = n / (time.perf_counter() - start)
+
+    print(f"\nper entry: slotted {slotted:.0f} B vs pydantic {model:.0f} B; "
+          f"blackboard.write {write_rate:,.0f}/s vs pydantic construction alone {model_rate:,.0f}/s")
+    assert slotted < model
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from core.blackboard import Blackboard
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """只替换 core.blackboard 看到的时钟，事件循环仍使用真实时间."""
+    now = SimpleNamespace(value=1000.0)
+    fake = SimpleNamespace(monotonic=lambda: now.value, time=time.time)
+    monkeypatch.setattr("core.blackboard.time", fake)
+
+    def advance(seconds: float) -> None:
+        now.value += seconds
+
+    return advance
+
+
+def board(**options) -> Blackboard:
+    # 清理间隔足够长，测试中只有显式调用 sweep_expired 时才会清理
+    options.setdefault("sweep_interval", 3600)
+    return Blackboard(**options)
+
+
+async def test_expired_entry_is_dropped_on_read(clock):
+    blackboard = board()
+    await blackboard.write("k", 1, "a", ttl=10)
+    clock(9)
+    assert (await blackboard.read("k")).value == 1
+    clock(2)
+    assert await blackboard.read("k") is None
+    stats = await blackboard.get_stats()
+    assert (stats["entries"], stats["expired"]) == (0, 1)
+
+
+async def test_rewrite_resets_the_deadline(clock):
+    blackboard = board()
+    await blackboard.write("k", 1, "a", ttl=10)
+    clock(8)
+    await blackboard.write("k", 2, "a", ttl=10)
+    clock(8)
+    assert (await blackboard.read("k")).value == 2
+    # 旧截止时间留在堆里，但不会删除新值
+    assert blackboard.sweep_expired() == 0
+
+
+async def test_longest_matching_prefix_wins(clock):
+    blackboard = board(default_ttl=100)
+    blackboard.set_ttl("task_", 10)
+    blackboard.set_ttl("task_result_", 1)
+    await blackboard.write("task_result_1", "r", "a")
+    await blackboard.write("task_state_1", "s", "a")
+    await blackboard.write("other", "o", "a")
+    await blackboard.write("task_result_2", "r", "a", ttl=50)
+
+    clock(2)
+    assert await blackboard.read("task_result_1") is None
+    assert await blackboard.read("task_state_1") is not None
+    clock(10)
+    assert await blackboard.read("task_state_1") is None
+    assert await blackboard.read("task_result_2") is not None
+    assert await blackboard.read("other") is not None
+
+    blackboard.set_ttl("task_result_", None)
+    await blackboard.write("task_result_3", "r", "a")
+    clock(11)
+    # 取消后回退到次长的前缀
+    assert await blackboard.read("task_result_3") is None
+
+
+async def test_lru_evicts_least_recently_read(clock):
+    blackboard = board(max_entries=3)
+    for key in "abc":
+        await blackboard.write(key, key, "w")
+    await blackboard.read("a")
+    await blackboard.write("d", "d", "w")
+    assert set((await blackboard.get_all_entries())) == {"a", "c", "d"}
+    await blackboard.read_many(["c"])
+    await blackboard.write("a", "a2", "w")
+    await blackboard.write("e", "e", "w")
+    assert set((await blackboard.get_all_entries())) == {"a", "c", "e"}
+    stats = await blackboard.get_stats()
+    assert (stats["entries"], stats["evicted"], stats["expired"]) == (3, 2, 0)
+
+
+async def test_sweep_respects_the_batch_limit(clock):
+    blackboard = board()
+    for i in range(5):
+        await blackboard.write(f"short{i}", i, "w", ttl=1)
+    await blackboard.write("long", 0, "w", ttl=100)
+    clock(2)
+    assert blackboard.sweep_expired(limit=2) == 2
+    assert (await blackboard.get_stats())["entries"] == 4
+    assert blackboard.sweep_expired(limit=2) == 2
+    assert blackboard.sweep_expired(limit=2) == 1
+    assert blackboard.sweep_expired(limit=2) == 0
+    stats = await blackboard.get_stats()
+    assert (stats["entries"], stats["expired"], stats["evicted"]) == (1, 5, 0)
+
+
+async def test_background_sweeper_drains_backlog_in_batches():
+    blackboard = Blackboard(sweep_interval=0.01, sweep_batch=2)
+    for i in range(7):
+        await blackboard.write(f"k{i}", i, "w", ttl=0.005)
+    await blackboard.write("kept", 0, "w")
+    for _ in range(100):
+        if (await blackboard.get_stats())["expired"] == 7:
+            break
+        await asyncio.sleep(0.01)
+    stats = await blackboard.get_stats()
+    assert (stats["entries"], stats["expired"]) == (1, 7)
+    # 没有待过期条目后清理任务自行退出
+    await asyncio.sleep(0.03)
+    assert blackboard._sweeper is None
+    await blackboard.close()
+
+
+async def test_to_json_skips_expired_entries(clock):
+    blackboard = board()
+    await blackboard.write("gone", 1, "a", ttl=1)
+    await blackboard.write("kept", 2, "a")
+    clock(2)
+    assert set(json.loads(blackboard.to_json())) == {"kept"}
+
+
+async def test_stale_version_fails_after_expiry_and_recreate(clock):
+    blackboard = board()
+    await blackboard.write("session", "old", "a", ttl=1)
+    stale = (await blackboard.read("session")).version
+    clock(2)
+    assert blackboard.sweep_expired() == 1
+    await blackboard.write("session", "new", "b")
+    assert not await blackboard.compare_and_set("session", "lost", "a", expected_version=stale)
+
+    # 过期但还没被清理的条目同样不能让旧版本号重新生效
+    await blackboard.write("lazy", "old", "a", ttl=1)
+    stale = (await blackboard.read("lazy")).version
+    clock(2)
+    assert await blackboard.compare_and_set("lazy", "new", "b", expected_version=0)
+    assert not await blackboard.compare_and_set("lazy", "lost", "a", expected_version=stale)
+    assert (await blackboard.read("lazy")).value == "new"
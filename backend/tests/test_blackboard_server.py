@@ -0,0 +1,278 @@
+import asyncio
+import logging
+import os
+import tempfile
+
+import pytest
+
+from core.agent import Agent
+from core.blackboard import Blackboard, BlackboardConflictError
+from core.blackboard_server import BlackboardServer, RemoteBlackboard
+
+
+@pytest.fixture
+def socket_path():
+    # Unix socket 路径长度有限，不用 pytest 的 tmp_path
+    directory = tempfile.mkdtemp(prefix="bb")
+    yield os.path.join(directory, "bb.sock")
+
+
+@pytest.fixture
+async def server(socket_path):
+    server = BlackboardServer(Blackboard(), socket_path)
+    await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture
+async def clients(server):
+    created = []
+
+    def make() -> RemoteBlackboard:
+        client = RemoteBlackboard(server.socket_path)
+        created.append(client)
+        return client
+
+    yield make
+    for client in created:
+        await client.close()
+
+
+class Waiter(Agent):
+    async def run(self) -> None:
+        pass
+
+    async def process_message(self, message):
+        return None
+
+
+async def test_remote_api_matches_local(clients):
+    a, b = clients(), clients()
+    seen = asyncio.Queue()
+
+    async def on_update(entry):
+        await seen.put(entry)
+
+    await b.subscribe("k", on_update)
+    await a.write("k", {"v": 1}, "a", metadata={"m": 1})
+    entry = await asyncio.wait_for(seen.get(), 1)
+    assert (entry.key, entry.value, entry.version) == ("k", {"v": 1}, 1)
+    assert (await b.read("k")).metadata == {"m": 1}
+    assert await a.compare_and_set("k", 2, "a", expected_version=1)
+    assert not await a.compare_and_set("k", 3, "a", expected_version=1)
+    stats = await a.get_stats()
+    assert stats["entries"] == 1
+    assert stats == await Blackboard().get_stats() | {"entries": 1}
+
+
+async def test_remote_updates_from_several_clients_are_not_lost(clients):
+    remotes = [clients() for _ in range(4)]
+
+    async def bump(remote):
+        for _ in range(10):
+            await remote.update("counter", lambda n: n + 1, "student", default=0)
+
+    await asyncio.gather(*(bump(remote) for remote in remotes))
+    assert (await remotes[0].read("counter")).value == 40
+
+    # 与本地黑板相同：重试次数用完后抛出冲突错误
+    async def always_stale(n):
+        await remotes[1].write("counter", n + 100, "other")
+        return n + 1
+
+    with pytest.raises(BlackboardConflictError):
+        await remotes[0].update("counter", always_stale, "student", max_retries=3)
+
+async def test_cancelled_wait_does_not_lose_the_next_task(server, clients):
+    a, b = clients(), clients()
+    waiter = asyncio.create_task(a.wait_for_task())
+    await asyncio.sleep(0.05)
+    waiter.cancel()
+    await asyncio.sleep(0.05)
+
+    await b.post_task({"id": 1})
+    await asyncio.sleep(0.05)
+    assert (await b.get_stats())["pending_tasks"] == 1
+    assert (await b.get_task())["id"] == 1
+
+
+async def test_agent_wait_timeout_does_not_lose_tasks(clients):
+    a, b = clients(), clients()
+    agent = Waiter("waiter", a)
+    for _ in range(3):
+        assert await agent.wait_for_task(timeout=0.01) is None
+    await b.post_task({"id": 2})
+    assert (await asyncio.wait_for(b.wait_for_task(), 1))["id"] == 2
+
+
+async def test_result_arriving_after_cancellation_is_requeued(clients):
+    a, b = clients(), clients()
+    for i in range(20):
+        waiter = asyncio.create_task(a.wait_for_task())
+        await asyncio.sleep(0.01)
+        await b.post_task({"id": i})
+        # 取消时任务可能还在服务端等待，也可能已经出队、回复正在路上
+        waiter.cancel()
+        received = None
+        try:
+            received = await waiter
+        except asyncio.CancelledError:
+            pass
+        if received is None:
+            received = await asyncio.wait_for(b.wait_for_task(), 1)
+        assert received["id"] == i
+
+
+async def test_subscriptions_and_ttls_survive_reconnect(server, clients, socket_path):
+    client = clients()
+    seen = asyncio.Queue()
+
+    async def on_update(entry):
+        await seen.put(entry.value)
+
+    await client.subscribe("k", on_update)
+    await client.subscribe_pattern("student_*", on_update)
+    client.set_ttl("tmp_", 60)
+    await client.read("k")
+
+    await server.stop()
+    restarted = BlackboardServer(Blackboard(), socket_path)
+    await restarted.start()
+    try:
+        # 读循环已经发现旧连接断开，下一次调用自动重连并重新登记订阅和 TTL
+        await asyncio.sleep(0.05)
+        await client.read("k")
+        writer = clients()
+        await writer.write("k", "after", "w")
+        await writer.write("student_1", "pattern", "w")
+        assert await asyncio.wait_for(seen.get(), 1) == "after"
+        assert await asyncio.wait_for(seen.get(), 1) == "pattern"
+        assert restarted.blackboard._ttl_for("tmp_x") == 60
+    finally:
+        await restarted.stop()
+
+
+async def test_events_right_after_subscribe_are_delivered(clients):
+    a, b = clients(), clients()
+    writes = asyncio.create_task(b.write("hot", 1, "b"))
+    seen = asyncio.Queue()
+
+    async def on_update(entry):
+        await seen.put(entry.value)
+
+    await a.subscribe("hot", on_update)
+    await writes
+    await b.write("hot", 2, "b")
+    values = [await asyncio.wait_for(seen.get(), 1)]
+    if values[0] != 2:
+        values.append(await asyncio.wait_for(seen.get(), 1))
+    assert values[-1] == 2
+
+
+async def test_stop_with_connected_clients_is_clean(socket_path, caplog):
+    server = BlackboardServer(Blackboard(), socket_path)
+    await server.start()
+    client = RemoteBlackboard(socket_path)
+    pending = asyncio.create_task(client.wait_for_task())
+    await client.write("k", 1, "c")
+    with caplog.at_level(logging.ERROR):
+        await server.stop()
+        with pytest.raises(ConnectionError):
+            await pending
+        await asyncio.sleep(0.01)
+    await client.close()
+    assert not [r for r in caplog.records if r.levelno >= logging.ERROR]
+
+
+async def test_values_round_trip_with_the_local_types(clients):
+    from datetime import datetime
+
+    a, b = clients(), clients()
+    when = datetime(2024, 5, 1, 12, 30)
+    await a.write("k", {"tags": {1, 2}, "at": when}, "a")
+    assert (await b.read("k")).value == {"tags": {1, 2}, "at": when}
+
+    with pytest.raises(TypeError):
+        await a.write("bad", object(), "a")
+    with pytest.raises(TypeError):
+        await a.post_task({"payload": object()})
+    # 编码失败的请求不会留下未完成的调用，连接仍然可用
+    assert await a.read("bad") is None
+    assert (await a.get_stats())["pending_tasks"] == 0
+
+
+async def test_unencodable_server_values_are_reported_as_type_errors(server, clients):
+    class Opaque:
+        pass
+
+    await server.blackboard.write("opaque", Opaque(), "server")
+    client = clients()
+    with pytest.raises(TypeError):
+        await client.read("opaque")
+    # 错误只影响这一个请求
+    await client.write("k", 1, "c")
+    assert (await client.read("k")).value == 1
+
+
+async def test_remote_change_feed_long_polls_and_reports_gaps(socket_path):
+    from core.blackboard import ChangeFeedGapError
+
+    server = BlackboardServer(Blackboard(change_log_size=2), socket_path)
+    await server.start()
+    client = RemoteBlackboard(socket_path)
+    try:
+        waiter = asyncio.create_task(client.wait_for_changes(0, timeout=5))
+        await asyncio.sleep(0.02)
+        await client.write("k", 1, "c")
+        changes, seq = await asyncio.wait_for(waiter, 1)
+        assert [c["key"] for c in changes] == ["k"] and seq == 1
+
+        for i in range(3):
+            await client.write(f"k{i}", i, "c")
+        with pytest.raises(ChangeFeedGapError):
+            await client.wait_for_changes(0, timeout=0)
+        entries, seq = await client.get_snapshot()
+        assert seq == 4 and len(entries) == 4
+    finally:
+        await client.close()
+        await server.stop()
+
+
+
+async def test_reconnecting_feed_client_resyncs_after_the_server_restarts(socket_path):
+    from core.change_feed import stream_changes
+
+    async def first_message(blackboard, since=None, epoch=None):
+        messages = asyncio.Queue()
+        feed = asyncio.create_task(stream_changes(blackboard, messages.put, since, epoch))
+        try:
+            return await asyncio.wait_for(messages.get(), 1)
+        finally:
+            feed.cancel()
+            await asyncio.gather(feed, return_exceptions=True)
+
+    server = BlackboardServer(Blackboard(), socket_path)
+    await server.start()
+    client = RemoteBlackboard(socket_path)
+    try:
+        for i in range(3):
+            await client.write(f"k{i}", i, "c")
+        before = await first_message(client)
+        assert before["epoch"] == server.blackboard.epoch and before["seq"] == 3
+
+        # 新的服务端从序号 0 开始编号：旧序号 3 比它超前，旧序号 1 虽在范围内但属于旧纪元
+        await server.stop()
+        server = BlackboardServer(Blackboard(), socket_path)
+        await server.start()
+        await client.write("fresh", 1, "c")
+        await client.write("fresh", 2, "c")
+        for since in (3, 1):
+            resync = await first_message(client, since, before["epoch"])
+            assert resync["type"] == "snapshot" and resync["epoch"] == server.blackboard.epoch
+            assert resync["seq"] == 2 and set(resync["entries"]) == {"fresh"}
+        resumed = await first_message(client, 1, server.blackboard.epoch)
+        assert resumed["type"] == "changes" and [c["seq"] for c in resumed["changes"]] == [2]
+    finally:
+        await client.close()
+        await server.stop()
@@ -0,0 +1,83 @@
+import pytest
+
+from core.blackboard import Blackboard, BlackboardConflictError
+from core.persistence import BlackboardLog
+
+
+async def test_stale_version_fails_after_delete_and_recreate():
+    blackboard = Blackboard()
+    await blackboard.write("k", "first", "a")
+    stale = (await blackboard.read("k")).version
+
+    await blackboard.delete("k")
+    await blackboard.write("k", "recreated", "b")
+    # 重建的键不会回到旧的版本号
+    assert (await blackboard.read("k")).version > stale
+    assert not await blackboard.compare_and_set("k", "lost update", "a", expected_version=stale)
+    assert not await blackboard.commit({"k": "lost update"}, "a", expected_versions={"k": stale})
+    assert (await blackboard.read("k")).value == "recreated"
+
+
+async def test_transaction_conflicts_when_a_read_key_is_deleted_and_recreated():
+    blackboard = Blackboard()
+    await blackboard.write("model", {"level": 1}, "student")
+    with pytest.raises(BlackboardConflictError):
+        async with blackboard.transaction("teacher") as txn:
+            model = await txn.read("model")
+            await blackboard.delete("model")
+            await blackboard.write("model", {"level": 1}, "student")
+            txn.write("model", {**model, "seen": True})
+    assert (await blackboard.read("model")).value == {"level": 1}
+
+
+async def test_update_retries_on_the_recreated_value():
+    blackboard = Blackboard()
+    await blackboard.write("counter", 10, "a")
+    recreated = False
+
+    async def bump(n):
+        nonlocal recreated
+        if not recreated:
+            recreated = True
+            await blackboard.delete("counter")
+            await blackboard.write("counter", 100, "b")
+        return n + 1
+
+    assert await blackboard.update("counter", bump, "a") == 101
+
+
+async def test_versions_stay_ahead_of_cleared_and_evicted_entries():
+    blackboard = Blackboard(max_entries=1)
+    await blackboard.write("a", 1, "w")
+    await blackboard.write("a", 2, "w")
+    await blackboard.write("b", 1, "w")  # 淘汰 a（版本 2）
+    assert await blackboard.read("a") is None
+    await blackboard.write("a", 3, "w")
+    assert (await blackboard.read("a")).version > 2
+
+    stale = (await blackboard.read("a")).version
+    await blackboard.clear()
+    await blackboard.write("a", 4, "w")
+    assert not await blackboard.compare_and_set("a", 5, "w", expected_version=stale)
+
+
+async def test_removed_versions_survive_restart(tmp_path):
+    log = BlackboardLog(str(tmp_path), flush_interval=0.001)
+    blackboard = Blackboard(persistence=log)
+    await blackboard.restore()
+    for i in range(3):
+        await blackboard.write("k", i, "w")
+    stale = (await blackboard.read("k")).version
+    await blackboard.delete("k")
+    await blackboard.write("other", 0, "w")
+    await log.compact()
+    await blackboard.close()
+
+    # 快照里已经没有 k 了，重建时仍然要跳过它用过的版本号
+    restored = Blackboard(persistence=BlackboardLog(str(tmp_path), flush_interval=0.001))
+    await restored.restore()
+    assert await restored.read("k") is None
+    await restored.write("k", "new", "w")
+    assert (await restored.read("k")).version > stale
+    assert not await restored.compare_and_set("k", "lost", "w", expected_version=stale)
+    await restored.close()
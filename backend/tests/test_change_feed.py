@@ -0,0 +1,189 @@
+import asyncio
+
+import pytest
+
+from core.blackboard import Blackboard, ChangeFeedGapError
+from core.change_feed import stream_changes
+
+
+async def test_changes_since_returns_ordered_deltas():
+    blackboard = Blackboard()
+    await blackboard.write("a", 1, "w")
+    seq = blackboard.current_seq
+    await blackboard.write("a", 2, "w")
+    await blackboard.delete("a")
+    await blackboard.clear()
+
+    changes, current = blackboard.changes_since(seq)
+    assert current == seq + 3
+    assert [(c["seq"], c["op"], c.get("key")) for c in changes] == [
+        (seq + 1, "set", "a"), (seq + 2, "del", "a"), (seq + 3, "clear", None)]
+    assert changes[0]["value"] == 2 and changes[0]["version"] == 2
+    assert blackboard.changes_since(current) == ([], current)
+
+
+async def test_cursor_behind_the_retained_log_raises_a_gap_error():
+    blackboard = Blackboard(change_log_size=3)
+    for i in range(5):
+        await blackboard.write(f"k{i}", i, "w")
+    # 只保留序号 3..5：从 2 之后继续仍然完整，从 1 之后继续就缺了 2
+    changes, seq = blackboard.changes_since(2)
+    assert [c["seq"] for c in changes] == [3, 4, 5] and seq == 5
+    with pytest.raises(ChangeFeedGapError):
+        blackboard.changes_since(1)
+    with pytest.raises(ChangeFeedGapError):
+        await blackboard.wait_for_changes(0, timeout=0)
+
+
+async def test_cursor_ahead_of_the_log_raises_a_gap_error_without_waiting():
+    blackboard = Blackboard()
+    await blackboard.write("k", 1, "w")
+    # 例如重启前拿到的序号：当前实例的日志里根本没有这些变更
+    with pytest.raises(ChangeFeedGapError):
+        blackboard.changes_since(500)
+    with pytest.raises(ChangeFeedGapError):
+        await asyncio.wait_for(blackboard.wait_for_changes(2, timeout=5), 0.5)
+    assert blackboard.changes_since(1) == ([], 1)
+
+
+async def test_each_blackboard_instance_has_its_own_epoch(tmp_path):
+    from core.persistence import BlackboardLog
+
+    blackboard = Blackboard(persistence=BlackboardLog(str(tmp_path), flush_interval=0.001))
+    await blackboard.restore()
+    await blackboard.write("k", 1, "w")
+    await blackboard.close()
+
+    restored = Blackboard(persistence=BlackboardLog(str(tmp_path), flush_interval=0.001))
+    await restored.restore()
+    assert await restored.get_epoch() == restored.epoch != blackboard.epoch
+    await restored.close()
+
+async def test_long_poll_wakes_every_waiter_on_the_next_write():
+    blackboard = Blackboard()
+    seq = blackboard.current_seq
+    waiters = [asyncio.create_task(blackboard.wait_for_changes(seq, timeout=5)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    assert not any(w.done() for w in waiters)
+
+    await blackboard.write("k", 1, "w")
+    results = await asyncio.wait_for(asyncio.gather(*waiters), 0.5)
+    assert all([c["key"] for c in changes] == ["k"] and new_seq == seq + 1 for changes, new_seq in results)
+
+
+async def test_long_poll_times_out_with_no_changes():
+    blackboard = Blackboard()
+    await blackboard.write("k", 1, "w")
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    assert await blackboard.wait_for_changes(blackboard.current_seq, timeout=0.05) == ([], 1)
+    assert loop.time() - started >= 0.04
+    # 已有变更时不等待
+    assert (await blackboard.wait_for_changes(0, timeout=5))[1] == 1
+
+
+class FeedClient:
+    """收集 stream_changes 推送的消息；gate 关闭时 send 阻塞，用来模拟处理慢的客户端."""
+
+    def __init__(self):
+        self.messages = asyncio.Queue()
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def send(self, message):
+        await self.gate.wait()
+        await self.messages.put(message)
+
+    async def next(self):
+        return await asyncio.wait_for(self.messages.get(), 1)
+
+
+@pytest.fixture
+async def feed():
+    tasks = []
+
+    def start(blackboard, since=None, epoch=None) -> FeedClient:
+        client = FeedClient()
+        tasks.append(asyncio.create_task(stream_changes(blackboard, client.send, since, epoch)))
+        return client
+
+    yield start
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def test_new_client_gets_a_snapshot_then_deltas(feed):
+    blackboard = Blackboard()
+    await blackboard.write("a", 1, "w")
+    client = feed(blackboard)
+    snapshot = await client.next()
+    assert snapshot["type"] == "snapshot" and snapshot["seq"] == 1
+    assert snapshot["epoch"] == blackboard.epoch
+    assert snapshot["entries"]["a"]["value"] == 1
+
+    await blackboard.write("b", 2, "w")
+    delta = await client.next()
+    assert delta["type"] == "changes" and delta["seq"] == 2 and delta["epoch"] == blackboard.epoch
+    assert [c["key"] for c in delta["changes"]] == ["b"]
+
+
+async def test_resuming_client_gets_only_missed_deltas(feed):
+    blackboard = Blackboard()
+    for i in range(3):
+        await blackboard.write(f"k{i}", i, "w")
+    client = feed(blackboard, since=1, epoch=blackboard.epoch)
+    missed = await client.next()
+    assert missed["type"] == "changes" and [c["seq"] for c in missed["changes"]] == [2, 3]
+
+    await blackboard.write("k3", 3, "w")
+    assert (await client.next())["changes"][0]["key"] == "k3"
+
+
+async def test_resume_from_a_trimmed_cursor_falls_back_to_a_snapshot(feed):
+    blackboard = Blackboard(change_log_size=2)
+    for i in range(5):
+        await blackboard.write(f"k{i}", i, "w")
+    client = feed(blackboard, since=1)
+    snapshot = await client.next()
+    assert snapshot["type"] == "snapshot" and snapshot["seq"] == 5
+    assert set(snapshot["entries"]) == {f"k{i}" for i in range(5)}
+
+
+async def test_resume_from_another_epoch_falls_back_to_a_snapshot(feed):
+    # 重启后的黑板：序号从头编号，旧序号既可能落在新日志范围内，也可能超前
+    restarted = Blackboard()
+    for i in range(5):
+        await restarted.write(f"k{i}", i, "w")
+    for since in (2, 50):
+        client = feed(restarted, since=since, epoch="epoch-before-restart")
+        snapshot = await client.next()
+        assert snapshot["type"] == "snapshot" and snapshot["epoch"] == restarted.epoch
+        assert snapshot["seq"] == 5 and len(snapshot["entries"]) == 5
+
+    # 不带纪元的旧客户端也不会因为超前的序号而漏掉变更
+    client = feed(restarted, since=50)
+    assert (await client.next())["type"] == "snapshot"
+
+async def test_client_that_falls_behind_while_streaming_is_resynced(feed):
+    blackboard = Blackboard(change_log_size=2)
+    client = feed(blackboard)
+    assert (await client.next())["type"] == "snapshot"
+
+    # 客户端卡在发送上时写入超过变更日志容量的变更
+    client.gate.clear()
+    await blackboard.write("first", 0, "w")
+    await asyncio.sleep(0.01)
+    for i in range(5):
+        await blackboard.write(f"k{i}", i, "w")
+    await blackboard.delete("first")
+    client.gate.set()
+
+    assert (await client.next())["changes"][0]["key"] == "first"
+    resync = await client.next()
+    assert resync["type"] == "snapshot" and resync["seq"] == blackboard.current_seq
+    assert set(resync["entries"]) == {f"k{i}" for i in range(5)}
+
+    await blackboard.write("after", 1, "w")
+    delta = await client.next()
+    assert delta["type"] == "changes" and delta["changes"][0]["key"] == "after"
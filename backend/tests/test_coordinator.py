@@ -0,0 +1,118 @@
+import asyncio
+import logging
+
+from agents.coordinator_agent import CoordinatorAgent
+from core.agent import Agent, AgentState, InboxAgent
+from core.blackboard import Blackboard
+
+
+class Specialist(InboxAgent):
+    """测试用的被路由 Agent：记录收到的任务并立即回复."""
+
+    def __init__(self, agent_id: str, blackboard: Blackboard, delay: float = 0.0):
+        super().__init__(agent_id, blackboard)
+        self.delay = delay
+        self.received = asyncio.Queue()
+
+    async def process_message(self, message):
+        await self.received.put(message)
+        await asyncio.sleep(self.delay)
+        return {"type": "response", "content": "ok", "agent_id": self.agent_id}
+
+
+async def started_coordinator(blackboard: Blackboard, *agents: Agent) -> CoordinatorAgent:
+    coordinator = CoordinatorAgent("coordinator", blackboard)
+    for agent in agents:
+        await coordinator.register_agent(agent, ["teacher_agent"])
+    await coordinator.start()
+    return coordinator
+
+
+async def test_posted_tasks_are_dispatched_without_polling():
+    blackboard = Blackboard()
+    teacher = Specialist("teacher", blackboard)
+    coordinator = await started_coordinator(blackboard, teacher)
+    loop = asyncio.get_running_loop()
+    for i in range(5):
+        posted = loop.time()
+        await blackboard.post_task({"question": f"q{i}", "student_id": "s1"})
+        message = await asyncio.wait_for(teacher.received.get(), 1)
+        assert message["question"] == f"q{i}"
+        # 以前的轮询循环每轮至少等待 0.1 秒
+        assert loop.time() - posted < 0.05
+    await asyncio.sleep(0.01)
+    results = [key for key in await blackboard.get_all_entries() if key.startswith("task_result_s1_")]
+    assert len(results) == 5
+    await coordinator.stop()
+
+
+async def test_slow_agent_does_not_block_later_tasks():
+    blackboard = Blackboard()
+    slow = Specialist("slow", blackboard, delay=0.5)
+    slow.max_concurrency = 4
+    coordinator = await started_coordinator(blackboard, slow)
+    await blackboard.post_task({"question": "first"})
+    await blackboard.post_task({"question": "second"})
+    for expected in ("first", "second"):
+        assert (await asyncio.wait_for(slow.received.get(), 0.2))["question"] == expected
+    await coordinator.stop()
+
+
+async def test_agent_status_is_published_only_when_it_changes():
+    blackboard = Blackboard()
+    teacher = Specialist("teacher", blackboard)
+    coordinator = CoordinatorAgent("coordinator", blackboard)
+    await coordinator.register_agent(teacher)
+
+    await coordinator.monitor_agents()
+    await coordinator.monitor_agents()
+    entry = await blackboard.read("agent_status")
+    assert entry.version == 1 and entry.value["teacher"]["state"] == AgentState.IDLE
+
+    # 只有 last_active 变化不算状态变化
+    teacher.last_action_time = teacher.last_action_time.replace(year=2000)
+    await coordinator.monitor_agents()
+    assert (await blackboard.read("agent_status")).version == 1
+
+    teacher.last_error = "boom"
+    await coordinator.monitor_agents()
+    assert (await blackboard.read("agent_status")).value["teacher"]["error"] == "boom"
+    assert (await blackboard.read("agent_status")).version == 2
+
+    assert await coordinator.process_message({"type": "status"}) == {"type": "status", "content": "Status updated"}
+    assert (await blackboard.read("agent_status")).version == 3
+    await coordinator.task_tracker.close()
+
+
+async def test_health_loop_restarts_errored_agents():
+    blackboard = Blackboard()
+    teacher = Specialist("teacher", blackboard)
+    coordinator = CoordinatorAgent("coordinator", blackboard)
+    coordinator.monitor_interval = 0.01
+    await coordinator.register_agent(teacher)
+    await teacher.start()
+    await coordinator.start()
+    teacher.state = AgentState.ERROR
+    for _ in range(50):
+        if teacher.state == AgentState.RUNNING:
+            break
+        await asyncio.sleep(0.01)
+    assert teacher.state == AgentState.RUNNING
+    await coordinator.stop()
+
+
+async def test_stop_shuts_everything_down_cleanly(caplog):
+    blackboard = Blackboard()
+    slow = Specialist("slow", blackboard, delay=10)
+    coordinator = await started_coordinator(blackboard, slow)
+    await slow.start()
+    await blackboard.post_task({"question": "never answered"})
+    await asyncio.wait_for(slow.received.get(), 1)
+
+    with caplog.at_level(logging.ERROR):
+        await asyncio.wait_for(coordinator.stop(), 1)
+        await asyncio.sleep(0)
+    assert coordinator._task.done() and coordinator._monitor_task.done()
+    assert not coordinator._routing
+    assert slow.state == AgentState.IDLE and coordinator.state == AgentState.IDLE
+    assert not [r for r in caplog.records if r.levelno >= logging.ERROR]
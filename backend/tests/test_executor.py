@@ -0,0 +1,94 @@
+import asyncio
+import base64
+import pickle
+import time
+from io import BytesIO
+
+import pytest
+
+from core.executor import CPUExecutor, CPUJob
+from tools.web_scraper import extract_text
+
+
+@pytest.fixture(params=[0, 2], ids=["inline", "pool"])
+def executor(request):
+    executor = CPUExecutor(request.param)
+    yield executor
+    executor.shutdown()
+
+
+def test_job_descriptor_names_a_module_function():
+    job = CPUJob.of(extract_text, b"<p>x</p>", encoding="utf-8")
+    assert job.func == "tools.web_scraper:extract_text"
+    assert job.args == (b"<p>x</p>",) and job.kwargs == {"encoding": "utf-8"}
+
+
+async def test_run(executor):
+    html = "<html><body><p>你好</p><script>x()</script></body></html>".encode("gbk")
+    assert (await executor.run(extract_text, html, "gbk")).strip() == "你好"
+    assert await executor.run(CPUJob("math:factorial", (10,))) == 3628800
+
+
+async def test_run_many_streams_results_and_errors(executor):
+    jobs = [CPUJob("operator:truediv", (1, d)) for d in (1, 0, 4)]
+    results = dict([item async for item in executor.run_many(jobs)])
+    assert results[0] == 1.0 and results[2] == 0.25
+    assert isinstance(results[1], ZeroDivisionError)
+
+
+async def test_decode_image_in_pool():
+    Image = pytest.importorskip("PIL.Image")
+    from tools.image_decoder import decode_image
+
+    buffer = BytesIO()
+    Image.new("RGB", (1024, 512), "red").save(buffer, format="PNG")
+    executor = CPUExecutor(1)
+    try:
+        summary = await executor.run(decode_image, base64.b64encode(buffer.getvalue()).decode())
+    finally:
+        executor.shutdown()
+    assert (summary["width"], summary["height"], summary["mode"], summary["format"]) == (1024, 512, "RGB", "PNG")
+    # 跨进程返回的是编码后的小缩略图，而不是 1024x512 的像素缓冲区
+    thumbnail = Image.open(BytesIO(summary["thumbnail"]))
+    assert thumbnail.size == (256, 128)
+    assert len(pickle.dumps(summary)) < 4096
+
+
+async def _loop_lag_while(work) -> float:
+    """在 work 执行期间每 5ms 发一次“无关请求”，返回最大调度延迟（秒）."""
+    lags = []
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - start - 0.005)
+
+    prober = asyncio.create_task(probe())
+    await asyncio.sleep(0.02)
+    await work
+    done.set()
+    await prober
+    return max(lags)
+
+
+@pytest.mark.benchmark
+async def test_benchmark_loop_latency_while_scraping():
+    page = ("<html><body>" + "<div><p>段落 paragraph text</p><a href='/x'>link</a></div>" * 5000
+            + "</body></html>").encode("utf-8")
+
+    inline = CPUExecutor(0)
+    pool = CPUExecutor(2)
+    await pool.run(extract_text, b"<p>warm up</p>")
+    try:
+        async def scrape_all(executor):
+            return await asyncio.gather(*(executor.run(extract_text, page) for _ in range(4)))
+
+        inline_lag = await _loop_lag_while(scrape_all(inline))
+        pool_lag = await _loop_lag_while(scrape_all(pool))
+    finally:
+        pool.shutdown()
+    print(f"\nmax event-loop lag while parsing 4 x {len(page) // 1024} KiB pages: "
+          f"on the loop {inline_lag * 1000:.0f}ms, in the process pool {pool_lag * 1000:.1f}ms")
+    assert pool_lag < inline_lag / 4
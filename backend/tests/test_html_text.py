@@ -0,0 +1,54 @@
+import pytest
+
+from tools.html_text import HTMLTextExtractor, detect_encoding, iter_text
+
+
+def extract(data, encoding=None, chunk=None) -> str:
+    extractor = HTMLTextExtractor(encoding)
+    if chunk:
+        for i in range(0, len(data), chunk):
+            extractor.feed(data[i:i + chunk])
+    else:
+        extractor.feed(data)
+    extractor.close()
+    return extractor.pop_text().strip()
+
+
+def test_head_is_skipped():
+    html = b"<html><head><title>t</title><style>p{}</style></head><body><p>Hello</p></body></html>"
+    assert extract(html) == "Hello"
+
+
+@pytest.mark.parametrize("html", [
+    b"<html><head><title>t</title><meta charset=utf-8><body><p>Hello world</p>",
+    b"<html><head><title>t</title><meta charset=utf-8><p>Hello world</p>",
+    b"<head><title>t</title><link rel=x><div>Hello world</div>",
+])
+def test_omitted_head_end_tag(html):
+    assert extract(html) == "Hello world"
+
+
+@pytest.mark.parametrize("head,declared,expected", [
+    (b'<meta charset="gbk">', None, "gbk"),
+    (b'<meta charset=gb2312>', None, "gbk"),
+    (b'<meta http-equiv="Content-Type" content="text/html; charset=GB2312">', None, "gbk"),
+    (b'<meta charset="gbk">', "utf-8", "utf-8"),
+    (b'<meta charset="no-such-codec">', None, "utf-8"),
+    (b"\xef\xbb\xbf<p>", "gbk", "utf-8-sig"),
+    (b"<p>plain</p>", None, "utf-8"),
+])
+def test_detect_encoding(head, declared, expected):
+    assert detect_encoding(head, declared) == expected
+
+
+@pytest.mark.parametrize("chunk", [None, 7, 4096])
+def test_meta_charset_is_used_when_undeclared(chunk):
+    html = ('<html><head><meta charset="gbk"><title>t</title></head>'
+            "<body><p>第二次世界大战</p></body></html>").encode("gbk")
+    assert extract(html, chunk=chunk) == "第二次世界大战"
+
+
+def test_sniffing_does_not_hold_back_long_pages():
+    html = ("<p>" + "正文" * 2000 + "</p>").encode("utf-8")
+    chunks = [html[i:i + 100] for i in range(0, len(html), 100)]
+    assert "".join(iter_text(chunks)).strip() == "正文" * 2000
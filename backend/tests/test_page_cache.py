@@ -0,0 +1,85 @@
+import asyncio
+import os
+
+import pytest
+
+from tools.page_cache import PageCache
+from tools.web_scraper import WebScraperTool
+
+pytestmark = pytest.mark.usefixtures("http_session", "inline_cpu")
+
+
+def page(text: str) -> str:
+    return f"<html><body><p>{text}</p></body></html>"
+
+
+async def test_concurrent_puts_for_the_same_url(tmp_path):
+    cache = PageCache(str(tmp_path))
+    await asyncio.gather(*(cache.put("http://x/a", f"v{i}" * 1000) for i in range(20)))
+    assert not [n for n in os.listdir(tmp_path) if n.endswith(".tmp")]
+    reloaded = PageCache(str(tmp_path))
+    page_ = await reloaded.get("http://x/a")
+    assert page_ is not None and page_.text.startswith("v")
+
+
+@pytest.mark.parametrize("max_age", [0, 3600])
+async def test_scrape_many_with_duplicate_urls_on_cold_cache(stub_site, tmp_path, max_age):
+    url = stub_site.add("/dup", page("same"), etag='"v1"')
+    scraper = WebScraperTool(cache=PageCache(str(tmp_path), max_age=max_age))
+    results = await scraper.scrape_many([url] * 10, max_concurrency=10)
+    assert [r.strip() for r in results] == ["same"] * 10
+
+
+async def test_fresh_page_is_served_from_disk_without_network(stub_site, tmp_path):
+    url = stub_site.add("/fresh", page("cached"))
+    await WebScraperTool(cache=PageCache(str(tmp_path), max_age=3600)).ascrape(url)
+    # 新实例只有磁盘索引，get 在线程中读取文件
+    scraper = WebScraperTool(cache=PageCache(str(tmp_path), max_age=3600))
+    assert (await scraper.ascrape(url)).strip() == "cached"
+    assert stub_site.hits["/fresh"] == 1
+
+
+async def test_stale_page_is_revalidated_with_etag(stub_site, tmp_path):
+    url = stub_site.add("/etag", page("body"), etag='"v1"')
+    scraper = WebScraperTool(cache=PageCache(str(tmp_path), max_age=0))
+    await scraper.ascrape(url)
+    assert (await scraper.ascrape(url)).strip() == "body"
+    assert stub_site.conditional_hits == 1
+
+
+async def test_stale_page_is_returned_when_the_network_fails(stub_site, tmp_path):
+    cache = PageCache(str(tmp_path), max_age=0)
+    url = stub_site.url + "/gone"
+    await cache.put(url, "old text")
+    assert await WebScraperTool(cache=cache).ascrape(url) == "old text"
+
+
+async def test_least_recently_used_pages_are_evicted(tmp_path):
+    cache = PageCache(str(tmp_path), max_bytes=3500)
+    for name in ("a", "b", "c"):
+        await cache.put(f"http://x/{name}", name * 1000)
+    await cache.get("http://x/a")
+    await cache.put("http://x/d", "d" * 1000)
+    assert await cache.get("http://x/b") is None
+    assert await cache.get("http://x/a") is not None
+
+
+async def test_files_on_disk_match_the_index_under_concurrent_eviction(tmp_path):
+    cache = PageCache(str(tmp_path), max_bytes=5000, memory_entries=0)
+    # 每个条目约 1KB，并发写入时旧条目不断被淘汰；淘汰的文件删除不能跑到它的写入前面
+    await asyncio.gather(*(cache.put(f"http://x/{i % 40}", str(i) * 500) for i in range(400)))
+    on_disk = {name: os.path.getsize(tmp_path / name) for name in os.listdir(tmp_path)}
+    assert on_disk == dict(cache._index)
+    assert sum(on_disk.values()) == cache.get_stats()["bytes"] <= 5000
+
+    writes = [asyncio.create_task(cache.put(f"http://y/{i}", "y" * 1000)) for i in range(10)]
+    await asyncio.sleep(0)
+    cache.clear()
+    await asyncio.gather(*writes)
+    await cache.put("http://z/after", "z")
+    assert os.listdir(tmp_path) == [PageCache._name("http://z/after")]
+
+async def test_stale_tmp_files_are_removed_on_load(tmp_path):
+    (tmp_path / "crash.tmp").write_bytes(b"partial")
+    PageCache(str(tmp_path))
+    assert not (tmp_path / "crash.tmp").exists()
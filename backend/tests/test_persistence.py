@@ -0,0 +1,120 @@
+from datetime import date, datetime
+
+import pytest
+
+from core.blackboard import Blackboard
+from core.persistence import BlackboardLog
+
+
+async def reopen(directory) -> Blackboard:
+    blackboard = Blackboard(persistence=BlackboardLog(str(directory), flush_interval=0.001))
+    await blackboard.restore()
+    return blackboard
+
+
+async def test_values_keep_their_types_across_restart(tmp_path):
+    blackboard = await reopen(tmp_path)
+    value = {
+        "created_at": datetime(2024, 5, 1, 12, 30),
+        "due": date(2024, 6, 1),
+        "topics": {"math", "physics"},
+        "tags": frozenset({"a"}),
+        "nested": [{"when": datetime(2024, 1, 1)}],
+    }
+    await blackboard.write("student_model_1", value, "student_1", ttl=60)
+    await blackboard.write("student_model_1", {**value, "level": 2}, "student_1")
+    await blackboard.post_task({"type": "question", "asked_at": datetime(2024, 5, 2)})
+    await blackboard.close()
+
+    restored = await reopen(tmp_path)
+    entry = await restored.read("student_model_1")
+    assert entry.value == {**value, "level": 2}
+    assert isinstance(entry.value["topics"], set)
+    assert entry.version == 2
+    task = await restored.get_task()
+    assert task["asked_at"] == datetime(2024, 5, 2)
+    await restored.close()
+
+
+async def test_snapshot_keeps_types(tmp_path):
+    blackboard = Blackboard(persistence=BlackboardLog(str(tmp_path), flush_interval=0.001, compact_every=2))
+    await blackboard.restore()
+    for i in range(5):
+        await blackboard.write(f"k{i}", {i, i + 1}, "agent")
+    await blackboard._log.compact()
+    await blackboard.close()
+
+    restored = await reopen(tmp_path)
+    assert (await restored.read("k4")).value == {4, 5}
+    await restored.close()
+
+
+async def test_unserializable_values_fail_loudly(tmp_path):
+    blackboard = await reopen(tmp_path)
+    with pytest.raises(TypeError):
+        await blackboard.write("bad", object(), "agent")
+    assert await blackboard.read("bad") is None
+
+    with pytest.raises(TypeError):
+        await blackboard.write_many({"ok": 1, "bad": object()}, "agent")
+    assert await blackboard.read("ok") is None
+
+    with pytest.raises(TypeError):
+        await blackboard.post_task({"payload": object()})
+    assert blackboard.pending_tasks() == 0
+    await blackboard.close()
+
+
+async def test_without_persistence_any_value_is_accepted():
+    blackboard = Blackboard()
+    marker = object()
+    await blackboard.write("k", marker, "agent")
+    assert (await blackboard.read("k")).value is marker
+
+
+async def test_reposted_task_object_is_tracked_per_enqueue(tmp_path):
+    blackboard = await reopen(tmp_path)
+    task = {"type": "question"}
+    await blackboard.post_task(task)
+    await blackboard.post_task(task)
+    await blackboard.post_task({"type": "quiz"})
+    assert await blackboard.get_task() is task
+    assert await blackboard.wait_for_task(timeout=1) is task
+    await blackboard.close()
+
+    restored = await reopen(tmp_path)
+    assert restored.pending_tasks() == 1
+    assert (await restored.get_task())["type"] == "quiz"
+    await restored.close()
+
+
+async def test_snapshot_task_ids_match_later_gets(tmp_path):
+    blackboard = Blackboard(persistence=BlackboardLog(str(tmp_path), flush_interval=0.001))
+    await blackboard.restore()
+    task = {"type": "question"}
+    await blackboard.post_task(task)
+    await blackboard.post_task(task)
+    await blackboard._log.compact()
+    await blackboard.get_task()
+    blackboard.requeue_task(await blackboard.get_task())
+    await blackboard.close()
+
+    restored = await reopen(tmp_path)
+    assert restored.pending_tasks() == 1
+    await restored.close()
+
+
+async def test_compaction_before_the_first_flush_keeps_old_records_out_of_the_new_wal(tmp_path):
+    log = BlackboardLog(str(tmp_path), flush_interval=60)
+    blackboard = Blackboard(persistence=log)
+    await blackboard.restore()
+    await blackboard.write("k", 1, "agent")
+    await blackboard.delete("k")
+    await log.compact()
+    await blackboard.write("after", 2, "agent")
+    await blackboard.close()
+
+    # 快照之前的记录随旧 WAL 一起删除，重启时只重放快照之后的写入
+    snapshot, records = BlackboardLog(str(tmp_path)).load()
+    assert [record["key"] for record in snapshot["entries"]] == []
+    assert [record["key"] for record in records] == ["after"]
@@ -0,0 +1,146 @@
+import asyncio
+import time
+
+import pytest
+
+from agents.coordinator_agent import CoordinatorAgent
+from core.agent import InboxAgent
+from core.blackboard import Blackboard
+from core.registry import CapabilityRegistry, DispatchStrategy
+
+
+class Replica(InboxAgent):
+    """测试用副本：load() 可以直接设定；process_message 等待 delay 秒后返回自己的 id."""
+
+    def __init__(self, agent_id: str, blackboard: Blackboard = None, delay: float = 0.0,
+                 load: int = 0):
+        super().__init__(agent_id, blackboard or Blackboard())
+        self.delay = delay
+        self.fixed_load = load
+
+    async def process_message(self, message):
+        await asyncio.sleep(self.delay)
+        return {"type": "response", "content": message.get("question"), "agent_id": self.agent_id}
+
+    def load(self) -> int:
+        return self.fixed_load + super().load()
+
+
+def test_least_outstanding_picks_the_idlest_and_rotates_ties():
+    registry = CapabilityRegistry()
+    a, b, c = Replica("a", load=2), Replica("b", load=1), Replica("c", load=1)
+    for agent in (a, b, c):
+        registry.register(agent, ["teach"])
+    picks = [registry.pick("teach").agent_id for _ in range(4)]
+    assert set(picks) == {"b", "c"}
+    assert [r.agent_id for r in registry.candidates("teach")][-1] == "a"
+    # 每个 Agent 也可以按自己的 id 直接寻址
+    assert registry.pick("a") is a
+    assert registry.pick("missing") is None and registry.candidates("missing") == []
+
+
+def test_power_of_two_prefers_the_less_loaded_of_its_sample():
+    registry = CapabilityRegistry(DispatchStrategy.POWER_OF_TWO)
+    busy, idle = Replica("busy", load=5), Replica("idle", load=0)
+    registry.register(busy, ["teach"])
+    registry.register(idle, ["teach"])
+    assert {registry.pick("teach").agent_id for _ in range(20)} == {"idle"}
+
+    registry.register(Replica("idle2", load=0), ["teach"])
+    picks = [registry.pick("teach").agent_id for _ in range(200)]
+    # 最忙的副本只有在两个样本都是它时才会被选中，而样本不重复
+    assert "busy" not in picks
+
+
+def test_unregister_and_reregister_update_every_pool():
+    registry = CapabilityRegistry()
+    a, b = Replica("a"), Replica("b")
+    registry.register(a, ["teach", "evaluate"])
+    registry.register(b, ["teach"])
+    registry.unregister("a")
+    assert registry.replicas("teach") == [b]
+    assert registry.replicas("evaluate") == [] and registry.replicas("a") == []
+    assert registry.capabilities_of("a") == []
+    registry.register(b, ["plan"])
+    assert registry.replicas("teach") == [] and registry.replicas("plan") == [b]
+    assert registry.get_stats() == {"b": {"b": 0}, "plan": {"b": 0}}
+
+
+async def test_coordinator_falls_back_to_another_replica_when_one_is_full():
+    blackboard = Blackboard()
+    coordinator = CoordinatorAgent("coordinator", blackboard)
+    full, spare = Replica("full", blackboard, delay=0.05), Replica("spare", blackboard)
+    full.max_inbox = 1
+    for agent in (full, spare):
+        await coordinator.register_agent(agent, ["teacher_agent"])
+    # full 正在处理一个请求并且收件箱已满，但负载看起来更低
+    spare.fixed_load = 10
+    busy = [asyncio.create_task(full.submit({"question": f"q{i}"})) for i in range(2)]
+    await asyncio.sleep(0)
+
+    response = await coordinator.route_task({"question": "什么是导数？"})
+    assert response["agent_id"] == "spare"
+    await asyncio.gather(*busy)
+
+    # 所有副本都满时把过载作为错误报告出来
+    spare.delay, spare.max_inbox = 0.05, 1
+    busy = [asyncio.create_task(agent.submit({"question": "q"})) for agent in (full, spare) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert (await coordinator.route_task({"question": "q"}))["type"] == "error"
+    await asyncio.gather(*busy)
+    await coordinator.task_tracker.close()
+
+
+async def test_id_only_registration_is_rejected_and_unregister_stops_dispatch():
+    blackboard = Blackboard()
+    coordinator = CoordinatorAgent("coordinator", blackboard)
+    reply = await coordinator.process_message({"type": "register_agent", "agent_id": "ghost",
+                                               "capabilities": ["teacher_agent"]})
+    assert reply["type"] == "error"
+    assert coordinator.registry.replicas("teacher_agent") == []
+
+    teacher = Replica("teacher", blackboard)
+    reply = await coordinator.process_message({"type": "register_agent", "agent": teacher,
+                                               "capabilities": ["teacher_agent"]})
+    assert reply == {"type": "agent_registered", "agent_id": "teacher"}
+    assert (await coordinator.route_task({"question": "q"}))["agent_id"] == "teacher"
+
+    await coordinator.unregister_agent("teacher")
+    assert (await coordinator.route_task({"question": "q"}))["type"] == "error"
+    await coordinator.task_tracker.close()
+
+
+async def _dispatch_throughput(replica_delays, strategy, requests: int, clients: int = 16) -> float:
+    """clients 个并发调用方各自串行发送请求，返回整体吞吐量（请求/秒）."""
+    blackboard = Blackboard()
+    coordinator = CoordinatorAgent("coordinator", blackboard)
+    coordinator.registry = CapabilityRegistry(strategy)
+    for i, delay in enumerate(replica_delays):
+        await coordinator.register_agent(Replica(f"teacher_{i}", blackboard, delay=delay), ["teacher_agent"])
+
+    async def client(n: int) -> None:
+        for i in range(n):
+            assert (await coordinator.route_task({"question": f"q{i}"}))["type"] == "response"
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(requests // clients) for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    await coordinator.task_tracker.close()
+    return requests / elapsed
+
+
+@pytest.mark.benchmark
+async def test_benchmark_dispatch_scales_with_replicas():
+    # 每个副本一次只处理一个请求（max_concurrency = 1），服务时间 5ms
+    rates = {n: await _dispatch_throughput([0.005] * n, DispatchStrategy.LEAST_OUTSTANDING, 192)
+             for n in (1, 2, 4, 8)}
+    print("\ndispatch: " + ", ".join(f"{n} replicas {rate:,.0f} req/s" for n, rate in rates.items()))
+    assert rates[4] > 2.5 * rates[1]
+    assert rates[8] > 1.5 * rates[4]
+
+    # 一个慢副本（10 倍服务时间）：按实时负载分派时请求会绕开它排起的队
+    mixed = [0.05] + [0.005] * 3
+    for strategy in DispatchStrategy:
+        rate = await _dispatch_throughput(mixed, strategy, 192)
+        print(f"dispatch with one slow replica, {strategy.value}: {rate:,.0f} req/s")
+        assert rate > 1.5 * rates[1]
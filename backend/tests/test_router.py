@@ -0,0 +1,83 @@
+import random
+import time
+
+import pytest
+
+from core.router import DEFAULT_ROUTING, AhoCorasick, KeywordRouter, RoutingRule
+
+
+def brute_force(patterns, text):
+    return sorted(i for i, p in enumerate(patterns) for start in range(len(text))
+                  if text.startswith(p, start))
+
+
+@pytest.mark.parametrize("patterns,text", [
+    (["he", "she", "his", "hers"], "ushers and his sheep"),
+    (["a", "aa", "aaa"], "aaaa"),
+    (["测试", "考试", "试"], "这次考试和测试"),
+    (["abcd", "bc", "c"], "abcabcd"),
+])
+def test_matches_agree_with_brute_force(patterns, text):
+    automaton = AhoCorasick(patterns)
+    assert sorted(automaton.iter_matches(text)) == brute_force(patterns, text)
+    assert automaton.matches(text) == set(brute_force(patterns, text))
+
+
+def test_random_patterns_agree_with_brute_force():
+    rng = random.Random(7)
+    for _ in range(50):
+        patterns = list({"".join(rng.choice("abc") for _ in range(rng.randint(1, 4)))
+                         for _ in range(rng.randint(1, 10))})
+        text = "".join(rng.choice("abcd") for _ in range(40))
+        assert sorted(AhoCorasick(patterns).iter_matches(text)) == brute_force(patterns, text)
+
+
+def test_transitions_stay_sparse_with_many_rules():
+    rng = random.Random(1)
+    alphabet = "abcdefghijklmnopqrstuvwxyz的是了在问题测试考试"
+    patterns = ["".join(rng.choice(alphabet) for _ in range(rng.randint(3, 10))) for _ in range(2000)]
+    automaton = AhoCorasick(patterns)
+    edges = sum(len(t) for t in automaton._goto)
+    # 只保存 trie 的边：每个状态（根除外）恰好有一条入边
+    assert edges == len(automaton._goto) - 1
+
+
+def router() -> KeywordRouter:
+    return KeywordRouter.from_config({"routing": DEFAULT_ROUTING})
+
+
+@pytest.mark.parametrize("question,topic,agent", [
+    ("请给我出一套测试题", "", "quiz_generator"),
+    ("FAQ please", "", "faq_generator"),
+    ("帮我搜索一下二战", "", "knowledge_crawler"),
+    ("What is photosynthesis?", "", "teacher_agent"),
+    ("anything", "quiz", "quiz_generator"),
+])
+def test_default_routes(question, topic, agent):
+    assert router().route(question, topic) == agent
+
+
+def test_weights_and_ties():
+    rules = [RoutingRule("a", ("x",)), RoutingRule("b", ("y", "z")), RoutingRule("c", ("w",), 3.0)]
+    r = KeywordRouter(rules)
+    assert r.route("x y") == "a"
+    assert r.route("x y z") == "b"
+    assert r.route("x y z w") == "c"
+    assert r.scores("y y") == {"b": 1.0}
+
+
+@pytest.mark.benchmark
+def test_benchmark_routing_throughput():
+    rng = random.Random(3)
+    rules = [RoutingRule(f"agent_{i % 20}", tuple(f"kw{i}_{j}" for j in range(3))) for i in range(2000)]
+    rules += [RoutingRule(r["agent"], tuple(r["keywords"])) for r in DEFAULT_ROUTING["rules"]]
+    r = KeywordRouter(rules)
+    words = ["what", "is", "the", "capital", "of", "france", "请", "出", "一套", "测试", "题", "kw17_2"]
+    questions = [" ".join(rng.choice(words) for _ in range(10)) for _ in range(1000)]
+    count = 100_000
+    started = time.perf_counter()
+    for i in range(count):
+        r.route(questions[i % len(questions)])
+    rate = count / (time.perf_counter() - started)
+    print(f"\nrouting: {rate:,.0f} questions/s with {len(rules)} rules")
+    assert rate > 100_000
@@ -0,0 +1,63 @@
+import asyncio
+
+from tools.duckduckgo_search import AsyncSearchTool
+
+
+class SlowBackend:
+    def __init__(self, delay: float = 0.05, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def search(self, query, max_results):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("backend down")
+        return [{"body": f"{query} {i}"} for i in range(max_results)]
+
+
+async def test_concurrent_queries_are_coalesced_and_cached():
+    backend = SlowBackend()
+    tool = AsyncSearchTool(backend.search)
+    results = await asyncio.gather(*(tool.search_results("World  War II", 2) for _ in range(10)))
+    assert all(r == results[0] for r in results)
+    assert await tool.search_results("world war ii", 2) == results[0]
+    assert backend.calls == 1
+    assert tool.get_stats()["coalesced"] == 9
+
+
+async def test_cancelling_the_leader_does_not_cancel_followers():
+    backend = SlowBackend()
+    tool = AsyncSearchTool(backend.search)
+    leader = asyncio.create_task(tool.search_results("q", 1))
+    await asyncio.sleep(0)
+    followers = [asyncio.create_task(tool.search_results("q", 1)) for _ in range(3)]
+    await asyncio.sleep(0)
+    leader.cancel()
+    results = await asyncio.gather(*followers)
+    assert results == [[{"body": "q 0"}]] * 3
+    assert leader.cancelled()
+    assert backend.calls == 1
+
+
+async def test_result_is_cached_even_if_every_caller_is_cancelled():
+    backend = SlowBackend()
+    tool = AsyncSearchTool(backend.search)
+    caller = asyncio.create_task(tool.search_results("q", 1))
+    await asyncio.sleep(0)
+    caller.cancel()
+    await asyncio.sleep(0.1)
+    assert await tool.search_results("q", 1) == [{"body": "q 0"}]
+    assert backend.calls == 1
+
+
+async def test_failures_reach_every_caller_and_are_not_cached():
+    backend = SlowBackend(fail=True)
+    tool = AsyncSearchTool(backend.search)
+    results = await asyncio.gather(*(tool.search_results("q", 1) for _ in range(3)),
+                                   return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert (await tool.search("q", 1)).startswith("An error occurred")
+    assert backend.calls == 2
+    assert tool.get_stats()["inflight"] == 0
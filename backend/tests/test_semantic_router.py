@@ -0,0 +1,97 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from core.router import KeywordRouter
+from core.semantic_router import SemanticRouter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 离线评估集：改写后的问题及其应当到达的 Agent，调整示例问题、阈值和 margin 时以它为准
+EVAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "routing_eval.json")
+
+
+def load_config():
+    with open(os.path.join(ROOT, "config.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def enabled_config():
+    config = load_config()
+    config["routing"]["semantic"]["enabled"] = True
+    return config
+
+
+def route(keywords: KeywordRouter, semantic: SemanticRouter, question: str) -> str:
+    """与 CoordinatorAgent.analyze_task 相同：关键词优先，其次语义，最后默认 Agent."""
+    agent = keywords.match(question)
+    if agent is None:
+        agent, _ = semantic.classify_many([question])[0]
+    return agent or keywords.default_agent
+
+
+def test_semantic_routing_ships_disabled():
+    assert SemanticRouter.from_config(load_config()) is None
+
+
+def test_eval_set():
+    config = enabled_config()
+    keywords = KeywordRouter.from_config(config)
+    semantic = SemanticRouter.from_config(config)
+    with open(EVAL_PATH, "r", encoding="utf-8") as f:
+        cases = json.load(f)
+    misses = [(c["question"], c["agent"], route(keywords, semantic, c["question"])) for c in cases]
+    misses = [m for m in misses if m[1] != m[2]]
+    # 把应由 teacher_agent 回答的问题送到别处代价最高，一个都不允许
+    assert [m for m in misses if m[1] == "teacher_agent"] == []
+    assert len(misses) <= len(cases) // 10, misses
+
+
+@pytest.mark.parametrize("question", [
+    "Tell me about World War II",
+    "What caused the French Revolution?",
+    "How do I solve quadratic equations?",
+    "I do not understand fractions",
+    "hello",
+])
+def test_known_misroutes_stay_with_the_teacher(question):
+    config = enabled_config()
+    assert route(KeywordRouter.from_config(config), SemanticRouter.from_config(config), question) == "teacher_agent"
+
+
+def test_margin_is_relative_to_the_default_agent():
+    exemplars = {"quiz_generator": ["give me practice questions"],
+                 "teacher_agent": ["explain this to me"]}
+    question = "give me practice questions"
+    assert SemanticRouter(exemplars, margin=0.1).classify_many([question])[0][0] == "quiz_generator"
+    assert SemanticRouter(exemplars, margin=2.0).classify_many([question])[0][0] is None
+
+
+async def test_concurrent_questions_are_batched():
+    router = SemanticRouter.from_config(enabled_config())
+    calls = []
+    classify_many = router.classify_many
+    router.classify_many = lambda questions: calls.append(len(questions)) or classify_many(questions)
+    results = await asyncio.gather(*(router.classify(f"give me some practice questions {i}")
+                                     for i in range(10)))
+    assert calls == [10]
+    assert all(agent == "quiz_generator" for agent, _ in results)
+
+
+@pytest.mark.benchmark
+async def test_benchmark_added_latency():
+    router = SemanticRouter.from_config(enabled_config())
+    questions = [f"can you find me some reading about topic number {i}" for i in range(64)]
+    await asyncio.gather(*(router.classify(q) for q in questions))
+    started = time.perf_counter()
+    for q in questions:
+        await router.classify(q)
+    single = (time.perf_counter() - started) / len(questions)
+    started = time.perf_counter()
+    await asyncio.gather(*(router.classify(q) for q in questions))
+    batched = (time.perf_counter() - started) / len(questions)
+    print(f"\nsemantic routing: {single * 1e6:.0f}us per question alone, "
+          f"{batched * 1e6:.0f}us per question in batches of {len(questions)}")
+    assert single < 0.01
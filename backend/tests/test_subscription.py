@@ -0,0 +1,140 @@
+import asyncio
+
+from core.blackboard import Blackboard
+from core.subscription import OverflowPolicy, PatternIndex, Subscription
+
+
+async def test_slow_subscriber_drops_oldest():
+    blackboard = Blackboard()
+    release = asyncio.Event()
+    seen = []
+
+    async def callback(entry):
+        await release.wait()
+        seen.append(entry.value)
+
+    subscription = await blackboard.subscribe("k", callback, max_pending=2)
+    for i in range(5):
+        await blackboard.write("k", i, "writer")
+    await asyncio.sleep(0)
+    # 第一条已经在回调中，其余只保留最新的两条
+    release.set()
+    await asyncio.sleep(0.01)
+    assert seen[-2:] == [3, 4]
+    assert subscription.dropped > 0
+    subscription.close()
+
+
+async def test_disconnect_callback_runs_outside_the_writer():
+    blackboard = Blackboard()
+    release = asyncio.Event()
+    disconnected = []
+
+    async def callback(entry):
+        await release.wait()
+
+    def on_disconnect(subscription):
+        disconnected.append(subscription.key)
+        raise RuntimeError("callback errors must not reach the writer")
+
+    await blackboard.subscribe("k", callback, max_pending=1, overflow=OverflowPolicy.DISCONNECT,
+                               on_disconnect=on_disconnect)
+    for i in range(3):
+        await blackboard.write("k", i, "writer")
+    assert disconnected == []
+    await asyncio.sleep(0)
+    assert disconnected == ["k"]
+    release.set()
+
+
+async def test_async_disconnect_callback():
+    blackboard = Blackboard()
+    disconnected = asyncio.Event()
+
+    async def callback(entry):
+        await asyncio.sleep(1)
+
+    async def on_disconnect(subscription):
+        disconnected.set()
+
+    subscription = await blackboard.subscribe("k", callback, max_pending=1,
+                                              overflow=OverflowPolicy.DISCONNECT,
+                                              on_disconnect=on_disconnect)
+    for i in range(3):
+        await blackboard.write("k", i, "writer")
+    await asyncio.wait_for(disconnected.wait(), 1)
+    assert subscription.closed
+
+
+async def _noop(entry):
+    pass
+
+
+def _index(*patterns):
+    index = PatternIndex()
+    subscriptions = {pattern: Subscription(pattern, _noop) for pattern in patterns}
+    for pattern, subscription in subscriptions.items():
+        index.add(pattern, subscription)
+    return index, subscriptions
+
+
+def _matched(index, key):
+    return sorted(subscription.key for subscription in index.match(key))
+
+
+def test_pattern_index_matches_prefixes_globs_and_exact_keys():
+    index, _ = _index("student_model_*", "student_*", "task_result_*_2024*", "agent_status",
+                      "quiz_?", "q[ab]_*", "*_done", "*")
+    assert len(index) == 8
+    assert _matched(index, "student_model_7") == ["*", "student_*", "student_model_*"]
+    assert _matched(index, "student_") == ["*", "student_*"]
+    assert _matched(index, "task_result_s1_20240101") == ["*", "task_result_*_2024*"]
+    assert _matched(index, "task_result_s1_2023") == ["*"]
+    # 不含通配符的模式只匹配完全相同的键
+    assert _matched(index, "agent_status") == ["*", "agent_status"]
+    assert _matched(index, "agent_status_old") == ["*"]
+    assert _matched(index, "quiz_1") == ["*", "quiz_?"]
+    assert _matched(index, "quiz_12") == ["*"]
+    assert _matched(index, "qa_x") == ["*", "q[ab]_*"]
+    assert _matched(index, "qc_x") == ["*"]
+    assert _matched(index, "crawl_done") == ["*", "*_done"]
+    assert _matched(index, "") == ["*"]
+
+
+def test_pattern_index_remove_only_drops_the_given_subscription():
+    index, subscriptions = _index("student_*")
+    other = Subscription("student_*", _noop)
+    index.add("student_*", other)
+
+    assert index.remove("student_*", subscriptions["student_*"])
+    assert index.match("student_1") == [other]
+    assert len(index) == 1
+    # 重复删除、未注册的模式或订阅都返回 False
+    assert not index.remove("student_*", subscriptions["student_*"])
+    assert not index.remove("teacher_*", other)
+    assert not index.remove("stud*", other)
+    assert len(index) == 1
+
+
+def test_pattern_index_prunes_empty_trie_nodes():
+    index, subscriptions = _index("student_*", "student_model_*")
+    root = index._root
+
+    def node_at(prefix):
+        node = root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    assert node_at("student_model_") is not None
+    index.remove("student_model_*", subscriptions["student_model_*"])
+    # 只回收 "student_" 之后的空节点，仍有订阅的节点保留
+    assert node_at("student_m") is None
+    assert node_at("student_").subscriptions and not node_at("student_").children
+    assert index.match("student_model_1") == [subscriptions["student_*"]]
+
+    index.remove("student_*", subscriptions["student_*"])
+    assert root.children == {} and len(index) == 0
+    assert index.match("student_1") == []
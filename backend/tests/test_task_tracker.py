@@ -0,0 +1,50 @@
+import gc
+import warnings
+
+import pytest
+
+from agents.coordinator_agent import CoordinatorAgent
+from core.blackboard import Blackboard
+from core.task_tracker import TaskStatus, TaskTracker
+
+
+def never_awaited(caught) -> list:
+    return [w for w in caught if "was never awaited" in str(w.message)]
+
+
+async def test_duplicate_task_id_is_rejected_without_leaking_the_coroutine():
+    tracker = TaskTracker(Blackboard())
+
+    async def work():
+        return 1
+
+    tracker.submit(work(), task_id="t1")
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        with pytest.raises(ValueError):
+            tracker.submit(work(), task_id="t1")
+        gc.collect()
+    assert never_awaited(caught) == []
+    assert (await tracker.wait("t1")).status == TaskStatus.COMPLETED
+    await tracker.close()
+
+
+async def test_coordinator_reports_duplicate_new_task_as_an_error():
+    blackboard = Blackboard()
+    coordinator = CoordinatorAgent("coordinator_1", blackboard)
+    message = {"type": "new_task", "task_id": "dup", "data": {"content": "hi"}}
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        first = await coordinator.process_message(message)
+        second = await coordinator.process_message(message)
+        gc.collect()
+    assert first == {"type": "task_accepted", "task_id": "dup"}
+    assert second["type"] == "error" and second["task_id"] == "dup"
+    assert never_awaited(caught) == []
+    await coordinator.task_tracker.close()
+    await blackboard.close()
+
+
+async def test_generated_task_ids_are_unique():
+    ids = {TaskTracker.new_task_id() for _ in range(10_000)}
+    assert len(ids) == 10_000
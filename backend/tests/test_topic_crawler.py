@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+import pytest
+
+from tools.topic_crawler import KnowledgeStore, TopicCrawler, tokenize
+
+pytestmark = pytest.mark.usefixtures("http_session")
+
+WW2 = ("<html><head><title>二战</title></head><body>"
+       "<p>第二次世界大战（简称二战）于1939年9月1日德国入侵波兰开始，1945年结束。二战期间同盟国与轴心国交战。</p>"
+       "<nav><a href='/'>首页</a></nav></body></html>")
+WW1 = ("<html><body><p>第一次世界大战于1914年开始，1918年结束。</p></body></html>")
+FRANCE = ("<html><body><p>The French Revolution began in 1789 with the storming of the "
+          "Bastille.</p><p>Unrelated cooking notes.</p></body></html>")
+
+
+@pytest.fixture
+async def history_site(stub_site):
+    stub_site.add("/ww2", WW2)
+    stub_site.add("/ww1", WW1)
+    stub_site.add("/france", FRANCE)
+    stub_site.add("/", "<html><body><a href='/ww2'>二战</a><a href='/ww1'>一战</a>"
+                       "<a href='/france#top'>France</a><a href='http://elsewhere.invalid/'>x</a>"
+                       "</body></html>")
+    return stub_site
+
+
+def crawler(store, **options) -> TopicCrawler:
+    return TopicCrawler(store, per_host_delay=0, **options)
+
+
+def test_tokenize_splits_chinese_into_bigrams():
+    assert tokenize("二战") == ["二战"]
+    assert tokenize("世界大战 World War II") == ["世界", "界大", "大战", "world", "war"]
+    assert tokenize("1939年") == ["1939", "年"]
+
+
+async def test_crawl_follows_same_host_links(history_site, tmp_path):
+    store = KnowledgeStore(str(tmp_path / "knowledge.jsonl"))
+    metrics = await crawler(store).crawl("history", [history_site.url + "/"])
+    assert metrics.pages == 4 and metrics.errors == 0
+    assert history_site.hits["/france"] == 1
+    with open(store.path, encoding="utf-8") as f:
+        urls = {json.loads(line)["url"] for line in f}
+    assert history_site.url + "/ww2" in urls
+
+
+async def test_keywords_filter_chunks(history_site, tmp_path):
+    store = KnowledgeStore(str(tmp_path / "knowledge.jsonl"))
+    metrics = await crawler(store, chunk_chars=60).crawl(
+        "history", [history_site.url + "/france"], keywords=["revolution"])
+    assert metrics.chunks == 1
+
+
+@pytest.mark.parametrize("question,expected", [
+    ("第二次世界大战是什么时候开始的", "/ww2"),
+    ("二战", "/ww2"),
+    ("第一次世界大战", "/ww1"),
+    ("When did the French Revolution begin?", "/france"),
+])
+async def test_search_finds_chinese_and_english_chunks(history_site, tmp_path, question, expected):
+    store = KnowledgeStore(str(tmp_path / "knowledge.jsonl"))
+    await crawler(store).crawl("history", [history_site.url + "/"])
+    results = await store.search(question)
+    assert results and results[0]["url"] == history_site.url + expected
+
+
+async def test_index_survives_reload_and_dedupes(history_site, tmp_path):
+    path = str(tmp_path / "knowledge.jsonl")
+    await crawler(KnowledgeStore(path)).crawl("history", [history_site.url + "/"])
+    store = KnowledgeStore(path)
+    assert (await store.search("二战"))[0]["url"].endswith("/ww2")
+    with open(path, encoding="utf-8") as f:
+        existing = json.loads(f.readline())["text"]
+    # 重复的内容不会再次写入，新内容写入后立即可以检索到
+    assert await store.append([{"topic": "history", "url": "u", "text": "光荣革命发生在1688年"},
+                               {"topic": "history", "url": "u", "text": existing}]) == 1
+    assert (await store.search("光荣革命"))[0]["url"] == "u"
+    assert await store.search("光荣革命", topic="science") == []
+
+
+async def test_search_does_not_rescan_the_file(history_site, tmp_path):
+    store = KnowledgeStore(str(tmp_path / "knowledge.jsonl"))
+    await crawler(store).crawl("history", [history_site.url + "/"])
+    store._iter_records = None  # 加载之后不应再读取文件
+    assert await store.search("二战")
+
+
+async def test_store_failure_does_not_stall_the_crawl(stub_site, tmp_path):
+    class FlakyStore(KnowledgeStore):
+        """第一批写入失败（例如记录无法序列化），之后恢复正常."""
+
+        def __init__(self, path):
+            super().__init__(path)
+            self.calls = 0
+
+        async def append(self, records):
+            self.calls += 1
+            if self.calls == 1:
+                raise TypeError("Object of type set is not JSON serializable")
+            return await super().append(records)
+
+    # 足够多的文本块，能把有界的记录队列（1000 条）填满
+    body = "".join(f"<p>段落{i} 世界大战的历史记录。</p>" for i in range(3000))
+    url = stub_site.add("/long", f"<html><body>{body}</body></html>")
+    store = FlakyStore(str(tmp_path / "knowledge.jsonl"))
+    metrics = await asyncio.wait_for(crawler(store, chunk_chars=20).crawl("history", [url]), 10)
+    assert metrics.pages == 1 and metrics.errors == 1
+    assert metrics.chunks > 1000 and store.calls > 1
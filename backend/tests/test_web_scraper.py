@@ -0,0 +1,137 @@
+import asyncio
+import time
+
+import pytest
+
+from tools.web_scraper import WebScraperTool
+
+pytestmark = pytest.mark.usefixtures("http_session", "inline_cpu")
+
+
+def page(text: str) -> str:
+    return f"<html><head><title>t</title></head><body><p>{text}</p><script>var x;</script></body></html>"
+
+
+async def test_ascrape_extracts_text(stub_site):
+    url = stub_site.add("/a", page("Hello <b>world</b>"))
+    assert (await WebScraperTool().ascrape(url)).strip() == "Hello world"
+
+
+async def test_compressed_responses_are_decoded(stub_site):
+    url = stub_site.add("/big", page("压缩 " * 5000))
+    text = await WebScraperTool().ascrape(url)
+    assert text.count("压缩") == 5000
+
+
+async def test_http_errors_are_reported(stub_site):
+    url = stub_site.add("/err", "boom", status=500)
+    assert (await WebScraperTool().ascrape(url)).startswith("An error occurred")
+    assert (await WebScraperTool().ascrape(stub_site.url + "/missing")).startswith("An error occurred")
+
+
+async def test_scrape_many_keeps_order_and_bounds_concurrency(stub_site):
+    urls = [stub_site.add(f"/p{i}", page(f"page {i}"), delay=0.02) for i in range(20)]
+    results = await WebScraperTool().scrape_many(urls, max_concurrency=5)
+    assert [r.strip() for r in results] == [f"page {i}" for i in range(20)]
+    assert stub_site.max_in_flight <= 5
+
+
+async def test_connections_are_reused(stub_site):
+    urls = [stub_site.add(f"/p{i}", page(str(i))) for i in range(40)]
+    scraper = WebScraperTool()
+    for url in urls:
+        await scraper.ascrape(url)
+    # 顺序抓取同一主机的 40 个页面只需要一个长连接
+    assert len(stub_site.connections) == 1
+
+
+async def test_max_bytes_caps_the_download(stub_site):
+    url = stub_site.add("/huge", page("x" * 100_000))
+    text = await WebScraperTool(max_bytes=1000).ascrape(url)
+    assert 0 < len(text) < 1000
+
+
+async def test_sync_scrape_still_works(stub_site):
+    url = stub_site.add("/sync", page("sync text"))
+    assert (await asyncio.to_thread(WebScraperTool().scrape, url)).strip() == "sync text"
+
+
+@pytest.mark.benchmark
+async def test_benchmark_scrape_throughput(stub_site):
+    """桩网站每个页面延迟 20ms：逐个 requests.get 与 scrape_many 的吞吐量对比."""
+    urls = [stub_site.add(f"/p{i}", page(f"page {i} " * 200), delay=0.02) for i in range(100)]
+    scraper = WebScraperTool()
+
+    start = time.perf_counter()
+    for url in urls[:20]:
+        await asyncio.to_thread(scraper.scrape, url)
+    sequential = 20 / (time.perf_counter() - start)
+
+    stub_site.connections.clear()
+    start = time.perf_counter()
+    await scraper.scrape_many(urls, max_concurrency=16)
+    concurrent = len(urls) / (time.perf_counter() - start)
+
+    print(f"\nsequential requests.get: {sequential:.0f} pages/s, "
+          f"scrape_many(16): {concurrent:.0f} pages/s over {len(stub_site.connections)} connections")
+    assert concurrent > sequential * 3
+
+
+GBK_PAGE = ('<html><head><meta http-equiv="Content-Type" content="text/html; charset=gb2312">'
+            "<title>t</title></head><body><p>二战开始于1939年</p></body></html>").encode("gbk")
+
+
+async def test_meta_charset_is_honoured(stub_site):
+    url = stub_site.add("/gbk", GBK_PAGE, charset=None)
+    assert (await WebScraperTool().ascrape(url)).strip() == "二战开始于1939年"
+    chunks = [chunk async for chunk in WebScraperTool().stream(url, min_chunk_chars=1)]
+    assert "".join(chunks).strip() == "二战开始于1939年"
+
+
+async def test_sync_scrape_honours_meta_charset(stub_site):
+    url = stub_site.add("/gbk-sync", GBK_PAGE, charset=None)
+    text = await asyncio.to_thread(WebScraperTool().scrape, url)
+    assert text.strip() == "二战开始于1939年"
+
+
+async def test_open_stream_fails_before_any_text_is_produced(stub_site):
+    import aiohttp
+
+    scraper = WebScraperTool(timeout=0.2)
+    with pytest.raises(aiohttp.ClientResponseError) as error:
+        await scraper.open_stream(stub_site.add("/stream-err", "boom", status=503))
+    assert error.value.status == 503
+    with pytest.raises(asyncio.TimeoutError):
+        await scraper.open_stream(stub_site.add("/stream-slow", page("late"), delay=1))
+    with pytest.raises(aiohttp.ClientConnectionError):
+        await scraper.open_stream("http://127.0.0.1:1/")
+
+    chunks = await scraper.open_stream(stub_site.add("/stream-ok", page("正文")))
+    assert "".join([chunk async for chunk in chunks]).strip() == "正文"
+
+
+def test_session_from_a_finished_loop_is_closed_when_replaced():
+    from stub_site import StubSite
+    from tools.http_client import close_session, get_session
+
+    async def first_loop():
+        site = StubSite()
+        await site.start()
+        session = get_session()
+        try:
+            await WebScraperTool().ascrape(site.add("/first", page("first loop")))
+        finally:
+            await site.stop()
+        return session
+
+    async def second_loop():
+        session = get_session()
+        await close_session()
+        return session
+
+    # pytest-asyncio 也是每个测试一个新的事件循环，共享会话会在循环切换时被替换
+    old = asyncio.run(first_loop())
+    assert not old.closed
+    new = asyncio.run(second_loop())
+    assert new is not old
+    assert old.closed and old.connector is None
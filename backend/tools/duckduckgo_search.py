@@ -1,5 +1,26 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from collections import OrderedDict
+import asyncio
+import inspect
+import logging
+import re
+import time
+
 from duckduckgo_search import DDGS
 
+logger = logging.getLogger(__name__)
+
+SearchResults = List[Dict[str, Any]]
+# 搜索后端：(query, max_results) -> 结果列表，可以是同步或异步函数
+SearchBackend = Callable[[str, int], Union[SearchResults, Awaitable[SearchResults]]]
+
+
+def _format_results(results: SearchResults) -> str:
+    if results:
+        return "\n".join([r["body"] for r in results])
+    return "No results found."
+
+
 class DuckDuckGoSearchTool:
     """DuckDuckGo 搜索工具."""
 
@@ -10,13 +31,123 @@ class DuckDuckGoSearchTool:
         """使用 DuckDuckGo 搜索并返回结果."""
         try:
             results = self.ddgs.text(query, max_results=max_results)
-            if results:
-                return "\n".join([r["body"] for r in results])
-            else:
-                return "No results found."
+            return _format_results(results)
         except Exception as e:
             return f"An error occurred: {e}"
 
     def __call__(self, query: str, max_results: int = 5) -> str:
         """使实例可调用."""
-        return self.search(query, max_results)
\ No newline at end of file
+        return self.search(query, max_results)
+
+
+_ddgs: Optional[DDGS] = None
+
+
+def ddgs_backend(query: str, max_results: int) -> SearchResults:
+    """默认后端：进程内共享的 DDGS 客户端（同步调用，由 AsyncSearchTool 放到线程中执行）."""
+    global _ddgs
+    if _ddgs is None:
+        _ddgs = DDGS()
+    return list(_ddgs.text(query, max_results=max_results) or [])
+
+
+class AsyncSearchTool:
+    """带缓存和请求合并的异步搜索工具.
+
+    - 结果按规范化后的查询（小写、合并空白）和 max_results 缓存 ttl 秒，
+      最多 max_entries 条，超出时淘汰最近最少使用的条目。
+    - 同一查询并发到达时只向后端发出一次请求（single-flight），
+      其余调用方等待同一个结果。后端请求在独立的任务中执行，
+      任何一个调用方被取消都不会影响其他调用方。
+    - 同步后端在线程中执行，不阻塞事件循环；失败的结果不缓存。
+    """
+
+    def __init__(self, backend: Optional[SearchBackend] = None, ttl: float = 300.0,
+                 max_entries: int = 1024):
+        self.backend = backend or ddgs_backend
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple[str, int], Tuple[float, SearchResults]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, int], asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return re.sub(r"\s+", " ", query).strip().lower()
+
+    async def search_results(self, query: str, max_results: int = 5) -> SearchResults:
+        """返回原始结果列表（可能来自缓存）."""
+        key = (self.normalize(query), max_results)
+        cached = self._cache.get(key)
+        if cached is not None:
+            expires, results = cached
+            if expires > time.monotonic():
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return results
+            del self._cache[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.create_task(self._fetch(key))
+            task.add_done_callback(self._fetch_done)
+            self._inflight[key] = task
+        # 调用方（包括发起请求的一方）被取消时只停止等待，后端请求继续完成并写入缓存
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: Tuple[str, int]) -> SearchResults:
+        try:
+            results = await self._call_backend(*key)
+        finally:
+            del self._inflight[key]
+        self._store(key, results)
+        return results
+
+    @staticmethod
+    def _fetch_done(task: asyncio.Task) -> None:
+        # 所有等待者都已取消时避免 "exception was never retrieved" 警告
+        if not task.cancelled():
+            task.exception()
+
+    async def _call_backend(self, query: str, max_results: int) -> SearchResults:
+        if inspect.iscoroutinefunction(self.backend):
+            return await self.backend(query, max_results)
+        return await asyncio.to_thread(self.backend, query, max_results)
+
+    def _store(self, key: Tuple[str, int], results: SearchResults) -> None:
+        self._cache[key] = (time.monotonic() + self.ttl, results)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    async def search(self, query: str, max_results: int = 5) -> str:
+        """搜索并返回格式化文本，与 DuckDuckGoSearchTool.search 的输出一致."""
+        try:
+            return _format_results(await self.search_results(query, max_results))
+        except Exception as e:
+            return f"An error occurred: {e}"
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._cache),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+
+_search_tool: Optional[AsyncSearchTool] = None
+
+
+def get_search_tool() -> AsyncSearchTool:
+    """返回进程内共享的 AsyncSearchTool（共享缓存和后端客户端）."""
+    global _search_tool
+    if _search_tool is None:
+        _search_tool = AsyncSearchTool()
+    return _search_tool
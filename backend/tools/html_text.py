@@ -0,0 +1,153 @@
+from typing import Iterable, Iterator, List, Optional
+from html.parser import HTMLParser
+import codecs
+import re
+
+# 这些元素的内容不是正文，整体跳过
+SKIPPED_TAGS = frozenset({"script", "style", "nav", "noscript", "template", "svg", "head"})
+# 这些元素结束时换行，避免相邻块的文字粘在一起
+BLOCK_TAGS = frozenset({"p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6",
+                        "section", "article", "header", "footer", "pre", "blockquote", "table"})
+# 只能出现在 <head> 中的元素；遇到其他开始标签说明 </head> 被省略了，正文已经开始
+HEAD_TAGS = frozenset({"head", "html", "title", "meta", "link", "base", "style", "script",
+                       "noscript", "template"})
+
+# 按 HTML 规范，<meta charset> 必须出现在前 1024 字节内
+SNIFF_BYTES = 1024
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_:.-]+)""", re.IGNORECASE)
+# 浏览器对这些标签实际使用的是超集编码
+_ENCODING_ALIASES = {"gb2312": "gbk", "gb_2312-80": "gbk", "x-gbk": "gbk",
+                     "iso-8859-1": "cp1252", "latin1": "cp1252", "us-ascii": "cp1252",
+                     "ascii": "cp1252", "shift-jis": "cp932", "shift_jis": "cp932"}
+
+
+def detect_encoding(head: bytes, declared: Optional[str] = None) -> str:
+    """确定页面编码：BOM > HTTP 头声明的 charset > <meta charset> > utf-8."""
+    for bom, encoding in ((codecs.BOM_UTF8, "utf-8-sig"), (codecs.BOM_UTF16_LE, "utf-16"),
+                          (codecs.BOM_UTF16_BE, "utf-16")):
+        if head.startswith(bom):
+            return encoding
+    candidates = [declared]
+    match = _META_CHARSET.search(head[:SNIFF_BYTES])
+    if match:
+        candidates.append(match.group(1).decode("ascii"))
+    for candidate in candidates:
+        if not candidate:
+            continue
+        candidate = candidate.strip().lower()
+        candidate = _ENCODING_ALIASES.get(candidate, candidate)
+        try:
+            return codecs.lookup(candidate).name
+        except LookupError:
+            continue
+    return "utf-8"
+
+
+class HTMLTextExtractor(HTMLParser):
+    """增量式 HTML 正文提取器.
+
+    可以分块 feed() 字节或字符串，随时用 pop_text() 取出已经解析出的文字，
+    不需要构建整个 DOM 树；script/style/nav 等元素的内容被丢弃。
+    collect_links=True 时同时收集 <a href> 链接（包括导航中的链接），供爬虫使用。
+
+    encoding 是 HTTP 头声明的编码；为 None 时先缓冲前 SNIFF_BYTES 字节，
+    从 BOM 或 <meta charset> 中识别编码，默认 utf-8。
+    """
+
+    def __init__(self, encoding: Optional[str] = None, collect_links: bool = False):
+        super().__init__(convert_charrefs=True)
+        self.collect_links = collect_links
+        self.links: List[str] = []
+        self._declared = encoding
+        # 增量解码器能处理被分块切断的多字节字符；识别出编码之前为 None
+        self._decoder = None
+        self._head = b""
+        # 正在跳过的元素及其同名嵌套深度；只数同名标签，不闭合的 <p>/<li> 不会打乱计数
+        self._skip_tag: Optional[str] = None
+        self._skip_depth = 0
+        self._parts: List[str] = []
+
+    def feed(self, data) -> None:
+        if isinstance(data, bytes):
+            if self._decoder is None:
+                self._head += data
+                if len(self._head) < SNIFF_BYTES:
+                    return
+                data = self._start_decoding()
+            data = self._decoder.decode(data)
+        super().feed(data)
+
+    def _start_decoding(self) -> bytes:
+        encoding = detect_encoding(self._head, self._declared)
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        head, self._head = self._head, b""
+        return head
+
+    def close(self) -> None:
+        if self._decoder is None:
+            head = self._start_decoding()
+            super().feed(self._decoder.decode(head))
+        super().feed(self._decoder.decode(b"", final=True))
+        super().close()
+
+    def _end_omitted_head(self, tag: str) -> None:
+        if self._skip_tag == "head" and tag not in HEAD_TAGS:
+            self._skip_tag = None
+            self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self.collect_links and tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self.links.append(href)
+        self._end_omitted_head(tag)
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth += 1
+        elif tag in SKIPPED_TAGS:
+            self._skip_tag = tag
+            self._skip_depth = 1
+        elif tag in BLOCK_TAGS:
+            self._parts.append("\n")
+
+    def handle_startendtag(self, tag, attrs):
+        self._end_omitted_head(tag)
+        if self._skip_tag is None and tag in BLOCK_TAGS:
+            self._parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth -= 1
+                if not self._skip_depth:
+                    self._skip_tag = None
+        elif tag in BLOCK_TAGS:
+            self._parts.append("\n")
+
+    def handle_data(self, data):
+        if self._skip_tag is None:
+            self._parts.append(data)
+
+    def pending(self) -> int:
+        """已解析但尚未取出的文字片段数."""
+        return len(self._parts)
+
+    def pop_text(self) -> str:
+        """取出目前为止解析出的文字."""
+        text = "".join(self._parts)
+        self._parts = []
+        return text
+
+
+def iter_text(chunks: Iterable[bytes], encoding: Optional[str] = None) -> Iterator[str]:
+    """把一串 HTML 字节块逐块转换成文字块."""
+    extractor = HTMLTextExtractor(encoding)
+    for chunk in chunks:
+        extractor.feed(chunk)
+        text = extractor.pop_text()
+        if text:
+            yield text
+    extractor.close()
+    text = extractor.pop_text()
+    if text:
+        yield text
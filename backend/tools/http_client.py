@@ -0,0 +1,72 @@
+from typing import Optional, Set
+import asyncio
+import logging
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# 连接池参数：总连接数与每个主机的连接数上限
+MAX_CONNECTIONS = 100
+MAX_CONNECTIONS_PER_HOST = 8
+KEEPALIVE_TIMEOUT = 30
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; EduSystemBot/1.0)",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+# 正在关闭的旧会话（见 _retire），保留引用以免任务被垃圾回收
+_retiring: Set[asyncio.Task] = set()
+
+
+def get_session() -> aiohttp.ClientSession:
+    """返回进程内共享的 aiohttp 会话（长连接复用、按主机限流、自动解压）.
+
+    会话绑定在创建它的事件循环上，必须在运行中的事件循环里调用。
+    """
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        if _session is not None and not _session.closed:
+            _retire(_session, _session_loop, loop)
+        connector = aiohttp.TCPConnector(
+            limit=MAX_CONNECTIONS,
+            limit_per_host=MAX_CONNECTIONS_PER_HOST,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=300,
+        )
+        _session = aiohttp.ClientSession(connector=connector, headers=DEFAULT_HEADERS,
+                                         auto_decompress=True)
+        _session_loop = loop
+        logger.info("Shared HTTP session created")
+    return _session
+
+
+def _retire(session: aiohttp.ClientSession, session_loop: asyncio.AbstractEventLoop,
+            loop: asyncio.AbstractEventLoop) -> None:
+    """关闭被替换掉的旧会话，释放它的连接器.
+
+    旧循环仍在其他线程中运行时在它自己的循环上关闭；已经结束时它的连接都已失效，
+    在当前循环上关闭即可。
+    """
+    if session_loop.is_running():
+        asyncio.run_coroutine_threadsafe(session.close(), session_loop)
+        return
+    task = loop.create_task(session.close())
+    _retiring.add(task)
+    task.add_done_callback(_retiring.discard)
+
+
+async def close_session() -> None:
+    """关闭共享会话（应用退出时调用）."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    loop = asyncio.get_running_loop()
+    pending = [task for task in _retiring if task.get_loop() is loop]
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,33 @@
+from io import BytesIO
+from typing import Any, Dict
+import base64
+
+from PIL import Image
+
+# 缩略图的最长边（像素）
+THUMBNAIL_SIZE = 256
+
+
+def decode_image(data: str, thumbnail_size: int = THUMBNAIL_SIZE) -> Dict[str, Any]:
+    """解码 Base64 图片并生成缩略图（CPU 密集，可在进程池中执行）.
+
+    解码、缩放和重新编码都在调用方所在的进程里完成，只返回一个很小的字典
+    （原图尺寸、格式、模式和 PNG 缩略图字节），而不是完整的 PIL Image：
+    后者跨进程返回时要把整块像素缓冲区序列化一遍。
+    """
+    with Image.open(BytesIO(base64.b64decode(data))) as image:
+        image.load()
+        summary = {
+            "format": image.format,
+            "mode": image.mode,
+            "width": image.width,
+            "height": image.height,
+        }
+        thumbnail = image.copy()
+    thumbnail.thumbnail((thumbnail_size, thumbnail_size))
+    if thumbnail.mode not in ("1", "L", "LA", "P", "RGB", "RGBA"):
+        thumbnail = thumbnail.convert("RGBA" if "A" in thumbnail.getbands() else "RGB")
+    buffer = BytesIO()
+    thumbnail.save(buffer, format="PNG", optimize=True)
+    summary["thumbnail"] = buffer.getvalue()
+    return summary
@@ -0,0 +1,209 @@
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class CachedPage:
+    url: str
+    text: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: float = 0.0
+
+    def validators(self) -> Dict[str, str]:
+        """条件请求头（If-None-Match / If-Modified-Since）."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """按 URL 缓存已解析网页文本的磁盘缓存.
+
+    - 每个页面一个 JSON 文件，文件名为 URL 的 SHA-1；同时保存 ETag 与
+      Last-Modified，过期后用条件请求重新验证，304 时无需重新下载和解析。
+    - 在 max_age 秒内的条目直接命中，不访问网络。
+    - 磁盘总大小超过 max_bytes 时按最近最少使用的顺序淘汰。
+    - 最近使用的 memory_entries 个条目同时保存在内存中，热点命中不读磁盘。
+    - 索引在事件循环上同步更新；文件的读、写和淘汰删除都交给同一个 IO 线程，
+      按提交顺序执行，磁盘上的文件因此总是与索引一致（不会留下没有被计数的文件）。
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 100 * 1024 * 1024,
+                 max_age: float = 3600.0, memory_entries: int = 256):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.memory_entries = memory_entries
+        os.makedirs(directory, exist_ok=True)
+
+        # 文件名 -> 文件大小，按最近使用排序（最旧的在前）
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._memory: "OrderedDict[str, CachedPage]" = OrderedDict()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="page-cache")
+        self._load_index()
+
+    def _load_index(self) -> None:
+        files: List[Tuple[float, str, int]] = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                # 写入中途崩溃留下的临时文件
+                try:
+                    os.remove(self._path(name))
+                except OSError:
+                    pass
+                continue
+            if not name.endswith(".json"):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            files.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._index[name] = size
+            self._total_bytes += size
+
+    @staticmethod
+    def _name(url: str) -> str:
+        return hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json"
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    async def get(self, url: str) -> Optional[CachedPage]:
+        """返回缓存的页面（可能已过期，调用方用 is_fresh 判断），不存在时返回 None.
+
+        内存未命中时在 IO 线程中读取磁盘文件，不阻塞事件循环。
+        """
+        name = self._name(url)
+        page = self._memory.get(name)
+        if page is None:
+            if name not in self._index:
+                self.misses += 1
+                return None
+            try:
+                page = await self._run_io(self._read_file, name)
+            except (OSError, ValueError, TypeError) as e:
+                logger.warning(f"Dropping unreadable cache entry for {url}: {str(e)}")
+                self._forget(name)
+                self.misses += 1
+                return None
+            if name not in self._index:
+                # 读取期间被淘汰或清空
+                self.misses += 1
+                return None
+            self._remember(name, page)
+        else:
+            self._memory.move_to_end(name)
+        self._index.move_to_end(name)
+        self.hits += 1
+        return page
+
+    def _read_file(self, name: str) -> CachedPage:
+        with open(self._path(name), "r", encoding="utf-8") as f:
+            return CachedPage(**json.load(f))
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        """条目是否仍在 max_age 内，可以不经验证直接使用."""
+        return time.time() - page.fetched_at < self.max_age
+
+    async def put(self, url: str, text: str, etag: Optional[str] = None,
+                  last_modified: Optional[str] = None) -> CachedPage:
+        """写入（或替换）一个页面，并在超出容量时淘汰旧条目."""
+        page = CachedPage(url, text, etag, last_modified, time.time())
+        await self._store(page)
+        return page
+
+    async def touch(self, page: CachedPage) -> CachedPage:
+        """服务器返回 304 后刷新条目的获取时间."""
+        self.revalidations += 1
+        page.fetched_at = time.time()
+        await self._store(page)
+        return page
+
+    async def _store(self, page: CachedPage) -> None:
+        name = self._name(page.url)
+        data = json.dumps(asdict(page), ensure_ascii=False).encode("utf-8")
+        self._remember(name, page)
+        self._total_bytes += len(data) - self._index.pop(name, 0)
+        self._index[name] = len(data)
+        evicted = self._evict()
+        # 记账和提交之间没有 await：先淘汰、后写入的文件操作一定排在这次写入之后
+        await self._run_io(self._write_file, name, data, evicted)
+
+    def _run_io(self, fn, *args):
+        return asyncio.get_running_loop().run_in_executor(self._io, fn, *args)
+
+    def _write_file(self, name: str, data: bytes, evicted: List[str]) -> None:
+        # 先写临时文件再替换，崩溃时不会留下写了一半的缓存文件
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(name))
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._remove_files(evicted)
+
+    def _remove_files(self, names: List[str]) -> None:
+        for name in names:
+            try:
+                os.remove(self._path(name))
+            except FileNotFoundError:
+                pass
+
+    def _evict(self) -> List[str]:
+        evicted = []
+        # 至少保留刚写入的条目
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            name, size = self._index.popitem(last=False)
+            self._memory.pop(name, None)
+            self._total_bytes -= size
+            evicted.append(name)
+        return evicted
+
+    def _remember(self, name: str, page: CachedPage) -> None:
+        self._memory[name] = page
+        self._memory.move_to_end(name)
+        if len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _forget(self, name: str) -> None:
+        self._total_bytes -= self._index.pop(name, 0)
+        self._memory.pop(name, None)
+
+    def clear(self) -> None:
+        """删除所有缓存条目（文件在 IO 线程中排在已提交的写入之后删除）."""
+        self._io.submit(self._remove_files, list(self._index))
+        self._index.clear()
+        self._memory.clear()
+        self._total_bytes = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._index),
+            "bytes": self._total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+        }
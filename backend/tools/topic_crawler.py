@@ -0,0 +1,410 @@
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from urllib.parse import urldefrag, urljoin, urlparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import time
+
+import aiohttp
+
+from tools.html_text import HTMLTextExtractor
+from tools.http_client import get_session
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class CrawlMetrics:
+    """一次爬取的吞吐量统计."""
+    topic: str
+    pages: int = 0
+    bytes: int = 0
+    chunks: int = 0
+    errors: int = 0
+    skipped: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = max(self.elapsed, 1e-9)
+        data = asdict(self)
+        del data["started_at"], data["finished_at"]
+        data.update({
+            "elapsed": round(self.elapsed, 3),
+            "pages_per_second": round(self.pages / elapsed, 2),
+            "bytes_per_second": round(self.bytes / elapsed, 1),
+        })
+        return data
+
+
+class URLFrontier:
+    """去重的待爬 URL 队列，带深度和页面总数上限."""
+
+    def __init__(self, max_pages: int, max_depth: int):
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self._queue: "asyncio.Queue[Tuple[str, int]]" = asyncio.Queue()
+        self._seen: Set[str] = set()
+
+    @staticmethod
+    def normalize(url: str) -> str:
+        url, _ = urldefrag(url)
+        return url.rstrip("/") or url
+
+    def add(self, url: str, depth: int) -> bool:
+        """加入一个 URL；已见过、超出深度或已达页面上限时返回 False."""
+        url = self.normalize(url)
+        if url in self._seen or depth > self.max_depth or len(self._seen) >= self.max_pages:
+            return False
+        self._seen.add(url)
+        self._queue.put_nowait((url, depth))
+        return True
+
+    async def get(self) -> Tuple[str, int]:
+        return await self._queue.get()
+
+    def task_done(self) -> None:
+        self._queue.task_done()
+
+    async def join(self) -> None:
+        await self._queue.join()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+class HostPoliteness:
+    """每个主机的并发上限和相邻两次请求的最小间隔."""
+
+    def __init__(self, per_host_concurrency: int = 2, min_delay: float = 1.0):
+        self.per_host_concurrency = per_host_concurrency
+        self.min_delay = min_delay
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._next_slot: Dict[str, float] = {}
+
+    async def acquire(self, host: str) -> None:
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.per_host_concurrency))
+        await semaphore.acquire()
+        # 预约下一个时间槽后再睡眠，同一主机的请求之间至少间隔 min_delay
+        now = time.monotonic()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.min_delay
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def release(self, host: str) -> None:
+        self._semaphores[host].release()
+
+
+_WORD = re.compile(r"\w+")
+# 中日韩统一表意文字（含扩展 A）及兼容表意文字
+_CJK_RUN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """切分检索词：英文等按单词（长度大于 2），中文按相邻两字的二元组.
+
+    中文没有空格分词，按字二元组切分后 "第二次世界大战" 与 "世界大战"、
+    "二战" 与 "简称二战" 都能命中；单独一个汉字作为一个词。
+    """
+    terms = []
+    for word in _WORD.findall(text.lower()):
+        start = 0
+        for run in _CJK_RUN.finditer(word):
+            head = word[start:run.start()]
+            if len(head) > 2:
+                terms.append(head)
+            cjk = run.group()
+            if len(cjk) == 1:
+                terms.append(cjk)
+            else:
+                terms.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+            start = run.end()
+        if len(word) - start > 2:
+            terms.append(word[start:])
+    return terms
+
+
+class KnowledgeStore:
+    """本地知识库：按行追加的 JSONL 文件，每行一个文本块，按内容哈希去重.
+
+    首次读写时把文件加载到内存并建立倒排索引（检索词 -> {记录序号: 词频}），
+    之后 append 增量更新索引，search 不再重新扫描文件。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._hashes: Optional[Set[str]] = None
+        self._records: List[Dict[str, Any]] = []
+        self._index: Dict[str, Dict[int, int]] = {}
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    async def _ensure_loaded(self) -> None:
+        if self._hashes is None:
+            records = await asyncio.to_thread(lambda: list(self._iter_records()))
+            self._hashes = set()
+            for record in records:
+                digest = record.get("hash") or self._hash(record.get("text", ""))
+                if digest not in self._hashes:
+                    self._hashes.add(digest)
+                    self._add_to_index(record)
+
+    def _add_to_index(self, record: Dict[str, Any]) -> None:
+        doc_id = len(self._records)
+        self._records.append(record)
+        for term in tokenize(record.get("text", "")):
+            postings = self._index.setdefault(term, {})
+            postings[doc_id] = postings.get(doc_id, 0) + 1
+
+    def _iter_records(self) -> Iterable[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+
+    async def append(self, records: List[Dict[str, Any]]) -> int:
+        """追加一批记录，跳过内容重复的块，返回实际写入的条数."""
+        async with self._lock:
+            await self._ensure_loaded()
+            fresh = []
+            for record in records:
+                digest = self._hash(record["text"])
+                if digest in self._hashes:
+                    continue
+                self._hashes.add(digest)
+                fresh.append({**record, "hash": digest})
+            if fresh:
+                await asyncio.to_thread(self._write, fresh)
+                for record in fresh:
+                    self._add_to_index(record)
+            return len(fresh)
+
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+
+    async def search(self, query: str, topic: Optional[str] = None, limit: int = 3) -> List[Dict[str, Any]]:
+        """按查询词的词频加权（TF-IDF）返回最相关的文本块."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        async with self._lock:
+            await self._ensure_loaded()
+        total = len(self._records)
+        scores: Dict[int, float] = {}
+        for term in terms:
+            postings = self._index.get(term)
+            if not postings:
+                continue
+            # 常见词（"什么"、"the"）权重低，罕见词权重高
+            idf = math.log(1 + total / len(postings))
+            for doc_id, count in postings.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + count * idf
+        if topic:
+            scores = {doc_id: score for doc_id, score in scores.items()
+                      if self._records[doc_id].get("topic") == topic}
+        best = sorted(scores, key=lambda doc_id: (-scores[doc_id], doc_id))[:limit]
+        return [self._records[doc_id] for doc_id in best]
+
+
+class _Chunker:
+    """把连续到达的文字按段落拼成不超过 chunk_chars 的块."""
+
+    def __init__(self, chunk_chars: int):
+        self.chunk_chars = chunk_chars
+        self._parts: List[str] = []
+        self._size = 0
+        self._tail = ""
+
+    def add(self, text: str) -> List[str]:
+        lines = (self._tail + text).split("\n")
+        # 最后一行可能还没结束，留到下一次
+        self._tail = lines.pop()
+        return self._take(lines)
+
+    def flush(self) -> List[str]:
+        chunks = self._take([self._tail])
+        self._tail = ""
+        if self._parts:
+            chunks.append(" ".join(self._parts))
+            self._parts, self._size = [], 0
+        return chunks
+
+    def _take(self, lines: List[str]) -> List[str]:
+        chunks = []
+        for line in lines:
+            line = " ".join(line.split())
+            if not line:
+                continue
+            if self._parts and self._size + len(line) > self.chunk_chars:
+                chunks.append(" ".join(self._parts))
+                self._parts, self._size = [], 0
+            self._parts.append(line)
+            self._size += len(line) + 1
+        return chunks
+
+
+class TopicCrawler:
+    """按主题爬取网页并写入本地知识库的流水线.
+
+    种子 URL 进入去重的 frontier；workers 个抓取任务从中取 URL，按主机限流后
+    通过共享连接池边下载边解析，文字按段落切块，含有主题关键词的块交给
+    单独的写入任务批量追加到 KnowledgeStore。同一主机内发现的链接在
+    max_depth 内继续加入 frontier。
+    """
+
+    def __init__(self, store: KnowledgeStore, workers: int = 4, max_pages: int = 50,
+                 max_depth: int = 1, per_host_concurrency: int = 2, per_host_delay: float = 1.0,
+                 chunk_chars: int = 1000, min_keyword_hits: int = 1,
+                 max_bytes: int = 5 * 1024 * 1024, timeout: float = 15.0):
+        self.store = store
+        self.workers = workers
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_delay = per_host_delay
+        self.chunk_chars = chunk_chars
+        self.min_keyword_hits = min_keyword_hits
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+
+    async def crawl(self, topic: str, seeds: List[str], keywords: Optional[List[str]] = None) -> CrawlMetrics:
+        """爬取一个主题，返回吞吐量统计."""
+        metrics = CrawlMetrics(topic)
+        frontier = URLFrontier(self.max_pages, self.max_depth)
+        politeness = HostPoliteness(self.per_host_concurrency, self.per_host_delay)
+        records: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue(maxsize=1000)
+        keywords = [k.lower() for k in (keywords or [])]
+        allowed_hosts = {urlparse(url).netloc for url in seeds}
+
+        for url in seeds:
+            frontier.add(url, 0)
+
+        writer = asyncio.create_task(self._write_records(records, metrics))
+        workers = [asyncio.create_task(self._worker(topic, keywords, allowed_hosts, frontier,
+                                                    politeness, records, metrics))
+                   for _ in range(self.workers)]
+        try:
+            await frontier.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            if not writer.done():
+                await records.put(None)
+            await writer
+            metrics.finished_at = time.monotonic()
+        logger.info(f"Crawled topic {topic}: {metrics.to_dict()}")
+        return metrics
+
+    async def _worker(self, topic: str, keywords: List[str], allowed_hosts: Set[str],
+                      frontier: URLFrontier, politeness: HostPoliteness,
+                      records: asyncio.Queue, metrics: CrawlMetrics) -> None:
+        while True:
+            url, depth = await frontier.get()
+            try:
+                links = await self._crawl_page(topic, url, keywords, politeness, records, metrics)
+                if depth < self.max_depth:
+                    for link in links:
+                        link = urljoin(url, link)
+                        parsed = urlparse(link)
+                        if parsed.scheme in ("http", "https") and parsed.netloc in allowed_hosts:
+                            frontier.add(link, depth + 1)
+            except Exception as e:
+                # 一个页面失败不能让 worker 退出，否则 frontier.join() 永远等不到
+                metrics.errors += 1
+                logger.warning(f"Failed to crawl {url}: {str(e)}")
+            finally:
+                frontier.task_done()
+
+    async def _crawl_page(self, topic: str, url: str, keywords: List[str],
+                          politeness: HostPoliteness, records: asyncio.Queue,
+                          metrics: CrawlMetrics) -> List[str]:
+        host = urlparse(url).netloc
+        await politeness.acquire(host)
+        try:
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            async with get_session().get(url, timeout=timeout) as response:
+                response.raise_for_status()
+                if "html" not in response.headers.get("Content-Type", "text/html"):
+                    metrics.skipped += 1
+                    return []
+                extractor = HTMLTextExtractor(response.charset, collect_links=True)
+                chunker = _Chunker(self.chunk_chars)
+                index = 0
+                read = 0
+                async for data in response.content.iter_chunked(READ_CHUNK_SIZE):
+                    extractor.feed(data[:self.max_bytes - read])
+                    read += len(data)
+                    for chunk in chunker.add(extractor.pop_text()):
+                        index = await self._emit(topic, url, index, chunk, keywords, records)
+                    if read >= self.max_bytes:
+                        break
+                extractor.close()
+                for chunk in chunker.add(extractor.pop_text()) + chunker.flush():
+                    index = await self._emit(topic, url, index, chunk, keywords, records)
+        finally:
+            politeness.release(host)
+        metrics.pages += 1
+        metrics.bytes += min(read, self.max_bytes)
+        return extractor.links
+
+    async def _emit(self, topic: str, url: str, index: int, text: str, keywords: List[str],
+                    records: asyncio.Queue) -> int:
+        lowered = text.lower()
+        matched = [k for k in keywords if k in lowered]
+        if keywords and len(matched) < self.min_keyword_hits:
+            return index
+        await records.put({
+            "topic": topic,
+            "url": url,
+            "chunk_index": index,
+            "text": text,
+            "keywords": matched,
+            "fetched_at": datetime.now().isoformat(),
+        })
+        return index + 1
+
+    async def _write_records(self, records: asyncio.Queue, metrics: CrawlMetrics,
+                             batch_size: int = 100) -> None:
+        done = False
+        while not done:
+            batch = [await records.get()]
+            # 把已经排队的记录合并成一次写入
+            while not records.empty() and len(batch) < batch_size:
+                batch.append(records.get_nowait())
+            if batch[-1] is None:
+                batch.pop()
+                done = True
+            if batch:
+                try:
+                    metrics.chunks += await self.store.append(batch)
+                except Exception as e:
+                    # 丢掉这一批但继续消费队列：写入任务退出后 worker 会永远阻塞在 records.put 上
+                    metrics.errors += 1
+                    logger.error(f"Error writing to knowledge store: {str(e)}")
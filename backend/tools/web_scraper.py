@@ -1,22 +1,171 @@
+from typing import AsyncIterator, List, Optional
+import asyncio
+
+import aiohttp
 import requests
-from bs4 import BeautifulSoup
+
+from core.executor import run_cpu
+from tools.html_text import HTMLTextExtractor
+from tools.http_client import get_session
+from tools.page_cache import PageCache
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def extract_text(content: bytes, encoding: Optional[str] = None) -> str:
+    """解析 HTML 并提取正文（CPU 密集，可在进程池中执行）.
+
+    encoding 为 HTTP 头声明的编码，没有声明时从 <meta charset> 识别。
+    """
+    extractor = HTMLTextExtractor(encoding)
+    extractor.feed(content)
+    extractor.close()
+    return extractor.pop_text()
+
 
 class WebScraperTool:
     """网页抓取工具."""
 
-    def __init__(self, timeout: int = 10):
+    def __init__(self, timeout: int = 10, max_concurrency: int = 16,
+                 cache: Optional[PageCache] = None, max_bytes: int = 5 * 1024 * 1024):
         self.timeout = timeout
+        # 每个页面最多读取的字节数，超出部分直接丢弃
+        self.max_bytes = max_bytes
+        self.max_concurrency = max_concurrency
+        self.cache = cache
 
     def scrape(self, url: str) -> str:
         """抓取指定 URL 的网页内容."""
         try:
-            response = requests.get(url, timeout=self.timeout)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            return soup.get_text()
+            with requests.get(url, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                # 没有声明 charset 时 requests 默认 ISO-8859-1，这里改为从页面中识别
+                content_type = response.headers.get("Content-Type", "").lower()
+                declared = response.encoding if "charset" in content_type else None
+                extractor = HTMLTextExtractor(declared)
+                read = 0
+                for chunk in response.iter_content(READ_CHUNK_SIZE):
+                    extractor.feed(chunk)
+                    read += len(chunk)
+                    if read >= self.max_bytes:
+                        break
+                extractor.close()
+                return extractor.pop_text()
         except requests.exceptions.RequestException as e:
             return f"An error occurred: {e}"
 
+    async def fetch(self, url: str, session: Optional[aiohttp.ClientSession] = None) -> bytes:
+        """用共享连接池下载页面原始内容，最多 max_bytes（失败时抛出 aiohttp.ClientError）."""
+        session = session or get_session()
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with session.get(url, timeout=timeout) as response:
+            response.raise_for_status()
+            return await self._read_capped(response)
+
+    async def _read_capped(self, response: aiohttp.ClientResponse) -> bytes:
+        chunks = []
+        read = 0
+        async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+            chunks.append(chunk)
+            read += len(chunk)
+            if read >= self.max_bytes:
+                break
+        return b"".join(chunks)[:self.max_bytes]
+
+    async def stream(self, url: str, min_chunk_chars: int = 2048) -> AsyncIterator[str]:
+        """边下载边解析，逐块产出正文文字.
+
+        不缓冲整个页面、不构建 DOM，峰值内存只与单个网络块有关；
+        第一块文字在页面下载完成之前就能拿到。最多读取 max_bytes 字节。
+        """
+        async for text in await self.open_stream(url, min_chunk_chars):
+            yield text
+
+    async def open_stream(self, url: str, min_chunk_chars: int = 2048) -> AsyncIterator[str]:
+        """发出请求并检查状态码，然后返回与 stream() 相同的正文迭代器.
+
+        连接失败、响应头超时和非 2xx 状态码在返回之前就抛出（aiohttp.ClientError /
+        asyncio.TimeoutError），调用方可以在输出任何内容之前把它们变成错误响应。
+        迭代器读完或被关闭时释放连接。
+        """
+        session = get_session()
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        response = await session.get(url, timeout=timeout)
+        try:
+            response.raise_for_status()
+        except BaseException:
+            response.release()
+            raise
+        return self._stream_text(response, min_chunk_chars)
+
+    async def _stream_text(self, response: aiohttp.ClientResponse, min_chunk_chars: int) -> AsyncIterator[str]:
+        try:
+            extractor = HTMLTextExtractor(response.charset)
+            buffered: List[str] = []
+            buffered_chars = 0
+            read = 0
+            async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+                extractor.feed(chunk[:self.max_bytes - read])
+                read += len(chunk)
+                text = extractor.pop_text()
+                if text:
+                    buffered.append(text)
+                    buffered_chars += len(text)
+                if buffered_chars >= min_chunk_chars:
+                    yield "".join(buffered)
+                    buffered, buffered_chars = [], 0
+                if read >= self.max_bytes:
+                    break
+            extractor.close()
+            buffered.append(extractor.pop_text())
+            tail = "".join(buffered)
+            if tail:
+                yield tail
+        finally:
+            response.release()
+
+    async def ascrape(self, url: str) -> str:
+        """scrape 的异步版本：通过共享连接池下载，HTML 解析交给共享进程池.
+
+        配置了 cache 时，未过期的页面直接返回缓存文本；过期的页面用条件请求
+        重新验证，服务器返回 304 时沿用缓存文本。
+        """
+        cached = await self.cache.get(url) if self.cache else None
+        if cached is not None and self.cache.is_fresh(cached):
+            return cached.text
+        try:
+            session = get_session()
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            headers = cached.validators() if cached else None
+            async with session.get(url, timeout=timeout, headers=headers) as response:
+                if response.status == 304 and cached is not None:
+                    await self.cache.touch(cached)
+                    return cached.text
+                response.raise_for_status()
+                content = await self._read_capped(response)
+                charset = response.charset
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if cached is not None:
+                # 网络失败时宁可返回过期内容
+                return cached.text
+            return f"An error occurred: {e}"
+        text = await run_cpu(extract_text, content, charset)
+        if self.cache is not None:
+            await self.cache.put(url, text, etag, last_modified)
+        return text
+
+    async def scrape_many(self, urls: List[str], max_concurrency: Optional[int] = None) -> List[str]:
+        """并发抓取多个 URL，同时进行的请求不超过 max_concurrency，结果与 urls 顺序一致."""
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def bounded(url: str) -> str:
+            async with semaphore:
+                return await self.ascrape(url)
+
+        return await asyncio.gather(*(bounded(url) for url in urls))
+
     def __call__(self, url: str) -> str:
         """使实例可调用."""
-        return self.scrape(url)
\ No newline at end of file
+        return self.scrape(url)